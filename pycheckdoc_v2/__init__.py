@@ -0,0 +1,3 @@
+"""Check documentation of python source files"""
+
+VERSION = "2.2.0"
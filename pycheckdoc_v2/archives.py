@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""Read modules straight out of wheels, sdists and zip archives"""
+
+import tarfile
+import zipfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Iterator, Optional, Tuple, Union
+
+# Local
+from pycheckdoc_v2.stubs import SOURCE_SUFFIXES, is_paired_stub
+
+ZIP_SUFFIXES = (".whl", ".zip")
+TAR_SUFFIXES = (".tar.gz", ".tgz")
+
+# Separates the path of an archive from the path of a member in it.
+MEMBER_SEPARATOR = "!"
+
+# Archives kept open in each process. Members of an archive are usually
+# read one after the other, so a few are enough.
+MAX_OPEN_ARCHIVES = 8
+
+_open_archives: "OrderedDict[str, Union[zipfile.ZipFile, tarfile.TarFile]]"
+_open_archives = OrderedDict()
+
+
+def is_archive(path: Union[str, Path]) -> bool:
+    """Check if the path points to a supported archive.
+
+    Args:
+        path (str | Path): Path to check.
+
+    Returns:
+        bool: True if the path has the suffix of a supported archive.
+    """
+    name = str(path).lower()
+    return name.endswith(ZIP_SUFFIXES) or name.endswith(TAR_SUFFIXES)
+
+
+def iter_archive_members(archive: str) -> Iterator[str]:
+    """Get the paths of the .py, .pyi and .ipynb members of an archive.
+
+    Members are given in the order they are stored in, which is the
+    cheapest order to read them in. Stubs with a .py sibling are left
+    out as they are checked with it.
+
+    Args:
+        archive (str): Path to the archive.
+
+    Returns:
+        Iterator[str]: Paths of the members, as `archive!member`.
+    """
+    if archive.lower().endswith(ZIP_SUFFIXES):
+        with zipfile.ZipFile(archive) as zip_file:
+            names = [
+                info.filename
+                for info in zip_file.infolist()
+                if not info.is_dir()
+                and info.filename.endswith(SOURCE_SUFFIXES)
+            ]
+    else:
+        with tarfile.open(archive, "r:*") as tar_file:
+            names = [
+                member.name
+                for member in tar_file
+                if member.isfile() and member.name.endswith(SOURCE_SUFFIXES)
+            ]
+
+    listed = set(names)
+
+    for name in names:
+        if not is_paired_stub(name, listed):
+            yield f"{archive}{MEMBER_SEPARATOR}{name}"
+
+
+def split_archive_path(path: str) -> Optional[Tuple[str, str]]:
+    """Split a path to an archive member into the archive and member.
+
+    Args:
+        path (str): Path that may point into an archive.
+
+    Returns:
+        Tuple[str, str] | None: Tuple of the archive path and the member
+            name, or None if the path doesn't point into an archive.
+    """
+    index = path.find(MEMBER_SEPARATOR)
+
+    while index != -1:
+        archive = path[:index]
+        if is_archive(archive):
+            return (archive, path[index + 1:])
+        index = path.find(MEMBER_SEPARATOR, index + 1)
+
+    return None
+
+
+def _open_archive(archive: str) -> Union[zipfile.ZipFile, tarfile.TarFile]:
+    """Open an archive, reusing it if it's already open in this process.
+
+    Args:
+        archive (str): Path to the archive.
+
+    Returns:
+        ZipFile | TarFile: The open archive.
+    """
+    if archive in _open_archives:
+        _open_archives.move_to_end(archive)
+        return _open_archives[archive]
+
+    opened: Union[zipfile.ZipFile, tarfile.TarFile]
+    if archive.lower().endswith(ZIP_SUFFIXES):
+        opened = zipfile.ZipFile(archive)
+    else:
+        opened = tarfile.open(archive, "r:*")
+
+    _open_archives[archive] = opened
+
+    if len(_open_archives) > MAX_OPEN_ARCHIVES:
+        _open_archives.popitem(last=False)[1].close()
+
+    return opened
+
+
+def open_member(archive: str, member: str) -> IO[bytes]:
+    """Open a member of an archive to read it a chunk at a time.
+
+    Args:
+        archive (str): Path to the archive.
+        member (str): Name of the member in the archive.
+
+    Raises:
+        KeyError: If the archive has no such member.
+
+    Returns:
+        IO[bytes]: The member, decompressed as it is read.
+    """
+    opened = _open_archive(archive)
+
+    if isinstance(opened, zipfile.ZipFile):
+        return opened.open(member)
+
+    extracted = opened.extractfile(member)
+    if extracted is None:
+        raise KeyError(f"{archive}: '{member}' is not a file")
+
+    return extracted
+
+
+def read_member(archive: str, member: str) -> bytes:
+    """Read a member of an archive without extracting it to disk.
+
+    Args:
+        archive (str): Path to the archive.
+        member (str): Name of the member in the archive.
+
+    Raises:
+        KeyError: If the archive has no such member.
+
+    Returns:
+        bytes: Content of the member.
+    """
+    with open_member(archive, member) as f:
+        return f.read()
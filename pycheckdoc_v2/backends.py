@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""Pools that parse and check files in parallel"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from pebble import ProcessPool  # type: ignore
+from typing import Optional, Set
+
+# Local
+from pycheckdoc_v2.check_file import check_file, init_worker
+from pycheckdoc_v2.rules import RuleSet
+
+BACKENDS = ("auto", "process", "thread")
+
+
+def resolve_backend(backend: str = "auto") -> str:
+    """Get the backend that will actually run the checks.
+
+    `auto` always picks processes, the only backend that checks files in
+    parallel on every supported version. Threads are only used when asked
+    for.
+
+    Args:
+        backend (str, optional): One of `BACKENDS`. Defaults to `auto`.
+
+    Returns:
+        str: `process` or `thread`.
+
+    Raises:
+        ValueError: If the backend is unknown.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}'")
+
+    if backend == "auto":
+        return "process"
+
+    return backend
+
+
+class CheckPool:
+    """Workers that run `check_file` with the same rules.
+
+    Every backend sends only paths in and findings out. Processes each
+    hold their own copy of the rules, set once by `init_worker`. Threads
+    share the rules of this interpreter, so they only run in parallel on
+    free-threaded builds.
+    """
+
+    def __init__(
+        self,
+        backend: str,
+        max_workers: int,
+        rules: Optional[RuleSet] = None,
+        use_cache: bool = False,
+    ) -> None:
+        """Start the workers.
+
+        Args:
+            backend (str): One of `BACKENDS`.
+            max_workers (int): Number of workers.
+            rules (RuleSet | None, optional): Compiled rules to apply.
+                Defaults to None.
+            use_cache (bool, optional): Whether to go through the skeleton
+                cache. Defaults to `False`.
+        """
+        self.backend = resolve_backend(backend)
+        # Futures not done yet, to cancel them without `cancel_futures`,
+        # which needs Python 3.9.
+        self._pending: Set[Future] = set()
+        initargs = (rules, use_cache)
+
+        if self.backend == "process":
+            self._pool = ProcessPool(
+                max_workers=max_workers,
+                initializer=init_worker,
+                initargs=initargs,
+            )
+        else:
+            self._pool = ThreadPoolExecutor(
+                max_workers=max_workers,
+                initializer=init_worker,
+                initargs=initargs,
+            )
+
+    def submit(self, path: str) -> Future:
+        """Schedule a file to be checked.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            Future: Future of the result of `check_file`.
+        """
+        if self.backend == "process":
+            return self._pool.schedule(check_file, args=(path,))
+
+        future = self._pool.submit(check_file, path)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def close(self, cancel: bool = False) -> None:
+        """Wait for the workers to exit.
+
+        Args:
+            cancel (bool, optional): Whether to cancel the files not yet
+                checked instead of waiting for them. Processes are stopped
+                right away, threads finish their current file.
+                Defaults to `False`.
+        """
+        if self.backend != "process":
+            if cancel:
+                for future in self._pending.copy():
+                    future.cancel()
+            self._pool.shutdown(wait=True)
+            return
+
+        if cancel:
+            self._pool.stop()
+        else:
+            self._pool.close()
+        self._pool.join()
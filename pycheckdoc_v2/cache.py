@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""Location of pycheckdoc caches"""
+
+import os
+from pathlib import Path
+
+
+def cache_dir() -> Path:
+    """Get the directory where pycheckdoc keeps its caches.
+
+    `PYCHECKDOC_CACHE_DIR` is used if set, else `pycheckdoc` in
+    `XDG_CACHE_HOME` or `~/.cache`. The directory isn't created.
+
+    Returns:
+        Path: The cache directory.
+    """
+    if os.environ.get("PYCHECKDOC_CACHE_DIR"):
+        return Path(os.environ["PYCHECKDOC_CACHE_DIR"])
+
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+
+    return Path(base) / "pycheckdoc"
@@ -2,14 +2,20 @@
 """Check class and method documentation """
 
 import ast
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 # Local
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.check_docstring import check_docstring_content
 from pycheckdoc_v2.print_funcs import print_class_err, print_method_err
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet
 
 
 def check_class_doc(
-    module_tuple: Tuple[str, ast.Module], print_msgs: bool = True
+    module_tuple: Tuple[str, ast.Module],
+    print_msgs: bool = True,
+    rules: Optional[RuleSet] = None,
+    findings: Optional[List[Finding]] = None,
 ) -> Tuple[int, int]:
     """Check if classes in the given module have documentation.
     Class methods are also checked in the process.
@@ -19,12 +25,17 @@ def check_class_doc(
             the modules abstract syntax tree.
         print_msgs (bool, optional): Whether to print the error/success
             messages. Defaults to `True`.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        findings (List[Finding] | None, optional): List to append the
+            findings to. Defaults to None.
 
     Returns:
         Tuple[int, int]: Tuple of number if classes and methods without
             documentation.
     """
     module_path, module_node = module_tuple
+    rules = rules or DEFAULT_RULES
 
     class_nodes = [
         node for node in module_node.body if type(node) is ast.ClassDef
@@ -34,22 +45,43 @@ def check_class_doc(
     no_doc_num_method = 0
 
     for class_node in class_nodes:
-        if not ast.get_docstring(class_node):
+        if rules.ignores("class", class_node) or not rules.is_public(
+            module_path, class_node.name
+        ):
+            continue
+
+        err = rules.node_quality_error(class_node, class_node.name)
+
+        if err or not rules.has_doc(class_node):
             if print_msgs:
                 print_class_err(
-                    module_path, class_node.name, line=class_node.lineno
+                    module_path, class_node.name, err, line=class_node.lineno
+                )
+            if findings is not None:
+                findings.append(
+                    Finding(
+                        module_path,
+                        class_node.lineno,
+                        "class",
+                        class_node.name,
+                        err,
+                    )
                 )
             no_doc_num_class += 1
 
         no_doc_num_method += check_method_doc(
-            class_node, module_path, print_msgs
+            class_node, module_path, print_msgs, rules, findings
         )
 
     return (no_doc_num_class, no_doc_num_method)
 
 
 def check_method_doc(
-    class_node: ast.ClassDef, module_path: str, print_msgs: bool = True
+    class_node: ast.ClassDef,
+    module_path: str,
+    print_msgs: bool = True,
+    rules: Optional[RuleSet] = None,
+    findings: Optional[List[Finding]] = None,
 ) -> int:
     """Check if methods in the given class have documentation.
 
@@ -58,25 +90,77 @@ def check_method_doc(
         module_path (str): Path of the module containing the class.
         print_msgs (bool, optional): Whether to print the error/success
             messages. Defaults to `True`.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        findings (List[Finding] | None, optional): List to append the
+            findings to. Defaults to None.
 
     Returns:
-        int: Number of methods without documentation.
+        int: Number of methods without documentation. If the rules set
+            a docstring style, problems in the docstrings are also counted.
+            With `quality`, so are docstrings of too low quality.
     """
     method_nodes = [
         node for node in class_node.body if type(node) is ast.FunctionDef
     ]
+    rules = rules or DEFAULT_RULES
 
     no_doc_num = 0
 
     for method_node in method_nodes:
-        if not ast.get_docstring(method_node):
+        if rules.ignores("method", method_node) or not rules.is_public(
+            module_path, f"{class_node.name}.{method_node.name}"
+        ):
+            continue
+
+        err = rules.node_quality_error(method_node, method_node.name)
+
+        if err or not rules.has_doc(method_node):
+            if ast.get_docstring(method_node) is None and rules.inherits_doc(
+                module_path, class_node.name, method_node.name
+            ):
+                continue
             if print_msgs:
                 print_method_err(
                     module_path,
                     class_node.name,
                     method_node.name,
+                    err,
                     line=method_node.lineno,
                 )
+            if findings is not None:
+                findings.append(
+                    Finding(
+                        module_path,
+                        method_node.lineno,
+                        "method",
+                        f"{class_node.name}.{method_node.name}",
+                        err,
+                    )
+                )
             no_doc_num += 1
+        elif rules.style:
+            for err in check_docstring_content(
+                method_node, rules.style, is_method=True
+            ):
+                if print_msgs:
+                    print_method_err(
+                        module_path,
+                        class_node.name,
+                        method_node.name,
+                        err=err,
+                        line=method_node.lineno,
+                    )
+                if findings is not None:
+                    findings.append(
+                        Finding(
+                            module_path,
+                            method_node.lineno,
+                            "method",
+                            f"{class_node.name}.{method_node.name}",
+                            err,
+                        )
+                    )
+                no_doc_num += 1
 
     return no_doc_num
@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""Check docstring content against function signatures"""
+
+import ast
+import builtins
+import re
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Union
+
+STYLES = ("google", "numpy", "sphinx")
+
+FunctionNode = Union[ast.FunctionDef, ast.AsyncFunctionDef]
+
+# Google style: `Args:` headers followed by indented `name (type): desc`.
+GOOGLE_SECTION = re.compile(r"^(\s*)([A-Z][A-Za-z ]*):\s*$")
+GOOGLE_PARAM = re.compile(r"^\s*\**(\w+)\s*(?:\(.*\))?\s*:")
+
+# NumPy style: headers underlined with dashes and `name : type` entries.
+NUMPY_SECTION = re.compile(r"^\s*([A-Z][A-Za-z ]*)\s*\n\s*-{3,}\s*$", re.M)
+NUMPY_PARAM = re.compile(r"^\**(\w+)\s*(?::.*)?$")
+
+# Sphinx style: `:param name:`, `:returns:` and `:raises Error:` fields.
+SPHINX_PARAM = re.compile(r"^\s*:param\s+(?:[^:]*\s)?\**(\w+)\s*:", re.M)
+SPHINX_RETURNS = re.compile(r"^\s*:(?:returns?|yields?)\s*:", re.M)
+SPHINX_RAISES = re.compile(r"^\s*:raises?\b", re.M)
+
+PARAM_SECTIONS = {
+    "args",
+    "arguments",
+    "parameters",
+    "params",
+    "keyword args",
+    "keyword arguments",
+    "other parameters",
+}
+RETURN_SECTIONS = {"returns", "return", "yields", "yield"}
+RAISE_SECTIONS = {"raises", "raise"}
+
+SCOPE_NODES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)
+
+# `except*` exists from Python 3.11.
+TRY_NODES = (ast.Try,) + ((ast.TryStar,) if hasattr(ast, "TryStar") else ())
+
+# Handlers of these exceptions catch anything a function raises.
+BROAD_EXCEPTIONS = {"Exception", "BaseException"}
+
+
+class ParsedDoc(NamedTuple):
+    """Sections found in a docstring."""
+
+    params: Tuple[str, ...]
+    has_returns: bool
+    has_raises: bool
+
+
+def _parse_google(docstring: str) -> ParsedDoc:
+    """Parse a Google style docstring.
+
+    Args:
+        docstring (str): Cleaned docstring.
+
+    Returns:
+        ParsedDoc: Sections found in the docstring.
+    """
+    params: List[str] = []
+    has_returns = has_raises = False
+
+    section = None
+    section_indent = 0
+    entry_indent = -1
+
+    for line in docstring.splitlines():
+        if not line.strip():
+            continue
+
+        indent = len(line) - len(line.lstrip())
+
+        match = GOOGLE_SECTION.match(line)
+        if match and (section is None or indent <= section_indent):
+            section = match.group(2).lower()
+            section_indent = len(match.group(1))
+            entry_indent = -1
+
+            has_returns = has_returns or section in RETURN_SECTIONS
+            has_raises = has_raises or section in RAISE_SECTIONS
+            continue
+
+        if section is None:
+            continue
+
+        if indent <= section_indent:  # Section ended
+            section = None
+            continue
+
+        if section in PARAM_SECTIONS:
+            if entry_indent == -1:
+                entry_indent = indent
+
+            if indent == entry_indent:
+                match = GOOGLE_PARAM.match(line)
+                if match:
+                    params.append(match.group(1))
+
+    return ParsedDoc(tuple(params), has_returns, has_raises)
+
+
+def _parse_numpy(docstring: str) -> ParsedDoc:
+    """Parse a NumPy style docstring.
+
+    Args:
+        docstring (str): Cleaned docstring.
+
+    Returns:
+        ParsedDoc: Sections found in the docstring.
+    """
+    params: List[str] = []
+    has_returns = has_raises = False
+
+    headers = list(NUMPY_SECTION.finditer(docstring))
+
+    for i, header in enumerate(headers):
+        section = header.group(1).strip().lower()
+        has_returns = has_returns or section in RETURN_SECTIONS
+        has_raises = has_raises or section in RAISE_SECTIONS
+
+        if section not in PARAM_SECTIONS:
+            continue
+
+        end = headers[i + 1].start() if i + 1 < len(headers) else None
+        for line in docstring[header.end():end].splitlines():
+            # Entries start at the header's indentation, descriptions
+            # are indented below them.
+            if line and not line[0].isspace():
+                for name in line.split(","):
+                    match = NUMPY_PARAM.match(name.strip())
+                    if match:
+                        params.append(match.group(1))
+
+    return ParsedDoc(tuple(params), has_returns, has_raises)
+
+
+def _parse_sphinx(docstring: str) -> ParsedDoc:
+    """Parse a Sphinx style docstring.
+
+    Args:
+        docstring (str): Cleaned docstring.
+
+    Returns:
+        ParsedDoc: Sections found in the docstring.
+    """
+    return ParsedDoc(
+        tuple(SPHINX_PARAM.findall(docstring)),
+        bool(SPHINX_RETURNS.search(docstring)),
+        bool(SPHINX_RAISES.search(docstring)),
+    )
+
+
+PARSERS = {
+    "google": _parse_google,
+    "numpy": _parse_numpy,
+    "sphinx": _parse_sphinx,
+}
+
+
+@lru_cache(maxsize=4096)
+def parse_docstring(docstring: str, style: str = "google") -> ParsedDoc:
+    """Parse the sections of a docstring.
+
+    Results are cached by the docstring, so repeated docstrings are only
+    parsed once.
+
+    Args:
+        docstring (str): Cleaned docstring, as returned by
+            `ast.get_docstring`.
+        style (str, optional): Docstring style, one of `STYLES`.
+            Defaults to "google".
+
+    Returns:
+        ParsedDoc: Sections found in the docstring.
+    """
+    return PARSERS[style](docstring)
+
+
+def get_arg_names(
+    func_node: FunctionNode, is_method: bool = False
+) -> List[str]:
+    """Get the names of the arguments of a function.
+
+    Args:
+        func_node (FunctionNode): Function node.
+        is_method (bool, optional): Whether the function is a method. The
+            `self` or `cls` argument of methods is left out.
+            Defaults to False.
+
+    Returns:
+        List[str]: Names of the arguments in the order of declaration.
+    """
+    arguments = func_node.args
+    args = [*arguments.posonlyargs, *arguments.args]
+
+    if is_method and args and args[0].arg in ("self", "cls"):
+        args = args[1:]
+
+    names = [arg.arg for arg in args]
+
+    if arguments.vararg:
+        names.append(arguments.vararg.arg)
+
+    names.extend(arg.arg for arg in arguments.kwonlyargs)
+
+    if arguments.kwarg:
+        names.append(arguments.kwarg.arg)
+
+    return names
+
+
+def _body_nodes(func_node: FunctionNode) -> Iterator[ast.AST]:
+    """Yield the nodes in a function body without entering nested
+    functions, lambdas or classes.
+
+    Args:
+        func_node (FunctionNode): Function node.
+
+    Returns:
+        Iterator[ast.AST]: Nodes in the function body.
+    """
+    stack = list(func_node.body)
+
+    while stack:
+        node = stack.pop()
+        yield node
+
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, SCOPE_NODES):
+                stack.append(child)
+
+
+def _dotted_name(node: ast.AST) -> Optional[str]:
+    """Get the dotted name of a name or attribute node.
+
+    Args:
+        node (ast.AST): The node.
+
+    Returns:
+        str | None: The name, or None if the node is another expression.
+    """
+    if isinstance(node, ast.Name):
+        return node.id
+
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return None if value is None else f"{value}.{node.attr}"
+
+    return None
+
+
+def _catches(handler: ast.ExceptHandler, raised: Optional[str]) -> bool:
+    """Check if an except clause catches an exception.
+
+    Args:
+        handler (ast.ExceptHandler): The except clause.
+        raised (str | None): Name of the exception, or None if it isn't
+            a name.
+
+    Returns:
+        bool: True if the clause is bare or broad, names the exception
+            or names a builtin base class of a builtin exception.
+    """
+    if handler.type is None:
+        return True
+
+    types = handler.type
+    names = [
+        _dotted_name(node)
+        for node in (types.elts if isinstance(types, ast.Tuple) else [types])
+    ]
+
+    if BROAD_EXCEPTIONS.intersection(names) or raised in names:
+        return True
+
+    raised_class = getattr(builtins, raised or "", None)
+    if not isinstance(raised_class, type):
+        return False
+
+    for name in names:
+        caught_class = getattr(builtins, name or "", None)
+        if isinstance(caught_class, type) and issubclass(
+            raised_class, caught_class
+        ):
+            return True
+
+    return False
+
+
+def _raise_nodes(func_node: FunctionNode) -> Iterator[ast.Raise]:
+    """Yield the raise statements of a function body that raise out of
+    the function, without entering nested functions, lambdas or classes.
+
+    Bare `raise` statements, `raise NotImplementedError` and exceptions
+    caught by an enclosing `try` of the function are skipped.
+
+    Args:
+        func_node (FunctionNode): Function node.
+
+    Returns:
+        Iterator[ast.Raise]: The raise statements.
+    """
+    # Each node comes with the except clauses of the `try` blocks around it.
+    stack: List[Tuple[ast.AST, Tuple[ast.ExceptHandler, ...]]] = [
+        (node, ()) for node in func_node.body
+    ]
+
+    while stack:
+        node, handlers = stack.pop()
+
+        if isinstance(node, ast.Raise) and node.exc is not None:
+            exc = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+            raised = _dotted_name(exc)
+            if raised != "NotImplementedError" and not any(
+                _catches(handler, raised) for handler in handlers
+            ):
+                yield node
+
+        if isinstance(node, TRY_NODES):
+            protected = handlers + tuple(node.handlers)  # type: ignore
+            stack.extend((child, protected) for child in node.body)
+            stack.extend(
+                (child, handlers)
+                for child in node.handlers + node.orelse + node.finalbody
+            )
+            continue
+
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, SCOPE_NODES):
+                stack.append((child, handlers))
+
+
+def _returns_and_raises(func_node: FunctionNode) -> Tuple[bool, bool]:
+    """Check if a function returns a value and if it raises exceptions.
+
+    Only the exceptions that `_raise_nodes` yields are counted as raised.
+
+    Args:
+        func_node (FunctionNode): Function node.
+
+    Returns:
+        Tuple[bool, bool]: Whether the function returns a value and
+            whether it raises exceptions.
+    """
+    returns = False
+
+    for node in _body_nodes(func_node):
+        if isinstance(node, ast.Return):
+            if node.value is not None and not (
+                isinstance(node.value, ast.Constant)
+                and node.value.value is None
+            ):
+                returns = True
+        elif isinstance(node, (ast.Yield, ast.YieldFrom)):
+            returns = True
+
+    raises = next(_raise_nodes(func_node), None) is not None
+
+    return returns, raises
+
+
+def check_docstring_content(
+    func_node: FunctionNode, style: str = "google", is_method: bool = False
+) -> List[str]:
+    """Check that the docstring of a function documents its arguments,
+    return value and raised exceptions.
+
+    Args:
+        func_node (FunctionNode): Function node with a docstring.
+        style (str, optional): Docstring style, one of `STYLES`.
+            Defaults to "google".
+        is_method (bool, optional): Whether the function is a method.
+            Defaults to False.
+
+    Returns:
+        List[str]: Descriptions of the problems found. Empty if the
+            docstring matches the function.
+    """
+    docstring = ast.get_docstring(func_node)
+
+    if not docstring:
+        return []
+
+    returns, raises = _returns_and_raises(func_node)
+
+    return check_docstring_text(
+        docstring,
+        get_arg_names(func_node, is_method),
+        returns and func_node.name != "__init__",
+        raises,
+        style,
+    )
+
+
+def check_docstring_text(
+    docstring: str,
+    arg_names: List[str],
+    returns: bool,
+    raises: bool,
+    style: str = "google",
+) -> List[str]:
+    """Check that a docstring documents the given arguments, return value
+    and raised exceptions.
+
+    Args:
+        docstring (str): Cleaned up docstring.
+        arg_names (List[str]): Names of the arguments of the function.
+        returns (bool): Whether a Returns section is needed.
+        raises (bool): Whether a Raises section is needed.
+        style (str, optional): Docstring style, one of `STYLES`.
+            Defaults to "google".
+
+    Returns:
+        List[str]: Descriptions of the problems found. Empty if the
+            docstring matches.
+    """
+    parsed = parse_docstring(docstring, style)
+
+    missing = [name for name in arg_names if name not in parsed.params]
+    extra = [name for name in parsed.params if name not in arg_names]
+
+    errors = []
+
+    # An undocumented argument paired with an unknown documented one is
+    # most likely a typo or a rename.
+    for documented, actual in zip(extra, missing):
+        errors.append(f"argument '{documented}' should be '{actual}'")
+
+    for name in missing[len(extra):]:
+        errors.append(f"missing argument '{name}'")
+
+    for name in extra[len(missing):]:
+        errors.append(f"documented argument '{name}' does not exist")
+
+    if returns and not parsed.has_returns:
+        errors.append("missing Returns section")
+
+    if raises and not parsed.has_raises:
+        errors.append("missing Raises section")
+
+    return errors
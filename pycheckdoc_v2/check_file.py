@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""Parse and check a single file inside a worker process"""
+
+import ast
+from typing import List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.check_class import check_class_doc
+from pycheckdoc_v2.check_function import check_function_doc
+from pycheckdoc_v2.check_module import check_module_doc
+from pycheckdoc_v2.doctests import can_run_doctests, run_doctests
+from pycheckdoc_v2.findings import Finding, finding_order
+from pycheckdoc_v2.generate_ast import get_module_node, load_notebook
+from pycheckdoc_v2.notebooks import is_notebook
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet
+from pycheckdoc_v2.skeleton import (
+    check_skeleton,
+    extract_skeleton,
+    load_skeleton,
+    merge_stub_skeleton,
+)
+
+# Rules of the current worker process, set once by `init_worker`.
+_rules: RuleSet = DEFAULT_RULES
+
+# Whether `check_file` goes through the skeleton cache.
+_use_cache = False
+
+
+def init_worker(rules: Optional[RuleSet], use_cache: bool = False) -> None:
+    """Set the rules used by `check_file` in this process.
+
+    Used as the initializer of worker pools so that the compiled rules
+    are sent to each worker once instead of with every file.
+
+    Args:
+        rules (RuleSet | None): Compiled rules to apply.
+        use_cache (bool, optional): Whether to apply the rules to cached
+            definition skeletons instead of parsing unchanged files.
+            Defaults to `False`.
+    """
+    global _rules, _use_cache
+    _rules = rules or DEFAULT_RULES
+    _use_cache = use_cache
+
+
+def check_module_node(
+    module_tuple: Tuple[str, ast.Module], rules: Optional[RuleSet] = None
+) -> List[Finding]:
+    """Run all the checks on a module without printing.
+
+    Findings are sorted by line, with the module finding first. Findings
+    of notebooks are located in their cells.
+
+    Args:
+        module_tuple (Tuple[str, ast.Module]): Tuple of module path and
+            the modules abstract syntax tree.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+
+    Returns:
+        List[Finding]: Findings of the checks.
+    """
+    findings: List[Finding] = []
+
+    check_module_doc(module_tuple, False, rules, findings)
+    check_function_doc(module_tuple, False, rules, findings)
+    check_class_doc(module_tuple, False, rules, findings)
+
+    # Stable, so findings on the same line keep the order of the checks.
+    findings.sort(key=finding_order)
+
+    cell_map = getattr(module_tuple[1], "cell_map", None)
+    if cell_map is not None:
+        return cell_map.locate_findings(findings)
+
+    return findings
+
+
+def check_file(path: str) -> Optional[Tuple[str, List[Finding]]]:
+    """Parse and check the file at path with the worker's rules.
+
+    Only the findings are returned so that the AST never has to be sent
+    back to the parent process. With the skeleton cache, files whose
+    content was seen before aren't parsed at all. Definitions without a
+    docstring take the docstring of the `.pyi` stub of the file. Findings
+    of notebooks are located in their cells. With `doctest`, the failing
+    examples of docstrings are reported along with the other findings.
+
+    Args:
+        path (str): Path to the file to check.
+
+    Returns:
+        Tuple[str, List[Finding]] | None: Tuple of the path and its
+            findings, else None if the file is empty.
+    """
+    if _use_cache and is_notebook(path):
+        notebook = load_notebook(path)
+        definitions = load_skeleton(path, notebook.source)
+        if definitions is None:
+            return None
+        findings = check_skeleton(path, definitions, _rules)
+        return (path, notebook.cell_map.locate_findings(findings))
+
+    if _use_cache:
+        definitions = load_skeleton(path)
+        if definitions is None:
+            return None
+        definitions = merge_stub_skeleton(path, definitions)
+        findings = check_skeleton(path, definitions, _rules)
+    else:
+        module = get_module_node(path)
+        if module is None:
+            return None
+        findings = check_module_node(module, _rules)
+        definitions = None
+
+    if _rules.doctest and can_run_doctests(path):
+        if definitions is None:
+            definitions = extract_skeleton(module[1])
+        findings += run_doctests(path, definitions, _rules.doctest_timeout)
+        findings.sort(key=finding_order)
+
+    return (path, findings)
@@ -2,14 +2,20 @@
 """Check function documentation"""
 
 import ast
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 # Local
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.check_docstring import check_docstring_content
 from pycheckdoc_v2.print_funcs import print_function_err
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet
 
 
 def check_function_doc(
-    module_tuple: Tuple[str, ast.Module], print_msgs: bool = True
+    module_tuple: Tuple[str, ast.Module],
+    print_msgs: bool = True,
+    rules: Optional[RuleSet] = None,
+    findings: Optional[List[Finding]] = None,
 ) -> int:
     """Check if the functions in the given module have documentation.
 
@@ -18,11 +24,18 @@ def check_function_doc(
             the modules abstract syntax tree.
         print_msgs (bool, optional): Whether to print the error/success
             messages. Defaults to `True`.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        findings (List[Finding] | None, optional): List to append the
+            findings to. Defaults to None.
 
     Returns:
-        int: Number of functions without documentation.
+        int: Number of functions without documentation. If the rules set
+            a docstring style, problems in the docstrings are also counted.
+            With `quality`, so are docstrings of too low quality.
     """
     module_path, module_node = module_tuple
+    rules = rules or DEFAULT_RULES
 
     function_nodes = [
         node for node in module_node.body if type(node) is ast.FunctionDef
@@ -31,11 +44,48 @@ def check_function_doc(
     no_doc_num = 0
 
     for func_node in function_nodes:
-        if not ast.get_docstring(func_node):
+        if rules.ignores("function", func_node) or not rules.is_public(
+            module_path, func_node.name
+        ):
+            continue
+
+        err = rules.node_quality_error(func_node, func_node.name)
+
+        if err or not rules.has_doc(func_node):
             if print_msgs:
                 print_function_err(
-                    module_path, func_node.name, line=func_node.lineno
+                    module_path, func_node.name, err, line=func_node.lineno
+                )
+            if findings is not None:
+                findings.append(
+                    Finding(
+                        module_path,
+                        func_node.lineno,
+                        "function",
+                        func_node.name,
+                        err,
+                    )
                 )
             no_doc_num += 1
+        elif rules.style:
+            for err in check_docstring_content(func_node, rules.style):
+                if print_msgs:
+                    print_function_err(
+                        module_path,
+                        func_node.name,
+                        err=err,
+                        line=func_node.lineno,
+                    )
+                if findings is not None:
+                    findings.append(
+                        Finding(
+                            module_path,
+                            func_node.lineno,
+                            "function",
+                            func_node.name,
+                            err,
+                        )
+                    )
+                no_doc_num += 1
 
     return no_doc_num
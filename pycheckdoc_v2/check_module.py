@@ -2,14 +2,19 @@
 """Check module documentation"""
 
 import ast
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 # Local
+from pycheckdoc_v2.findings import Finding
 from pycheckdoc_v2.print_funcs import print_module_err
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet, module_stem
 
 
 def check_module_doc(
-    module_tuple: Tuple[str, ast.Module], print_msgs: bool = True
+    module_tuple: Tuple[str, ast.Module],
+    print_msgs: bool = True,
+    rules: Optional[RuleSet] = None,
+    findings: Optional[List[Finding]] = None,
 ) -> int:
     """Check if the given module has documentation.
 
@@ -18,15 +23,30 @@ def check_module_doc(
             the modules abstract syntax tree.
         print_msgs (bool, optional): Whether to print the error/success
             messages. Defaults to `True`.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        findings (List[Finding] | None, optional): List to append the
+            findings to. Defaults to None.
 
     Returns:
-        int: 0 if the module has documentation, else 1.
+        int: 0 if the module has documentation of good enough quality,
+            else 1.
     """
     module_path, module_node = module_tuple
+    rules = rules or DEFAULT_RULES
 
-    if not ast.get_docstring(module_node):
+    if rules.ignores("module", module_node) or not rules.is_public(
+        module_path, ""
+    ):
+        return 0
+
+    err = rules.node_quality_error(module_node, module_stem(module_path))
+
+    if err or not rules.has_doc(module_node):
         if print_msgs:
-            print_module_err(module_path)
+            print_module_err(module_path, err)
+        if findings is not None:
+            findings.append(Finding(module_path, 0, "module", "", err))
         return 1
 
     return 0
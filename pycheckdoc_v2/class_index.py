@@ -0,0 +1,623 @@
+#!/usr/bin/env python3
+"""Index classes across a project to find the docstrings methods
+inherit"""
+
+import ast
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from pebble import ProcessPool  # type: ignore
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+# Local
+from pycheckdoc_v2.archives import split_archive_path
+from pycheckdoc_v2.cache import cache_dir
+from pycheckdoc_v2.generate_ast import iter_paths, read_source
+from pycheckdoc_v2.walk_cache import RACY_NANOSECONDS
+from pycheckdoc_v2.workers import default_workers
+
+CLASS_INDEX_DIR = "classes"
+CLASS_INDEX_VERSION = 2
+
+# Modification time and size of a file when it was indexed.
+Stamp = Tuple[int, int]
+
+
+class ClassInfo(NamedTuple):
+    """Bases of a class and the methods it defines.
+
+    Bases are dotted names, resolved through the imports of the module
+    where possible. Each method maps to the length of its cleaned up
+    docstring, 0 if it has none.
+    """
+
+    bases: Tuple[str, ...]
+    methods: Dict[str, int]
+
+
+class ModuleIndex(NamedTuple):
+    """What a module contributes to the index.
+
+    `classes` maps the names of its top level classes to their info and
+    `imports` maps the names it imports to the dotted names they refer
+    to, so re-exports like `from .base import Base` can be followed.
+    `exports` is its `__all__`, None if it has none or it isn't a static
+    list, and `definitions` the names of its top level functions and
+    classes.
+    """
+
+    module: str
+    classes: Dict[str, ClassInfo]
+    imports: Dict[str, str]
+    exports: Optional[Tuple[str, ...]] = None
+    definitions: Tuple[str, ...] = ()
+
+
+def module_name(path: str) -> str:
+    """Get the dotted name a file is imported as, from the packages
+    (directories with an `__init__.py`) it is in.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        str: The dotted name, e.g. `pkg.sub.mod` or `pkg` for
+            `pkg/__init__.py`.
+    """
+    member = split_archive_path(path)
+
+    if member:
+        parts = list(Path(member[1]).with_suffix("").parts)
+    else:
+        file_path = Path(path).with_suffix("")
+        parts = [file_path.name]
+        parent = file_path.parent
+        while (parent / "__init__.py").is_file():
+            parts.insert(0, parent.name)
+            parent = parent.parent
+
+    if len(parts) > 1 and parts[-1] == "__init__":
+        parts.pop()
+
+    return ".".join(parts)
+
+
+def package_root(path: str) -> str:
+    """Get the outermost package directory containing a file.
+
+    Args:
+        path (str): Path to a file or directory.
+
+    Returns:
+        str: The outermost directory with an `__init__.py` containing
+            path, or path itself if it isn't in a package.
+    """
+    root = Path(path)
+    parent = root if root.is_dir() else root.parent
+
+    while (parent / "__init__.py").is_file():
+        root = parent
+        parent = parent.parent
+
+    return str(root)
+
+
+def _dotted_name(node: ast.expr) -> Optional[str]:
+    """Get the dotted name of an expression like `a.b.C` or `C[T]`.
+
+    Args:
+        node (ast.expr): The expression.
+
+    Returns:
+        str | None: The dotted name, or None if it isn't a name.
+    """
+    if isinstance(node, ast.Subscript):
+        return _dotted_name(node.value)
+
+    if isinstance(node, ast.Name):
+        return node.id
+
+    if isinstance(node, ast.Attribute):
+        value = _dotted_name(node.value)
+        return f"{value}.{node.attr}" if value else None
+
+    return None
+
+
+def _module_imports(
+    module: str, is_package: bool, module_node: ast.Module
+) -> Dict[str, str]:
+    """Map the names a module imports at the top level to dotted names.
+
+    Args:
+        module (str): Dotted name of the module.
+        is_package (bool): Whether the module is a package `__init__.py`.
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        Dict[str, str]: Dotted name of each imported name.
+    """
+    imports: Dict[str, str] = {}
+    package = module if is_package else module.rpartition(".")[0]
+
+    for node in module_node.body:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                if alias.asname:
+                    imports[alias.asname] = alias.name
+                else:
+                    top = alias.name.partition(".")[0]
+                    imports[top] = top
+        elif isinstance(node, ast.ImportFrom):
+            source = node.module or ""
+            if node.level:
+                base = package.split(".") if package else []
+                base = base[: len(base) - node.level + 1]
+                source = ".".join(base + ([source] if source else []))
+            for alias in node.names:
+                if alias.name != "*":
+                    imports[alias.asname or alias.name] = (
+                        f"{source}.{alias.name}"
+                    )
+
+    return imports
+
+
+def _module_exports(module_node: ast.Module) -> Optional[Tuple[str, ...]]:
+    """Get the names a module lists in `__all__`.
+
+    Args:
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        Tuple[str, ...] | None: The names, or None if there's no `__all__`
+            or it isn't built from lists or tuples of strings.
+    """
+    exports: Optional[List[str]] = None
+
+    for node in module_node.body:
+        if isinstance(node, ast.Assign):
+            targets = node.targets
+        elif isinstance(node, (ast.AnnAssign, ast.AugAssign)):
+            targets = [node.target]
+        else:
+            continue
+
+        if not any(
+            isinstance(target, ast.Name) and target.id == "__all__"
+            for target in targets
+        ):
+            continue
+
+        value = node.value
+        if not isinstance(value, (ast.List, ast.Tuple)) or not all(
+            isinstance(e, ast.Constant) and isinstance(e.value, str)
+            for e in value.elts
+        ):
+            return None
+
+        names = [e.value for e in value.elts]  # type: ignore
+
+        if not isinstance(node, ast.AugAssign):
+            exports = names
+        elif exports is not None:
+            exports += names
+        else:
+            return None
+
+    return None if exports is None else tuple(exports)
+
+
+def index_module(path: str, module_node: ast.Module) -> ModuleIndex:
+    """Index the top level classes and exports of a module.
+
+    Args:
+        path (str): Path of the module.
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        ModuleIndex: The classes, imports and exports of the module.
+    """
+    module = module_name(path)
+    is_package = Path(path).name == "__init__.py"
+    imports = _module_imports(module, is_package, module_node)
+    classes: Dict[str, ClassInfo] = {}
+
+    for node in module_node.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+
+        bases = []
+        for base in node.bases:
+            name = _dotted_name(base)
+            if name is None:
+                continue
+            head, dot, rest = name.partition(".")
+            if head in imports:
+                bases.append(imports[head] + dot + rest)
+            else:
+                bases.append(f"{module}.{name}")
+
+        methods = {
+            child.name: len(ast.get_docstring(child) or "")
+            for child in node.body
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef))
+        }
+
+        classes[node.name] = ClassInfo(tuple(bases), methods)
+
+    definitions = tuple(
+        node.name
+        for node in module_node.body
+        if isinstance(
+            node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+        )
+    )
+
+    return ModuleIndex(
+        module, classes, imports, _module_exports(module_node), definitions
+    )
+
+
+def _stamp(path: str) -> Optional[Stamp]:
+    """Get the modification time and size of a file, or of the archive
+    it is in.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        Stamp | None: The stamp, or None if the file can't be read.
+    """
+    member = split_archive_path(path)
+
+    try:
+        stat = os.stat(member[0] if member else path)
+    except OSError:
+        return None
+
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def index_file(path: str) -> Optional[ModuleIndex]:
+    """Parse and index a file inside a worker process.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        ModuleIndex | None: The index of the module, or None if it can't
+            be read or parsed.
+    """
+    try:
+        module_node = ast.parse(read_source(path))
+    except (OSError, SyntaxError, ValueError):
+        return None
+
+    return index_module(path, module_node)
+
+
+class Hierarchy:
+    """Classes of a project merged into a single lookup table.
+
+    Picklable, so it can be sent to worker processes with the rules.
+    """
+
+    def __init__(
+        self, modules: Iterable[Tuple[str, ModuleIndex]] = ()
+    ) -> None:
+        """Merge the indexes of modules.
+
+        Args:
+            modules (Iterable[Tuple[str, ModuleIndex]], optional): Path
+                and index of each module of the project. Defaults to none.
+        """
+        self.classes: Dict[str, ClassInfo] = {}
+        self.imports: Dict[str, Dict[str, str]] = {}
+        self.modules: Dict[str, str] = {}
+        self.indexes: Dict[str, ModuleIndex] = {}
+
+        for path, index in modules:
+            self.modules[path] = index.module
+            self.indexes[index.module] = index
+            self.imports[index.module] = index.imports
+            for name, info in index.classes.items():
+                self.classes[f"{index.module}.{name}"] = info
+
+        self._mros: Dict[str, List[str]] = {}
+
+    def resolve(self, name: str) -> str:
+        """Follow re-exports of a dotted class name to its definition.
+
+        Args:
+            name (str): Dotted name of the class.
+
+        Returns:
+            str: Dotted name where the class is defined, or name itself
+                if it isn't in the index.
+        """
+        seen = set()
+
+        while name not in self.classes and name not in seen:
+            seen.add(name)
+            module, _, attr = name.rpartition(".")
+            target = self.imports.get(module, {}).get(attr)
+            if target is None:
+                break
+            name = target
+
+        return name
+
+    def mro(self, name: str) -> List[str]:
+        """Get the method resolution order of a class.
+
+        Classes outside of the index have no known bases. If the bases
+        can't be linearized the order is depth first.
+
+        Args:
+            name (str): Dotted name of the class.
+
+        Returns:
+            List[str]: Dotted names of the class and its bases in the
+                order methods are looked up.
+        """
+        if name in self._mros:
+            return self._mros[name]
+
+        self._mros[name] = [name]  # Guards against cyclic bases.
+        info = self.classes.get(name)
+        bases = [self.resolve(base) for base in info.bases] if info else []
+
+        sequences = [list(self.mro(base)) for base in bases] + [bases]
+        order = [name]
+
+        while True:
+            sequences = [sequence for sequence in sequences if sequence]
+            if not sequences:
+                break
+
+            for sequence in sequences:
+                head = sequence[0]
+                if not any(head in other[1:] for other in sequences):
+                    break
+            else:  # Inconsistent, fall back to depth first.
+                order = [name]
+                for base in bases:
+                    order += [c for c in self.mro(base) if c not in order]
+                break
+
+            order.append(head)
+            for sequence in sequences:
+                if sequence[0] == head:
+                    del sequence[0]
+
+        self._mros[name] = order
+        return order
+
+    def inherited_doc_length(
+        self, path: str, class_name: str, method: str
+    ) -> int:
+        """Get the length of the docstring a method inherits, like
+        `inspect.getdoc` does, from the first base in the method
+        resolution order that documents a method of the same name.
+
+        Args:
+            path (str): Path of the module defining the class.
+            class_name (str): Name of the class.
+            method (str): Name of the method.
+
+        Returns:
+            int: Length of the cleaned up inherited docstring, 0 if none.
+        """
+        module = self.modules.get(path) or module_name(path)
+
+        for base in self.mro(f"{module}.{class_name}")[1:]:
+            info = self.classes.get(base)
+            if info is not None and info.methods.get(method):
+                return info.methods[method]
+
+        return 0
+
+
+def project_index_path(roots: Sequence[str]) -> Path:
+    """Get the file the index of the projects at roots is saved to, so
+    that each set of projects has its own index.
+
+    Args:
+        roots (Sequence[str]): Sorted package roots of the projects.
+
+    Returns:
+        Path: Path of the index in the cache directory.
+    """
+    digest = hashlib.sha256(
+        "\0".join(roots).encode("utf-8", "surrogatepass")
+    ).hexdigest()
+    return cache_dir() / CLASS_INDEX_DIR / f"{digest[:16]}.json"
+
+
+class ClassIndex:
+    """Index of the classes of the files of a project, with the stamp of
+    each file so only changed files are indexed again when it is saved
+    between runs.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        files: Optional[Dict[str, Tuple[Stamp, ModuleIndex]]] = None,
+    ) -> None:
+        """Initialize the index.
+
+        Args:
+            path (Path | None, optional): File the index is saved to.
+                Defaults to None, for an index that isn't saved.
+            files (Dict[str, Tuple[Stamp, ModuleIndex]] | None, optional):
+                Stamp and index of each file. Defaults to None.
+        """
+        self.path = path
+        self.files = files or {}
+        self.indexed = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "ClassIndex":
+        """Load the index saved by a previous run.
+
+        Args:
+            path (Path | None, optional): File the index is saved to.
+                Defaults to None, for an empty index that isn't saved.
+
+        Returns:
+            ClassIndex: The index. Empty if there is none or it can't be
+                read.
+        """
+        index = cls(path)
+
+        if path is None:
+            return index
+
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return index
+
+        if data.get("version") != CLASS_INDEX_VERSION:
+            return index
+
+        for file, (stamp, module_index) in data["files"].items():
+            module, classes, imports, exports, definitions = module_index
+            index.files[file] = (
+                (stamp[0], stamp[1]),
+                ModuleIndex(
+                    module,
+                    {
+                        name: ClassInfo(tuple(bases), methods)
+                        for name, (bases, methods) in classes.items()
+                    },
+                    imports,
+                    None if exports is None else tuple(exports),
+                    tuple(definitions),
+                ),
+            )
+
+        return index
+
+    def update(
+        self, paths: Iterable[str], max_workers: Optional[int] = None
+    ) -> Hierarchy:
+        """Index the files at paths that changed since they were last
+        indexed, in parallel, and merge the indexes of all of them.
+
+        Files that are no longer at paths are dropped from the index.
+
+        Args:
+            paths (Iterable[str]): Paths of the files of the project.
+            max_workers (int | None, optional): Number of worker processes.
+                Defaults to what the CPUs and memory available allow.
+
+        Returns:
+            Hierarchy: The classes of the files at paths.
+        """
+        stamps = {path: _stamp(path) for path in paths}
+        stale = [
+            path
+            for path, stamp in stamps.items()
+            if stamp is not None
+            and (path not in self.files or self.files[path][0] != stamp)
+        ]
+
+        if stale:
+            with ProcessPool(
+                max_workers=max_workers or default_workers()
+            ) as pool:
+                results = list(pool.map(index_file, stale).result())
+
+            now = time.time_ns()
+            for path, result in zip(stale, results):
+                stamp = stamps[path]
+                if result is None:
+                    self.files.pop(path, None)
+                elif now - stamp[0] > RACY_NANOSECONDS:  # type: ignore
+                    self.files[path] = (stamp, result)  # type: ignore
+                else:  # Might change again unnoticed, index it next time.
+                    self.files[path] = ((-1, -1), result)
+            self.indexed += len(stale)
+            self.dirty = True
+
+        for path in list(self.files):
+            if stamps.get(path) is None:
+                del self.files[path]
+                self.dirty = True
+
+        return Hierarchy(
+            (path, self.files[path][1])
+            for path in stamps
+            if path in self.files
+        )
+
+    def save(self) -> None:
+        """Save the index if it changed and has a path. Errors are
+        ignored as the index is only an optimization.
+        """
+        if not self.dirty or self.path is None:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with open(temp, "w") as f:
+                json.dump(
+                    {"version": CLASS_INDEX_VERSION, "files": self.files}, f
+                )
+            os.replace(temp, self.path)
+        except OSError:
+            return
+
+        self.dirty = False
+
+
+def build_hierarchy(
+    paths: Iterable[str],
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
+    index_path: Optional[Path] = None,
+) -> Hierarchy:
+    """Build the class hierarchy of the projects containing paths.
+
+    Every file of the outermost package containing each path is indexed,
+    so bases defined outside the checked paths are found. With
+    `use_cache`, the index of the projects is kept between runs and only
+    changed files are parsed again.
+
+    Args:
+        paths (Iterable[str]): Paths to the checked files.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to what the CPUs and memory available allow.
+        use_cache (bool, optional): Whether to keep the index in the cache
+            directory. Defaults to `False`.
+        index_path (Path | None, optional): File the index is saved to
+            instead. Defaults to None.
+
+    Returns:
+        Hierarchy: The classes of the projects.
+    """
+    roots = sorted({package_root(path) for path in paths})
+    if index_path is None and use_cache:
+        index_path = project_index_path(roots)
+
+    index = ClassIndex.load(index_path)
+    hierarchy = index.update(iter_paths(roots, recursive=True), max_workers)
+    index.save()
+
+    return hierarchy
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Load pycheckdoc configuration from pyproject.toml"""
+
+import os
+import sys
+from argparse import Namespace
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type
+
+# Local
+from pycheckdoc_v2.workers import env_workers
+
+try:
+    import tomllib  # type: ignore
+except ImportError:  # Python < 3.11
+    try:
+        import tomli as tomllib  # type: ignore
+    except ImportError:
+        tomllib = None
+
+# Errors of a configuration file that can't be read or parsed.
+CONFIG_ERRORS: Tuple[Type[Exception], ...] = (OSError,) + (
+    (tomllib.TOMLDecodeError,) if tomllib is not None else ()
+)
+
+
+def find_pyproject(start: Optional[str] = None) -> Optional[Path]:
+    """Find the nearest pyproject.toml file.
+
+    The search starts in the given directory and walks up to the
+    filesystem root.
+
+    Args:
+        start (str | None, optional): Directory to start searching from.
+            Defaults to the current working directory.
+
+    Returns:
+        Path | None: Path to the pyproject.toml file if found, else None.
+    """
+    directory = Path(start or Path.cwd()).absolute()
+
+    for parent in (directory, *directory.parents):
+        candidate = parent / "pyproject.toml"
+        if candidate.is_file():
+            return candidate
+
+    return None
+
+
+def load_config(path: Optional[str] = None) -> Dict[str, Any]:
+    """Load the `[tool.pycheckdoc]` table from a pyproject.toml file.
+
+    Args:
+        path (str | None, optional): Path to the pyproject.toml file. If
+            not provided, the nearest pyproject.toml is used.
+            Defaults to None.
+
+    Raises:
+        FileNotFoundError: If path is given but doesn't exist.
+        OSError: If the file can't be read.
+        TOMLDecodeError: If the file isn't valid TOML.
+
+    Returns:
+        Dict[str, Any]: The pycheckdoc configuration. Empty if no
+            configuration is found.
+    """
+    if path is not None:
+        pyproject = Path(path)
+        if not pyproject.is_file():
+            raise FileNotFoundError(f"No such config file: '{path}'")
+    else:
+        pyproject = find_pyproject()
+        if pyproject is None:
+            return {}
+
+    if tomllib is None:
+        print(
+            f"{pyproject}: install tomli to read configuration "
+            + "on Python < 3.11",
+            file=sys.stderr,
+        )
+        return {}
+
+    with open(pyproject, "rb") as f:
+        data = tomllib.load(f)
+
+    return data.get("tool", {}).get("pycheckdoc", {})
+
+
+class Options(NamedTuple):
+    """Options of a run, from the command line or the arguments of `main`.
+
+    The options of the rules override the configuration file and are
+    validated with it when the rules are compiled. The others are
+    validated by `validate`.
+    """
+
+    recursive: bool = False
+    print_msgs: bool = True
+    config: Optional[str] = None
+    multi_root: bool = False
+    shard: Optional[Tuple[int, int]] = None
+    shard_output: Optional[str] = None
+    stream: bool = False
+    max_in_flight: Optional[int] = None
+    files_from: Optional[str] = None
+    modules: Optional[List[str]] = None
+    fail_fast: bool = False
+    count_only: bool = False
+    save_findings: Optional[str] = None
+    use_cache: bool = False
+    workers: Optional[int] = None
+    stats: bool = False
+    backend: str = "auto"
+    fix: bool = False
+    diff: bool = False
+    # Options of the rules, None or False if not overridden.
+    style: Optional[str] = None
+    inherit_docs: bool = False
+    public_api: bool = False
+    quality: bool = False
+    doctest: bool = False
+    doctest_timeout: Optional[float] = None
+
+    @classmethod
+    def from_args(cls, args: Namespace) -> "Options":
+        """Get the options parsed from the command line.
+
+        Args:
+            args (Namespace): Parsed arguments, with a destination named
+                after each field.
+
+        Returns:
+            Options: The options.
+        """
+        return cls(**{field: getattr(args, field) for field in cls._fields})
+
+    def rule_config(self) -> Dict[str, Any]:
+        """Get the options of the rules that are overridden, keyed like
+        the configuration.
+
+        Returns:
+            Dict[str, Any]: The overridden options.
+        """
+        overrides = {
+            "style": self.style,
+            "inherit-docs": self.inherit_docs or None,
+            "public-api": self.public_api or None,
+            "quality": self.quality or None,
+            "doctest": self.doctest or None,
+            "doctest-timeout": self.doctest_timeout,
+        }
+
+        return {
+            key: value for key, value in overrides.items() if value is not None
+        }
+
+    def validate(self) -> None:
+        """Check that the options can be used together.
+
+        Raises:
+            ValueError: If a number, including `PYCHECKDOC_WORKERS` when
+                `workers` isn't set, is out of range, options conflict or
+                the list of `files_from` can't be read.
+        """
+        if self.workers is None:
+            env_workers()
+        elif self.workers < 1:
+            raise ValueError("--workers must be at least 1")
+
+        if self.max_in_flight is not None and self.max_in_flight < 1:
+            raise ValueError("--max-in-flight must be at least 1")
+
+        if self.files_from is not None and self.multi_root:
+            raise ValueError("--files-from can't be used with --multi-root")
+
+        if self.files_from not in (None, "-") and (
+            os.path.isdir(self.files_from)  # type: ignore
+            or not os.access(self.files_from, os.R_OK)  # type: ignore
+        ):
+            # Not `isfile`, which is false for `<(git ls-files)`.
+            raise ValueError(f"--files-from: can't read '{self.files_from}'")
+
+        if self.multi_root:
+            for flag, value in (
+                ("--fail-fast", self.fail_fast),
+                ("--stream", self.stream),
+                ("--max-in-flight", self.max_in_flight is not None),
+                ("--backend", self.backend != "auto"),
+            ):
+                if value:
+                    raise ValueError(f"{flag} can't be used with --multi-root")
+
+        if self.fix or self.diff:
+            mode = "--fix" if self.fix else "--diff"
+            for flag, value in (
+                ("--save-findings", self.save_findings is not None),
+                ("--count-only", self.count_only),
+                ("--doctest", self.doctest),
+            ):
+                if value:
+                    raise ValueError(f"{flag} can't be used with {mode}")
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""Run the examples of docstrings in isolated processes"""
+
+import doctest
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Local
+from pycheckdoc_v2.archives import split_archive_path
+from pycheckdoc_v2.cache import cache_dir
+from pycheckdoc_v2.class_index import module_name, package_root
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.generate_ast import read_source
+from pycheckdoc_v2.skeleton import Definition
+
+DOCTEST_VERSION = 1
+
+PROMPT = ">>>"
+
+# Seconds given to import a module, on top of the time of its examples.
+IMPORT_TIMEOUT = 30.0
+
+# Examples shown in messages are cut to this length.
+MAX_SNIPPET = 60
+
+# Line of the example in its docstring, from 1, the message and whether
+# the example timed out.
+Failure = Tuple[int, str, bool]
+
+
+class ExampleTimeout(Exception):
+    """Raised in an example that runs for too long."""
+
+
+def can_run_doctests(path: str) -> bool:
+    """Check if the examples of a file can be run.
+
+    Only `.py` files on disk can be imported to run their examples.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        bool: True if the file is a module on disk.
+    """
+    return path.endswith(".py") and split_archive_path(path) is None
+
+
+def doctest_key(path: str, module_hash: str, docstring: str) -> str:
+    """Get the key of the result of the examples of a docstring.
+
+    The result depends on the whole module and where it is imported
+    from, so its path and the hash of its source are part of the key, as
+    is the version of Python running the examples.
+
+    Args:
+        path (str): Path to the module.
+        module_hash (str): Hash of the source of the module.
+        docstring (str): Raw docstring.
+
+    Returns:
+        str: The key.
+    """
+    digest = hashlib.sha256(bytes([DOCTEST_VERSION]))
+    digest.update(sys.version.encode())
+    digest.update(os.path.abspath(path).encode("utf-8", "surrogatepass"))
+    digest.update(module_hash.encode())
+    digest.update(docstring.encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+def result_path(key: str) -> Path:
+    """Get where the result with the given key is cached.
+
+    Args:
+        key (str): Key of the result.
+
+    Returns:
+        Path: Path of the cached result.
+    """
+    return cache_dir() / "doctests" / key[:2] / key
+
+
+def load_result(key: str) -> Optional[List[Failure]]:
+    """Get a cached result.
+
+    Args:
+        key (str): Key of the result.
+
+    Returns:
+        List[Failure] | None: Failures of the examples, or None if the
+            result isn't cached.
+    """
+    try:
+        with open(result_path(key)) as f:
+            return [tuple(failure) for failure in json.load(f)]  # type: ignore
+    except (OSError, ValueError):
+        return None
+
+
+def save_result(key: str, failures: List[Failure]) -> None:
+    """Cache a result. Errors are ignored as the cache is only an
+    optimization.
+
+    Args:
+        key (str): Key of the result.
+        failures (List[Failure]): Failures of the examples.
+    """
+    cached = result_path(key)
+
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        temp = cached.with_name(
+            f"{cached.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        with open(temp, "w") as f:
+            json.dump(failures, f)
+        os.replace(temp, cached)
+    except OSError:
+        pass
+
+
+def _snippet(text: str) -> str:
+    """Shorten the source or output of an example for a message.
+
+    Args:
+        text (str): The source or output.
+
+    Returns:
+        str: The text on one line, cut to `MAX_SNIPPET` characters.
+    """
+    text = text.strip().replace("\n", "\\n")
+
+    if len(text) > MAX_SNIPPET:
+        text = text[: MAX_SNIPPET - 3] + "..."
+
+    return text
+
+
+class _Runner(doctest.DocTestRunner):
+    """Runner that keeps the failures instead of printing them."""
+
+    def __init__(self) -> None:
+        """Initialize the runner."""
+        super().__init__(verbose=False)
+        self.found: List[Failure] = []
+
+    def report_failure(
+        self,
+        out: Any,
+        test: doctest.DocTest,
+        example: doctest.Example,
+        got: str,
+    ) -> None:
+        """Keep an example whose output isn't the expected one.
+
+        Args:
+            out (Any): Where doctest writes its reports.
+            test (doctest.DocTest): Test of the example.
+            example (doctest.Example): The example.
+            got (str): Output of the example.
+        """
+        if example.exc_msg is not None:
+            # Only the exceptions differ, the tracebacks don't matter.
+            outcome = f"raised '{_snippet(got.strip().splitlines()[-1])}'"
+            want = example.exc_msg
+        else:
+            outcome = f"printed '{_snippet(got)}'"
+            want = example.want
+
+        self.found.append(
+            (
+                example.lineno + 1,
+                f"`{_snippet(example.source)}` {outcome} "
+                + f"instead of '{_snippet(want)}'",
+                False,
+            )
+        )
+
+    def report_unexpected_exception(
+        self,
+        out: Any,
+        test: doctest.DocTest,
+        example: doctest.Example,
+        exc_info: Any,
+    ) -> None:
+        """Keep an example that raised an exception it didn't expect.
+
+        Args:
+            out (Any): Where doctest writes its reports.
+            test (doctest.DocTest): Test of the example.
+            example (doctest.Example): The example.
+            exc_info (Any): Type, value and traceback of the exception.
+        """
+        exc_type, exc, _ = exc_info
+        timed_out = exc_type is ExampleTimeout
+
+        if timed_out:
+            outcome = f"timed out after {exc.args[0]:g}s"
+        else:
+            outcome = f"raised {exc_type.__name__}: {_snippet(str(exc))}"
+
+        self.found.append(
+            (
+                example.lineno + 1,
+                f"`{_snippet(example.source)}` {outcome}",
+                timed_out,
+            )
+        )
+
+
+def _import_module(path: str) -> Any:
+    """Import the module at path like its package would be imported.
+
+    Args:
+        path (str): Path to the module.
+
+    Returns:
+        ModuleType: The module.
+    """
+    name = module_name(path)
+    root = package_root(path)
+
+    if root == path:
+        # Not in a package, loaded from its path so that it can't be
+        # shadowed by an installed module of the same name.
+        sys.path.insert(0, os.path.dirname(path))
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)  # type: ignore
+        sys.modules[name] = module
+        spec.loader.exec_module(module)  # type: ignore
+        return module
+
+    sys.path.insert(0, os.path.dirname(root))
+    return importlib.import_module(name)
+
+
+def _on_timeout(signum: int, frame: Any) -> None:
+    """Stop the example that is running.
+
+    Args:
+        signum (int): The signal.
+        frame (Any): Frame that was running.
+
+    Raises:
+        ExampleTimeout: Always.
+    """
+    raise ExampleTimeout(_on_timeout.timeout)  # type: ignore
+
+
+def run_examples(
+    path: str, docstrings: Sequence[str], timeout: float
+) -> List[List[Failure]]:
+    """Run the examples of docstrings of a module in this process.
+
+    Each docstring runs in a copy of the globals of the module and each
+    example is stopped after `timeout` seconds where timers exist.
+
+    Args:
+        path (str): Path to the module.
+        docstrings (Sequence[str]): Raw docstrings of the module.
+        timeout (float): Seconds an example may run for.
+
+    Returns:
+        List[List[Failure]]: Failures of the examples of each docstring.
+    """
+    try:
+        module = _import_module(path)
+    except BaseException as e:
+        failure = (0, f"module can't be imported: {_snippet(repr(e))}", False)
+        return [[failure] for _ in docstrings]
+
+    use_timer = hasattr(signal, "setitimer")
+    if use_timer:
+        _on_timeout.timeout = timeout  # type: ignore
+        handler = signal.signal(signal.SIGALRM, _on_timeout)
+
+    parser = doctest.DocTestParser()
+    results = []
+
+    for number, docstring in enumerate(docstrings):
+        runner = _Runner()
+        test = parser.get_doctest(
+            docstring, dict(vars(module)), f"{path}[{number}]", path, 0
+        )
+
+        # One example at a time in the same globals, so that each one
+        # gets its own timer.
+        for example in test.examples:
+            single = doctest.DocTest(
+                [example], test.globs, test.name, path, 0, docstring
+            )
+            if use_timer:
+                signal.setitimer(signal.ITIMER_REAL, timeout)
+            try:
+                runner.run(single, out=lambda text: None, clear_globs=False)
+            finally:
+                if use_timer:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+
+        results.append(runner.found)
+
+    if use_timer:
+        signal.signal(signal.SIGALRM, handler)
+
+    return results
+
+
+def run_isolated(
+    path: str, docstrings: Sequence[str], timeout: float
+) -> List[List[Failure]]:
+    """Run the examples of docstrings of a module in a new interpreter,
+    so that modules never share state.
+
+    Args:
+        path (str): Path to the module.
+        docstrings (Sequence[str]): Raw docstrings of the module.
+        timeout (float): Seconds an example may run for.
+
+    Returns:
+        List[List[Failure]]: Failures of the examples of each docstring.
+            If the interpreter runs for longer than all the examples
+            should, every docstring fails with a timeout.
+    """
+    # The working directory is replaced on the path of the interpreter so
+    # that its modules can't shadow those used to run the examples.
+    package_parent = str(Path(__file__).resolve().parent.parent)
+    code = (
+        f"import sys; sys.path[0] = {package_parent!r}; "
+        + "from pycheckdoc_v2.doctests import _main; _main(sys.argv[1:])"
+    )
+
+    num_examples = sum(docstring.count(PROMPT) for docstring in docstrings)
+
+    try:
+        completed = subprocess.run(
+            [sys.executable, "-c", code, path, str(timeout)],
+            input=json.dumps(list(docstrings)),
+            capture_output=True,
+            text=True,
+            timeout=IMPORT_TIMEOUT + timeout * num_examples,
+        )
+        if completed.returncode != 0:
+            lines = completed.stderr.strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else completed.returncode)
+        return [
+            [tuple(failure) for failure in failures]  # type: ignore
+            for failures in json.loads(completed.stdout)
+        ]
+    except subprocess.TimeoutExpired:
+        failure = (0, "examples timed out", True)
+    except (OSError, RuntimeError, ValueError) as e:
+        failure = (0, f"examples couldn't run: {_snippet(str(e))}", True)
+
+    return [[failure] for _ in docstrings]
+
+
+def run_doctests(
+    path: str, definitions: List[Definition], timeout: float
+) -> List[Finding]:
+    """Run the examples in the docstrings of a module, reusing the cached
+    results of the docstrings seen before in the same module source.
+
+    Results with a timeout aren't cached, so they are run again next
+    time.
+
+    Args:
+        path (str): Path to the module.
+        definitions (List[Definition]): Definitions of the module.
+        timeout (float): Seconds an example may run for.
+
+    Returns:
+        List[Finding]: A finding for each failing example, at the line of
+            its definition.
+    """
+    documented = [
+        definition
+        for definition in definitions
+        if definition.docstring and PROMPT in definition.docstring
+    ]
+
+    if not documented:
+        return []
+
+    module_hash = hashlib.sha256(read_source(path)).hexdigest()
+    keys = [doctest_key(path, module_hash, d.docstring) for d in documented]
+    results: Dict[str, List[Failure]] = {}
+
+    for key in keys:
+        cached = load_result(key)
+        if cached is not None:
+            results[key] = cached
+
+    pending = [
+        (key, definition)
+        for key, definition in zip(keys, documented)
+        if key not in results
+    ]
+
+    if pending:
+        ran = run_isolated(
+            path, [definition.docstring for _, definition in pending], timeout
+        )
+        for (key, _), failures in zip(pending, ran):
+            results[key] = failures
+            if not any(timed_out for *_, timed_out in failures):
+                save_result(key, failures)
+
+    return [
+        Finding(
+            path,
+            definition.line,
+            definition.kind,
+            definition.qualname,
+            f"doctest failed at line {line} of the docstring: {message}"
+            if line
+            else f"doctest failed: {message}",
+        )
+        for key, definition in zip(keys, documented)
+        for line, message, _ in results[key]
+    ]
+
+
+def _main(argv: List[str]) -> None:
+    """Entry point of the interpreter started by `run_isolated`. Run the
+    examples of the docstrings read from the standard input
+    and write their failures to the standard output, as JSON.
+
+    Anything the module writes to the standard output is dropped, so it
+    can't mix with the results.
+
+    Args:
+        argv (List[str]): Path to the module and seconds an example may
+            run for.
+    """
+    path, timeout = argv
+    docstrings = json.load(sys.stdin)
+
+    results = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+
+    with results:
+        json.dump(run_examples(path, docstrings, float(timeout)), results)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""Find the public API of a project from its exports"""
+
+from collections import deque
+from typing import Deque, Dict, List, Optional, Set
+
+# Local
+from pycheckdoc_v2.class_index import Hierarchy
+
+
+def _is_private(name: str) -> bool:
+    """Check if a name is private by convention, i.e. starts with an
+    underscore but is not a dunder.
+
+    Args:
+        name (str): Name to check.
+
+    Returns:
+        bool: True if the name is private.
+    """
+    return name.startswith("_") and not (
+        len(name) > 4 and name.endswith("__")
+    )
+
+
+class ExportGraph:
+    """Definitions reachable from the public modules of a project.
+
+    A module is public if no part of its dotted name is private, or if a
+    public module exports it. A module exports the names in its
+    `__all__`, else its public top level functions and classes, plus,
+    for packages, the public names they import from the project. Each
+    exported name is followed through imports and re-exports to the
+    module defining it.
+    """
+
+    def __init__(self, hierarchy: Hierarchy) -> None:
+        """Walk the exports of the modules of a project.
+
+        Args:
+            hierarchy (Hierarchy): Index of the modules of the project.
+        """
+        self.modules = dict(hierarchy.modules)
+        self.public_modules: Set[str] = set()
+        self.public: Dict[str, Set[str]] = {}
+
+        indexes = hierarchy.indexes
+        packages = {
+            module
+            for path, module in self.modules.items()
+            if path.endswith("__init__.py")
+        }
+
+        def exported_names(module: str) -> List[str]:
+            """Get the names a module exports.
+
+            Args:
+                module (str): Dotted name of the module.
+
+            Returns:
+                List[str]: The exported names.
+            """
+            index = indexes[module]
+            if index.exports is not None:
+                return list(index.exports)
+
+            names = [n for n in index.definitions if not _is_private(n)]
+
+            if module in packages:
+                names += [
+                    name
+                    for name, target in index.imports.items()
+                    if not _is_private(name)
+                    and target.partition(".")[0] in roots
+                ]
+
+            return names
+
+        def resolve(name: str) -> Optional[str]:
+            """Follow a dotted name through imports to a module or the
+            module defining it.
+
+            Args:
+                name (str): Dotted name.
+
+            Returns:
+                str | None: Dotted name of the module or definition, or
+                    None if it isn't in the project.
+            """
+            seen = set()
+
+            while name not in seen:
+                seen.add(name)
+                if name in indexes:
+                    return name
+
+                module, _, attr = name.rpartition(".")
+                index = indexes.get(module)
+                if index is None:
+                    return None
+                if attr in index.definitions:
+                    return name
+                if attr not in index.imports:
+                    return None
+                name = index.imports[attr]
+
+            return None
+
+        roots = {module.partition(".")[0] for module in indexes}
+        queue: Deque[str] = deque(
+            module
+            for module in sorted(indexes)
+            if not any(_is_private(part) for part in module.split("."))
+        )
+
+        while queue:
+            module = queue.popleft()
+            if module in self.public_modules:
+                continue
+            self.public_modules.add(module)
+
+            for name in exported_names(module):
+                target = resolve(f"{module}.{name}")
+                if target is None:
+                    continue
+                if target in indexes:
+                    queue.append(target)
+                else:
+                    defining, _, definition = target.rpartition(".")
+                    self.public.setdefault(defining, set()).add(definition)
+
+    def is_public(self, path: str, qualname: str) -> bool:
+        """Check if a definition is part of the public API.
+
+        Definitions of files outside of the project are public unless
+        their name is private.
+
+        Args:
+            path (str): Path of the module.
+            qualname (str): Name of the definition, `Class.method` for
+                methods or "" for the module itself.
+
+        Returns:
+            bool: True if the definition is public.
+        """
+        name, _, method = qualname.partition(".")
+
+        if method and _is_private(method):
+            return False
+
+        module = self.modules.get(path)
+
+        if module is None:
+            return not _is_private(name)
+
+        if not name:
+            return module in self.public_modules
+
+        return name in self.public.get(module, ())
+
+    def contributes(self, path: str) -> bool:
+        """Check if a file has anything to check in the public API.
+
+        Args:
+            path (str): Path of the module.
+
+        Returns:
+            bool: True if the module is public, has public definitions or
+                is outside of the project.
+        """
+        module = self.modules.get(path)
+
+        if module is None:
+            return True
+
+        return module in self.public_modules or bool(self.public.get(module))
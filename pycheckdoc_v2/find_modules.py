@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Find the source files of installed modules without importing them"""
+
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from importlib.machinery import ModuleSpec, PathFinder
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Local
+from pycheckdoc_v2.cache import cache_dir
+
+CACHE_FILE = "modules.json"
+
+
+def environment_fingerprint() -> str:
+    """Get a fingerprint of the interpreter and its import paths.
+
+    Installing or removing a package changes the modification time of
+    its site-packages directory, and therefore the fingerprint.
+
+    Returns:
+        str: The fingerprint.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{sys.executable}\0{sys.version}".encode())
+
+    for entry in sys.path:
+        try:
+            mtime = os.stat(entry or ".").st_mtime_ns
+        except OSError:
+            mtime = 0
+        digest.update(f"\0{entry}\0{mtime}".encode())
+
+    return digest.hexdigest()
+
+
+def find_module_spec(name: str) -> Optional[ModuleSpec]:
+    """Find the spec of a module without importing it.
+
+    Parents of dotted modules are looked up in the search locations of
+    their own spec instead of being imported, so no package code runs.
+
+    Args:
+        name (str): Name of the module, e.g. `requests` or `os.path`.
+
+    Returns:
+        ModuleSpec | None: The spec, or None if the module isn't found.
+    """
+    parts = name.split(".")
+
+    try:
+        spec = importlib.util.find_spec(parts[0])
+    except (ImportError, ValueError):
+        return None
+
+    for index in range(1, len(parts)):
+        if spec is None or not spec.submodule_search_locations:
+            return None
+
+        spec = PathFinder.find_spec(
+            ".".join(parts[: index + 1]),
+            list(spec.submodule_search_locations),
+        )
+
+    return spec
+
+
+def resolve_module(name: str) -> List[str]:
+    """Get the source files of a module. For packages, these are the
+    .py files of all their submodules.
+
+    Args:
+        name (str): Name of the module.
+
+    Returns:
+        List[str]: Sorted absolute paths of the source files. Empty if
+            the module isn't found or has no Python source, like
+            extension and builtin modules.
+    """
+    spec = find_module_spec(name)
+
+    if spec is None:
+        return []
+
+    files = set()
+
+    if spec.submodule_search_locations:
+        for location in spec.submodule_search_locations:
+            for path in Path(location).rglob("*.py"):
+                files.add(str(path.absolute()))
+    elif spec.origin and spec.origin.endswith(".py"):
+        files.add(str(Path(spec.origin).absolute()))
+
+    return sorted(files)
+
+
+def _read_cache(path: Path, fingerprint: str) -> Dict[str, List[str]]:
+    """Read the cached files of modules for an environment.
+
+    Args:
+        path (Path): Path to the cache file.
+        fingerprint (str): Fingerprint of the environment.
+
+    Returns:
+        Dict[str, List[str]]: Files of each cached module. Empty if the
+            cache is missing, unreadable or for another environment.
+    """
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if data.get("fingerprint") != fingerprint:
+        return {}
+
+    return data.get("modules", {})
+
+
+def resolve_modules(
+    names: List[str], use_cache: bool = False
+) -> Dict[str, List[str]]:
+    """Get the source files of several modules.
+
+    With `use_cache`, results are cached for the current environment
+    fingerprint, so resolving the same modules again doesn't search the
+    import paths.
+
+    Args:
+        names (List[str]): Names of the modules.
+        use_cache (bool, optional): Whether to read and update the cache.
+            Defaults to False.
+
+    Returns:
+        Dict[str, List[str]]: Source files of each module.
+    """
+    fingerprint = environment_fingerprint()
+    path = cache_dir() / CACHE_FILE
+
+    cached = _read_cache(path, fingerprint) if use_cache else {}
+    resolved = {}
+
+    for name in names:
+        if name not in cached:
+            cached[name] = resolve_module(name)
+            resolved[name] = cached[name]
+
+    if use_cache and resolved:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp = path.with_name(f"{CACHE_FILE}.{os.getpid()}")
+            with open(temp, "w") as f:
+                json.dump({"fingerprint": fingerprint, "modules": cached}, f)
+            os.replace(temp, path)
+        except OSError:
+            pass  # The cache is only an optimization.
+
+    return {name: cached[name] for name in names}
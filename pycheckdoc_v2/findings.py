@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Findings reported by the checks"""
+
+from typing import NamedTuple, Optional, Tuple
+
+
+class Finding(NamedTuple):
+    """A missing or invalid piece of documentation.
+
+    `kind` is one of "module", "function", "class" or "method". Method
+    names are given as `Class.method`. Findings of notebooks have the
+    position of their cell in `cell` and the line in that cell in `line`.
+    """
+
+    path: str
+    line: int
+    kind: str
+    name: str
+    err: Optional[str] = None
+    cell: Optional[int] = None
+
+
+def path_order(path: str) -> Tuple[str, ...]:
+    """Get the key that sorts paths in path order.
+
+    Paths are compared by their components, so a directory's files come
+    right after the directory, the order in which they are walked.
+
+    Args:
+        path (str): Path to sort.
+
+    Returns:
+        Tuple[str, ...]: Components of the path.
+    """
+    return tuple(path.replace("\\", "/").split("/"))
+
+
+def finding_order(finding: Finding) -> Tuple[Tuple[str, ...], int]:
+    """Get the key that sorts findings in path and line order.
+
+    Args:
+        finding (Finding): Finding to sort.
+
+    Returns:
+        Tuple[Tuple[str, ...], int]: Path components and line of the
+            finding.
+    """
+    return (path_order(finding.path), finding.line)
+
+
+def check_error(path: str, error: Exception) -> Finding:
+    """Get the finding of a file that couldn't be checked, e.g. because
+    it isn't valid Python, so that it's reported and counted like the
+    findings of the files that could.
+
+    Args:
+        path (str): Path to the file.
+        error (Exception): Why the file couldn't be checked.
+
+    Returns:
+        Finding: A module finding with the error.
+    """
+    return Finding(
+        path, 0, "module", "", f"can't check: {type(error).__name__}: {error}"
+    )
@@ -0,0 +1,650 @@
+#!/usr/bin/env python3
+"""Insert docstring skeletons where documentation is missing"""
+
+import ast
+import difflib
+import io
+import os
+import re
+import tempfile
+import textwrap
+import tokenize
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+# Local
+from pycheckdoc_v2.archives import split_archive_path
+from pycheckdoc_v2.check_docstring import (
+    _raise_nodes,
+    _returns_and_raises,
+    get_arg_names,
+)
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.generate_ast import parse_module
+from pycheckdoc_v2.notebooks import is_notebook
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet
+from pycheckdoc_v2.shard import relative_path
+
+# Where docstring lines are wrapped, like the code of this package.
+LINE_LENGTH = 79
+
+# Placeholder for the descriptions left to write.
+PLACEHOLDER = "TODO"
+
+# Byte range of the source to replace and the bytes to replace it with.
+Edit = Tuple[int, int, bytes]
+
+Definition = Union[ast.Module, ast.ClassDef, ast.FunctionDef]
+
+_NEWLINE = re.compile(rb"\r\n|\r|\n")
+
+# Stands for the spaces of the names of entries while they are wrapped.
+_UNBREAKABLE = "\0"
+
+# Rules of the current worker process and whether to write the fixes,
+# set once by `init_fixer`.
+_rules: RuleSet = DEFAULT_RULES
+_write = True
+
+
+class FixResult(NamedTuple):
+    """Docstrings inserted in a file.
+
+    `diff` is the unified diff of the fixes if they weren't written and
+    `error` why the file couldn't be fixed, if it couldn't.
+    """
+
+    path: str
+    inserted: int
+    diff: str = ""
+    error: Optional[str] = None
+
+
+class _Source:
+    """Source of a module, to turn AST positions into byte offsets.
+
+    Columns of the AST count UTF-8 bytes, so they are only converted
+    for files in another encoding.
+    """
+
+    def __init__(self, content: bytes) -> None:
+        """Index the lines of the source.
+
+        Args:
+            content (bytes): Source of the module.
+        """
+        self.content = content
+        self.encoding, _ = tokenize.detect_encoding(
+            io.BytesIO(content).readline
+        )
+
+        # The BOM only comes before the first line.
+        bom = 0
+        if self.encoding == "utf-8-sig":
+            self.encoding = "utf-8"
+            bom = 3
+
+        self.starts = [bom] + [m.end() for m in _NEWLINE.finditer(content)]
+
+        newline = _NEWLINE.search(content)
+        self.newline = newline.group().decode() if newline else "\n"
+
+    def offset(self, line: int, col: int) -> int:
+        """Get the byte offset of a position of the AST.
+
+        Args:
+            line (int): Line, from 1.
+            col (int): UTF-8 byte offset in the line.
+
+        Returns:
+            int: Offset in the source.
+        """
+        start = self.starts[line - 1]
+
+        if self.encoding == "utf-8":
+            return start + col
+
+        end = self.starts[line] if line < len(self.starts) else None
+        text = self.content[start:end].decode(self.encoding)
+        prefix = text.encode("utf-8")[:col].decode("utf-8")
+
+        return start + len(prefix.encode(self.encoding))
+
+    def segment(self, node: ast.AST) -> str:
+        """Get the source of a node, on one line.
+
+        Args:
+            node (ast.AST): Expression node.
+
+        Returns:
+            str: The source, with its whitespace collapsed.
+        """
+        start = self.offset(node.lineno, node.col_offset)  # type: ignore
+        end = self.offset(
+            node.end_lineno, node.end_col_offset  # type: ignore
+        )
+        return " ".join(self.content[start:end].decode(self.encoding).split())
+
+    def indentation(self, line: int) -> str:
+        """Get the indentation of a line.
+
+        Args:
+            line (int): Line, from 1.
+
+        Returns:
+            str: Leading spaces and tabs of the line.
+        """
+        start = self.starts[line - 1]
+        end = self.starts[line] if line < len(self.starts) else None
+        text = self.content[start:end].decode(self.encoding)
+        return text[: len(text) - len(text.lstrip(" \t"))]
+
+
+def _escape(text: str) -> str:
+    """Escape text taken from the source for a docstring.
+
+    Args:
+        text (str): Text to escape.
+
+    Returns:
+        str: The text, with backslashes and triple quotes escaped.
+    """
+    return text.replace("\\", "\\\\").replace('"""', '\\"\\"\\"')
+
+
+def _entry(name: str, description: str, indent: str) -> List[str]:
+    """Format an entry of a section, wrapped at `LINE_LENGTH`.
+
+    Args:
+        name (str): Name of the entry, with its type if any.
+        description (str): Description of the entry.
+        indent (str): Indentation of the entry.
+
+    Returns:
+        List[str]: Lines of the entry. The name and its type stay on the
+            first line so the entry is still recognized.
+    """
+    lines = textwrap.wrap(
+        f"{name.replace(' ', _UNBREAKABLE)}: {description}",
+        LINE_LENGTH,
+        initial_indent=indent,
+        subsequent_indent=indent + "    ",
+        break_long_words=False,
+        break_on_hyphens=False,
+    )
+    return [line.replace(_UNBREAKABLE, " ") for line in lines]
+
+
+def _arguments(
+    func_node: ast.FunctionDef, source: _Source, is_method: bool
+) -> List[Tuple[str, str]]:
+    """Describe the arguments of a function.
+
+    Args:
+        func_node (ast.FunctionDef): Function node.
+        source (_Source): Source of the module.
+        is_method (bool): Whether the function is a method.
+
+    Returns:
+        List[Tuple[str, str]]: Name with type and description of each
+            argument, in the order of `get_arg_names`.
+    """
+    arguments = func_node.args
+    positional = [*arguments.posonlyargs, *arguments.args]
+
+    # Defaults belong to the last positional arguments.
+    names = [arg.arg for arg in positional]
+    first_default = len(names) - len(arguments.defaults)
+    defaults: Dict[str, Optional[ast.expr]] = dict(
+        zip(names[first_default:], arguments.defaults)
+    )
+    defaults.update(
+        (arg.arg, default)
+        for arg, default in zip(arguments.kwonlyargs, arguments.kw_defaults)
+    )
+
+    nodes = {arg.arg: arg for arg in [*positional, *arguments.kwonlyargs]}
+    stars = {}
+    if arguments.vararg:
+        nodes[arguments.vararg.arg] = arguments.vararg
+        stars[arguments.vararg.arg] = "*"
+    if arguments.kwarg:
+        nodes[arguments.kwarg.arg] = arguments.kwarg
+        stars[arguments.kwarg.arg] = "**"
+
+    described = []
+
+    for name in get_arg_names(func_node, is_method):
+        arg = nodes[name]
+        default = defaults.get(name)
+
+        kinds = []
+        if arg.annotation is not None:
+            kinds.append(_escape(source.segment(arg.annotation)))
+        if default is not None:
+            kinds.append("optional")
+
+        label = stars.get(name, "") + name
+        if kinds:
+            label += f" ({', '.join(kinds)})"
+
+        description = f"{PLACEHOLDER}."
+        if default is not None:
+            description += f" Defaults to {_escape(source.segment(default))}."
+
+        described.append((label, description))
+
+    return described
+
+
+def _raised(func_node: ast.FunctionDef, source: _Source) -> List[str]:
+    """Get the exceptions a function raises, like `_returns_and_raises`
+    counts them.
+
+    Args:
+        func_node (ast.FunctionDef): Function node.
+        source (_Source): Source of the module.
+
+    Returns:
+        List[str]: Names of the exceptions, in the order of the source.
+    """
+    raised = []
+
+    for node in _raise_nodes(func_node):
+        exc = node.exc.func if isinstance(node.exc, ast.Call) else node.exc
+        name = _escape(source.segment(exc))  # type: ignore
+        raised.append((node.lineno, node.col_offset, name))
+
+    return list(dict.fromkeys(name for *_, name in sorted(raised)))
+
+
+def docstring_skeleton(
+    node: Definition, source: _Source, indent: str, is_method: bool = False
+) -> str:
+    """Write a Google style docstring for a definition, with sections for
+    the arguments, raised exceptions and return value of functions.
+
+    Descriptions are left to write, marked with `PLACEHOLDER`.
+
+    Args:
+        node (Definition): Module, class or function node.
+        source (_Source): Source of the module.
+        indent (str): Indentation of the body of the definition.
+        is_method (bool, optional): Whether the function is a method.
+            Defaults to False.
+
+    Returns:
+        str: The docstring, with its quotes but without indentation
+            before the opening quotes.
+    """
+    if isinstance(node, ast.Module):
+        return f'"""{PLACEHOLDER}: Describe the module."""'
+
+    summary = f"{PLACEHOLDER}: Describe `{node.name}`."
+
+    if isinstance(node, ast.ClassDef):
+        return f'"""{summary}"""'
+
+    sections: List[Tuple[str, List[Tuple[str, str]]]] = []
+    entry_indent = indent + "    "
+
+    arguments = _arguments(node, source, is_method)
+    if arguments:
+        sections.append(("Args", arguments))
+
+    raised = _raised(node, source)
+    if raised:
+        sections.append(
+            ("Raises", [(name, f"{PLACEHOLDER}.") for name in raised])
+        )
+
+    returns, _ = _returns_and_raises(node)
+    annotation = node.returns
+    if annotation is not None and source.segment(annotation) != "None":
+        returns = True
+    if returns and node.name != "__init__":
+        if annotation is None:
+            entry = (PLACEHOLDER, "Describe the return value.")
+        else:
+            entry = (_escape(source.segment(annotation)), f"{PLACEHOLDER}.")
+        sections.append(("Returns", [entry]))
+
+    if not sections:
+        return f'"""{summary}"""'
+
+    lines = [f'"""{summary}']
+
+    for title, entries in sections:
+        lines += ["", f"{indent}{title}:"]
+        for name, description in entries:
+            lines += _entry(name, description, entry_indent)
+
+    lines.append(f'{indent}"""')
+
+    return source.newline.join(lines)
+
+
+def _first_line(node: ast.stmt) -> int:
+    """Get the first line of a statement, including its decorators.
+
+    Args:
+        node (ast.stmt): Statement node.
+
+    Returns:
+        int: The line.
+    """
+    decorators = getattr(node, "decorator_list", [])
+    return min([node.lineno, *(d.lineno for d in decorators)])
+
+
+def _body_on_own_line(node: Definition, source: _Source) -> bool:
+    """Check if the body of a definition starts on a line of its own,
+    rather than after the colon of the definition.
+
+    Args:
+        node (Definition): Class or function node.
+        source (_Source): Source of the module.
+
+    Returns:
+        bool: True if the first statement starts its line.
+    """
+    first = node.body[0]
+    start = source.offset(first.lineno, first.col_offset)
+    before = source.content[source.starts[first.lineno - 1]:start]
+
+    return _first_line(first) < first.lineno or not before.strip()
+
+
+def _indent_unit(definitions: List[Definition], source: _Source) -> str:
+    """Get the indentation a block adds in a module, from the first
+    definition whose body is on lines of its own.
+
+    Args:
+        definitions (List[Definition]): Class and function nodes.
+        source (_Source): Source of the module.
+
+    Returns:
+        str: The indentation the body adds to the line of the definition,
+            or 4 spaces if no definition tells.
+    """
+    for node in definitions:
+        if not _body_on_own_line(node, source):
+            continue
+
+        outer = source.indentation(node.lineno)
+        inner = source.indentation(_first_line(node.body[0]))
+        if inner.startswith(outer) and len(inner) > len(outer):
+            return inner[len(outer):]
+
+    return "    "
+
+
+def plan_edit(
+    node: Definition,
+    source: _Source,
+    is_method: bool = False,
+    indent_unit: str = "    ",
+) -> Edit:
+    """Plan the insertion of a docstring skeleton in a definition.
+
+    The skeleton goes on its own line before the first statement of the
+    body. A body on the same line as the definition is moved to the next
+    line. Either way it is indented by the exact indentation of the line
+    of the definition followed by one indent unit, so tabs and spaces are
+    kept as they are.
+
+    Args:
+        node (Definition): Module, class or function node.
+        source (_Source): Source of the module.
+        is_method (bool, optional): Whether the function is a method.
+            Defaults to False.
+        indent_unit (str, optional): Indentation a block adds in the
+            module, for a body on the line of the definition.
+            Defaults to 4 spaces.
+
+    Returns:
+        Edit: The insertion.
+    """
+    newline = source.newline
+    encoding = source.encoding
+
+    if isinstance(node, ast.Module):
+        docstring = docstring_skeleton(node, source, "")
+
+        if not node.body:
+            end = len(source.content)
+            text = docstring + newline
+            if source.content and not source.content.endswith(
+                (b"\n", b"\r")
+            ):
+                text = newline + text
+            return (end, end, text.encode(encoding))
+
+        start = source.starts[_first_line(node.body[0]) - 1]
+        return (start, start, (docstring + newline).encode(encoding))
+
+    first = node.body[0]
+    line = _first_line(first)
+    outer = source.indentation(node.lineno)
+
+    if _body_on_own_line(node, source):
+        # The indentation of the definition followed by the unit of the
+        # body is the indentation of the body. A body that doesn't start
+        # with the indentation of the definition, which Python allows for
+        # some mixes of tabs and spaces, is followed as it is too.
+        indent = source.indentation(line)
+        docstring = docstring_skeleton(node, source, indent, is_method)
+        start = source.starts[line - 1]
+        text = indent + docstring + newline
+        if isinstance(node, ast.ClassDef):
+            text += newline  # Like the classes of this package.
+        return (start, start, text.encode(encoding))
+
+    # The body is on the line of the definition, after its colon.
+    indent = outer + indent_unit
+    docstring = docstring_skeleton(node, source, indent, is_method)
+    start = source.offset(first.lineno, first.col_offset)
+    colon = start
+    while source.content[colon - 1] in b" \t":
+        colon -= 1
+    text = newline + indent + docstring + newline + indent
+
+    return (colon, start, text.encode(encoding))
+
+
+def plan_edits(
+    module_node: ast.Module, source: _Source, findings: List[Finding]
+) -> List[Edit]:
+    """Plan the insertion of docstring skeletons for the definitions
+    reported as undocumented.
+
+    Definitions with a docstring that the rules reject, e.g. one that is
+    too short, are left as they are.
+
+    Args:
+        module_node (ast.Module): AST of the module.
+        source (_Source): Source of the module.
+        findings (List[Finding]): Findings of the module.
+
+    Returns:
+        List[Edit]: The insertions, sorted by offset.
+    """
+    definitions: Dict[Tuple[str, str, int], Tuple[Definition, bool]] = {
+        ("module", "", 0): (module_node, False)
+    }
+
+    for node in module_node.body:
+        if type(node) is ast.FunctionDef:
+            definitions[("function", node.name, node.lineno)] = (node, False)
+        elif type(node) is ast.ClassDef:
+            definitions[("class", node.name, node.lineno)] = (node, False)
+            for method in node.body:
+                if type(method) is ast.FunctionDef:
+                    key = ("method", f"{node.name}.{method.name}")
+                    definitions[(*key, method.lineno)] = (method, True)
+
+    edits = []
+    # Found once there is a definition to fix.
+    indent_unit: Optional[str] = None
+
+    for finding in findings:
+        if finding.err is not None:
+            continue
+
+        definition = definitions.get(
+            (finding.kind, finding.name, finding.line)
+        )
+        if definition is None:
+            continue
+
+        node, is_method = definition
+        if ast.get_docstring(node, clean=False) is None:
+            if indent_unit is None:
+                indent_unit = _indent_unit(
+                    [node for node, _ in list(definitions.values())[1:]],
+                    source,
+                )
+            edits.append(plan_edit(node, source, is_method, indent_unit))
+
+    return sorted(edits, key=lambda edit: edit[0])
+
+
+def apply_edits(content: bytes, edits: List[Edit]) -> bytes:
+    """Splice edits into a source. Bytes outside of the edits are copied
+    as they are.
+
+    Args:
+        content (bytes): The source.
+        edits (List[Edit]): Edits that don't overlap, sorted by offset.
+
+    Returns:
+        bytes: The edited source.
+    """
+    parts = []
+    position = 0
+
+    for start, end, text in edits:
+        parts += [content[position:start], text]
+        position = end
+
+    parts.append(content[position:])
+
+    return b"".join(parts)
+
+
+def write_atomic(path: str, content: bytes) -> None:
+    """Replace a file in one step, so it is never seen half written.
+
+    The content is written to a temporary file next to it, which then
+    takes its place with the permissions of the original.
+
+    Args:
+        path (str): Path to the file.
+        content (bytes): New content of the file.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    fd, temp = tempfile.mkstemp(prefix=f".{name}.", dir=directory)
+
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(content)
+            f.flush()
+            os.fsync(f.fileno())
+        os.chmod(temp, os.stat(path).st_mode & 0o7777)
+        os.replace(temp, path)
+    except BaseException:
+        os.unlink(temp)
+        raise
+
+
+def unified_diff(path: str, before: bytes, after: bytes, encoding: str) -> str:
+    """Get the unified diff of a fix. Paths in the working directory get
+    `a/` and `b/` prefixes so the diff can be applied with `git apply`.
+
+    Args:
+        path (str): Path to the file.
+        before (bytes): Source before the fix.
+        after (bytes): Source after the fix.
+        encoding (str): Encoding of the source.
+
+    Returns:
+        str: The diff.
+    """
+    name = relative_path(path)
+    if name.startswith("../"):
+        old, new = path, path  # Outside of the working directory.
+    else:
+        old, new = f"a/{name}", f"b/{name}"
+
+    return "".join(
+        difflib.unified_diff(
+            before.decode(encoding).splitlines(keepends=True),
+            after.decode(encoding).splitlines(keepends=True),
+            old,
+            new,
+        )
+    )
+
+
+def is_fixable(path: str) -> bool:
+    """Check if a file can be fixed in place.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        bool: False for archive members and notebooks.
+    """
+    return split_archive_path(path) is None and not is_notebook(path)
+
+
+def init_fixer(rules: Optional[RuleSet], write: bool = True) -> None:
+    """Set the rules used by `fix_file` in this process.
+
+    Args:
+        rules (RuleSet | None): Compiled rules to apply.
+        write (bool, optional): Whether to write the fixes, else only
+            give their diff. Defaults to `True`.
+    """
+    global _rules, _write
+    _rules = rules or DEFAULT_RULES
+    _write = write
+
+
+def fix_file(path: str) -> FixResult:
+    """Insert docstring skeletons in a file with the worker's rules.
+
+    The file is read and parsed once. All its edits are spliced into the
+    original bytes and, if the result still parses, it is written once.
+
+    Args:
+        path (str): Path to the file.
+
+    Returns:
+        FixResult: Number of docstrings inserted and the diff if the
+            fixes aren't written.
+    """
+    try:
+        with open(path, "rb") as f:
+            content = f.read()
+
+        module_node = parse_module(path, content)
+        source = _Source(content)
+        findings = check_module_node((path, module_node), _rules)
+        edits = plan_edits(module_node, source, findings)
+
+        if not edits:
+            return FixResult(path, 0)
+
+        fixed = apply_edits(content, edits)
+        ast.parse(fixed)
+
+        if not _write:
+            diff = unified_diff(path, content, fixed, source.encoding)
+            return FixResult(path, len(edits), diff)
+
+        write_atomic(path, fixed)
+    except (OSError, SyntaxError, ValueError) as e:
+        return FixResult(path, 0, error=str(e))
+
+    return FixResult(path, len(edits))
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""flake8 plugin that checks documentation on the tree flake8 parsed"""
+
+import ast
+import sys
+from typing import Any, Iterator, List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2 import VERSION
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.config import load_config
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.rules import RuleSet, compile_rules
+
+CODES = {
+    "module": "DOC100",
+    "function": "DOC101",
+    "class": "DOC102",
+    "method": "DOC103",
+}
+
+# Problems in the content of a docstring.
+CONTENT_CODE = "DOC110"
+
+# Options that need an index of the whole project, which a plugin that
+# sees one file at a time doesn't have.
+PROJECT_OPTIONS = ("inherit-docs", "public-api")
+
+
+def format_finding(finding: Finding) -> str:
+    """Format a finding as a flake8 message.
+
+    Args:
+        finding (Finding): Finding to format.
+
+    Returns:
+        str: The message, starting with its code.
+    """
+    if finding.err:
+        return f"{CONTENT_CODE} {finding.kind} '{finding.name}': {finding.err}"
+
+    if finding.kind == "module":
+        return f"{CODES['module']} Missing module docstring"
+
+    code = CODES[finding.kind]
+    return f"{code} Missing docstring in {finding.kind} '{finding.name}'"
+
+
+class DocChecker:
+    """flake8 plugin running the pycheckdoc_v2 checks on the AST that
+    flake8 has already parsed, so files are neither read nor parsed
+    again.
+    """
+
+    name = "pycheckdoc"
+    version = VERSION
+
+    # Compiled once in flake8's main process and inherited by its workers.
+    rules: Optional[RuleSet] = None
+
+    def __init__(self, tree: ast.Module, filename: str = "stdin") -> None:
+        """Initialize the checker for a file.
+
+        Args:
+            tree (ast.Module): AST of the file parsed by flake8.
+            filename (str, optional): Path of the file.
+                Defaults to "stdin".
+        """
+        self.tree = tree
+        self.filename = filename
+
+    @classmethod
+    def add_options(cls, option_manager: Any) -> None:
+        """Register the plugin options with flake8.
+
+        Args:
+            option_manager (Any): flake8's option manager.
+        """
+        option_manager.add_option(
+            "--pycheckdoc-config",
+            default=None,
+            parse_from_config=True,
+            help="Path to a pyproject.toml with a [tool.pycheckdoc] table. "
+            + "Defaults to the nearest pyproject.toml.",
+        )
+
+    @classmethod
+    def parse_options(cls, options: Any) -> None:
+        """Compile the rules from the parsed flake8 options.
+
+        `inherit-docs` and `public-api` are turned off with a warning, as
+        the plugin checks each file on its own.
+
+        Args:
+            options (Any): Options parsed by flake8.
+        """
+        config_path = getattr(options, "pycheckdoc_config", None)
+        rules = compile_rules(load_config(config_path))
+
+        if rules.needs_hierarchy:
+            print(
+                "pycheckdoc: "
+                + ", ".join(PROJECT_OPTIONS)
+                + " are ignored by the flake8 plugin, run pycheckdoc instead",
+                file=sys.stderr,
+            )
+            rules = rules.with_config(
+                {option: False for option in PROJECT_OPTIONS}
+            )
+
+        cls.rules = rules
+
+    def run(self) -> Iterator[Tuple[int, int, str, type]]:
+        """Check the file.
+
+        Returns:
+            Iterator[Tuple[int, int, str, type]]: Tuples of line, column,
+                message and checker type, as flake8 expects.
+        """
+        findings: List[Finding] = check_module_node(
+            (self.filename, self.tree), self.rules
+        )
+
+        for finding in findings:
+            yield (
+                max(finding.line, 1),
+                0,
+                format_finding(finding),
+                type(self),
+            )
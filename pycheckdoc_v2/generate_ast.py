@@ -2,16 +2,45 @@
 """Generate ASTs for the modules to be checked"""
 
 import ast
+import os
 import sys
 from pathlib import Path
 from pebble import ProcessPool  # type: ignore
-from typing import List, Optional, Set, Tuple
+from typing import Iterable, Iterator, List, Optional, Set, Tuple
+
+# Local
+from pycheckdoc_v2.archives import (
+    is_archive,
+    iter_archive_members,
+    open_member,
+    read_member,
+    split_archive_path,
+)
+from pycheckdoc_v2.findings import path_order
+from pycheckdoc_v2.notebooks import NotebookSource, is_notebook, read_notebook
+from pycheckdoc_v2.shard import in_shard
+from pycheckdoc_v2.stubs import (
+    SOURCE_SUFFIXES,
+    STUB_SUFFIX,
+    is_paired_stub,
+    merge_stub,
+    missing_docstrings,
+    stub_path,
+)
+from pycheckdoc_v2.walk_cache import WalkCache, scan_directory
+from pycheckdoc_v2.workers import default_workers
 
 
 def get_module_node(path: str) -> Optional[Tuple[str, ast.Module]]:
     """Read file at path and convert its source code
     into an ast. Generate the ast as a module node.
 
+    Paths of the form `archive!member` are read straight from the
+    archive. Definitions without a docstring of a .py file get the
+    docstring of their `.pyi` stub, if there is one. The module of a
+    notebook is the source of its code cells, and its node has their
+    `CellMap` as `cell_map` to locate findings in the cells.
+
     Args:
         path (str): Path to the file to read.
 
@@ -20,20 +49,317 @@ def get_module_node(path: str) -> Optional[Tuple[str, ast.Module]]:
             ast module node if the file has content,
             else None if file is empty.
     """
+    if is_notebook(path):
+        notebook = load_notebook(path)
+        if not notebook.source:
+            return None
+        module_node = ast.parse(notebook.source)
+        module_node.cell_map = notebook.cell_map  # type: ignore
+        return (path, module_node)
+
+    content = read_source(path)
+
+    if not content:
+        return None
+
+    return (path, parse_module(path, content))
+
+
+def parse_module(path: str, content: bytes) -> ast.Module:
+    """Parse the source of a module. Definitions without a docstring get
+    the docstring of the module's `.pyi` stub, if there is one.
+
+    Args:
+        path (str): Path to the module, or `archive!member`.
+        content (bytes): Source of the module.
+
+    Returns:
+        ast.Module: The module node.
+    """
+    module_node = ast.parse(content)
+
+    if missing_docstrings(module_node):
+        stub = read_stub(path)
+        if stub:
+            merge_stub(module_node, ast.parse(stub))
+
+    return module_node
+
+
+def read_source(path: str) -> bytes:
+    """Read the source of a module, from disk or from an archive.
+
+    The source of a notebook is the source of its code cells.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        bytes: The source. Its encoding is left to the parser.
+    """
+    if is_notebook(path):
+        return load_notebook(path).source
+
+    member = split_archive_path(path)
+
+    if member:
+        return read_member(*member)
+
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def load_notebook(path: str) -> NotebookSource:
+    """Read the code cells of a notebook, from disk or from an archive.
+
+    The notebook is read a chunk at a time, so its outputs are never
+    held in memory whole.
+
+    Args:
+        path (str): Path to the notebook, or `archive!member`.
+
+    Raises:
+        ValueError: If the notebook isn't valid JSON.
+
+    Returns:
+        NotebookSource: The source of its code cells and where each cell
+            starts in it.
+    """
+    member = split_archive_path(path)
+
+    if member:
+        with open_member(*member) as f:
+            return read_notebook(f)
+
+    with open(path, "rb") as f:
+        return read_notebook(f)
+
+
+def read_stub(path: str) -> Optional[bytes]:
+    """Read the `.pyi` stub of a module, if there is one.
+
+    Only the sibling of the module is looked up, no directory is
+    searched.
+
+    Args:
+        path (str): Path to the module, or `archive!member`.
+
+    Returns:
+        bytes | None: Source of the stub, or None if there's none.
+    """
+    stub = stub_path(path)
+
+    if stub is None:
+        return None
+
+    try:
+        return read_source(stub)
+    except (OSError, KeyError):
+        return None
+
+
+def walk_directory(
+    directory: str,
+    recursive: bool = False,
+    walk_cache: Optional[WalkCache] = None,
+) -> Iterator[str]:
+    """Lazily find the .py, .pyi and .ipynb files of a directory in path
+    order.
+
+    Only the entries of one directory are sorted at a time, so files are
+    yielded in a stable order without listing the whole tree first.
+    Stubs are paired with their .py sibling from the same listing and
+    only the .py file is yielded.
+
+    Args:
+        directory (str): Directory to walk.
+        recursive (bool, optional): Walk child directories too.
+            Defaults to `False`.
+        walk_cache (WalkCache | None, optional): Cache of the listings of
+            unchanged directories. Defaults to None.
+
+    Returns:
+        Iterator[str]: Paths of the files.
+    """
+    if walk_cache is not None:
+        entries = walk_cache.list_directory(directory)
+    else:
+        entries = scan_directory(directory)
+
+    files = {name for name, is_dir in entries if not is_dir}
+
+    for name, is_dir in entries:
+        path = os.path.join(directory, name)
+
+        if not is_dir and is_paired_stub(name, files):
+            continue
+
+        if not is_dir:
+            yield path
+        elif recursive:
+            yield from walk_directory(path, recursive, walk_cache)
+
+
+def iter_paths(
+    paths: Iterable[str],
+    recursive: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    walk_cache: Optional[WalkCache] = None,
+) -> Iterator[str]:
+    """Lazily validate given paths by checking if they exist.
+    Also iterate over directories given so as to include .py, .pyi and
+    .ipynb files in them.
+
+    Files are yielded as soon as they are found and duplicates are
+    skipped. All yielded paths are absolute. Files of a directory are
+    yielded in path order, so the order only depends on the tree.
+
+    Wheels, zip files and gzipped tarballs given as paths yield their
+    .py, .pyi and .ipynb members as `archive!member`, without extracting
+    them.
+
+    Stubs are paired with their .py sibling whether they are found in a
+    directory or given, so a stub given with its .py file, or on its own,
+    yields the .py file once.
+
+    Args:
+        paths (Iterable[str]): Paths to validate.
+
+        recursive (Bool): Check directories recursively. Defaults to `False`.
+
+        shard (Tuple[int, int] | None): Only keep the files assigned to
+            this shard, given as (i, N). Defaults to `None`.
+
+        walk_cache (WalkCache | None): Cache of the listings of unchanged
+            directories. Defaults to `None`.
+
+    Returns:
+        Iterator[str]: Valid paths. This includes the files from
+            directories given.
+    """
+    seen: Set[str] = set()
+
+    for path in paths:
+        file_path = Path(path)
+
+        if not file_path.exists():
+            continue
+
+        # Use absolute paths of the files to avoid later
+        # inconveniences when reading from the file.
+        if file_path.is_file() and file_path.suffix in SOURCE_SUFFIXES:
+            files: Iterable[str] = [paired_module(str(file_path.absolute()))]
+        elif file_path.is_file() and is_archive(file_path):
+            files = iter_archive_members(str(file_path.absolute()))
+        elif file_path.is_dir():
+            files = walk_directory(
+                str(file_path.absolute()), recursive, walk_cache
+            )
+        else:
+            continue
 
-    with open(path) as f:
-        content = f.read()
+        for absolute in files:
+            if absolute in seen or not in_shard(absolute, shard):
+                continue
 
-    if content:
-        return (path, ast.parse(content))
+            seen.add(absolute)
+            yield absolute
 
-    return None
 
+def paired_module(path: str) -> str:
+    """Get the file a file given to check is checked as. A stub with a
+    .py sibling is checked with it, as in a directory.
 
-def validate_paths(paths: List[str], recursive: bool = False) -> Set[str]:
+    Args:
+        path (str): Absolute path to the file.
+
+    Returns:
+        str: Path to the .py sibling of a paired stub, else path.
+    """
+    if path.endswith(STUB_SUFFIX) and os.path.isfile(path[:-1]):
+        return path[:-1]
+
+    return path
+
+
+def sort_paths(paths: Iterable[str]) -> List[str]:
+    """Sort paths to check in path order, so that the files found by
+    `iter_paths` come in path order too, as the files of a directory are
+    walked in path order.
+
+    Args:
+        paths (Iterable[str]): Paths to files / directories.
+
+    Returns:
+        List[str]: The paths, sorted by their absolute path.
+    """
+    return sorted(paths, key=lambda path: path_order(os.path.abspath(path)))
+
+
+def read_path_list(source: str, chunk_size: int = 1 << 16) -> Iterator[str]:
+    """Lazily read a list of paths from a file or the standard input.
+
+    Paths are separated by NUL characters, e.g. from `git ls-files -z`,
+    if any is found in the data read up to the first separator, else by
+    newlines. Empty entries are skipped.
+
+    Args:
+        source (str): Path to the file with the list, or "-" to read the
+            standard input.
+        chunk_size (int, optional): Number of bytes read at a time.
+            Defaults to 64 KiB.
+
+    Returns:
+        Iterator[str]: The paths in the list.
+    """
+    if source == "-":
+        stream = sys.stdin.buffer
+    else:
+        stream = open(source, "rb")
+
+    separator = None
+    pending = b""
+
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+
+            pending += chunk
+
+            if separator is None:
+                if b"\0" in pending:
+                    separator = b"\0"
+                elif b"\n" in pending:
+                    separator = b"\n"
+                else:
+                    continue
+
+            *entries, pending = pending.split(separator)
+
+            for entry in entries:
+                entry = entry.strip(b"\r") if separator == b"\n" else entry
+                if entry:
+                    yield os.fsdecode(entry)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+    pending = pending.strip(b"\r\n") if separator != b"\0" else pending
+    if pending:
+        yield os.fsdecode(pending)
+
+
+def validate_paths(
+    paths: List[str],
+    recursive: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    walk_cache: Optional[WalkCache] = None,
+) -> Set[str]:
     """Validate given paths by checking if they exist.
-    Also iterate over directories given so as to include .py files
-    in them.
+    Also iterate over directories given so as to include .py, .pyi and
+    .ipynb files in them.
 
     All returned paths are absolute. This helps in removing
     duplicates and also help avoid any FileNotFoundError when reading
@@ -44,35 +370,24 @@ def validate_paths(paths: List[str], recursive: bool = False) -> Set[str]:
 
         recursive (Bool): Check directories recursively. Defaults to `False`.
 
+        shard (Tuple[int, int] | None): Only keep the files assigned to
+            this shard, given as (i, N). Defaults to `None`.
+
+        walk_cache (WalkCache | None): Cache of the listings of unchanged
+            directories. Defaults to `None`.
+
     Returns:
         Set[str]: Set of valid paths. This includes the files
             from directories given.
     """
-    valid_paths = []
-
-    for path in paths:
-        file_path = Path(path)
-
-        if file_path.exists():
-            if file_path.is_file() and file_path.suffix == ".py":
-                valid_paths.append(str(file_path.absolute()))
-            elif file_path.is_dir():
-                if recursive:  # Get all .py files in all child directories.
-                    files = file_path.glob("**/*.py")
-                else:  # Get .py files in this directory only.
-                    files = file_path.glob("*.py")
-
-                # Add absolute paths of the files to avoid later inconveniences
-                # when reading from the file.
-                valid_paths.extend(
-                    list(map(lambda x: str(x.absolute()), list(files)))
-                )
-
-    return set(valid_paths)  # Remove duplicates
+    return set(iter_paths(paths, recursive, shard, walk_cache))
 
 
 def get_ast(
-    paths: List[str], recursive: bool = False
+    paths: List[str],
+    recursive: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    max_workers: Optional[int] = None,
 ) -> Optional[List[Tuple[str, ast.Module]]]:
     """Get the Abstract Syntax Trees(AST) of the modules pointed to
     by paths.
@@ -86,6 +401,12 @@ def get_ast(
 
         recursive (Bool): Check directories recursively. Defaults to `False`.
 
+        shard (Tuple[int, int] | None): Only parse the files assigned to
+            this shard, given as (i, N). Defaults to `None`.
+
+        max_workers (int | None): Number of worker processes. Defaults to
+            what the CPUs and memory available allow.
+
     Raises:
         TypeError: If paths is not a list this error is raised.
 
@@ -101,7 +422,7 @@ def get_ast(
     if len(paths) == 0:
         return None
 
-    valid_paths = validate_paths(paths, recursive)
+    valid_paths = validate_paths(paths, recursive, shard)
 
     if len(valid_paths) == 0:
         return None
@@ -109,8 +430,12 @@ def get_ast(
     modules = []
 
     # Read the files and parse them concurrently.
-    with ProcessPool() as pool:
-        future = pool.map(get_module_node, valid_paths)
+    with ProcessPool(max_workers=max_workers or default_workers()) as pool:
+        # Sorted for a stable output, which also reads the members of an
+        # archive in order.
+        future = pool.map(
+            get_module_node, sorted(valid_paths, key=path_order)
+        )
         try:
             for module in future.result():
                 if module:
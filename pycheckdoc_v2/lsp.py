@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""Language Server Protocol mode for checking unsaved buffers"""
+
+import ast
+import json
+import re
+import sys
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.check_class import check_class_doc
+from pycheckdoc_v2.check_function import check_function_doc
+from pycheckdoc_v2.check_module import check_module_doc
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.rules import DEFAULT_RULES, RuleSet
+
+# Lines that start a new top-level definition.
+DEFINITION_START = re.compile(r"(?:@|def\s|async\s+def\s|class\s)")
+
+# LSP constants
+TEXT_DOCUMENT_SYNC_FULL = 1
+SEVERITY_WARNING = 2
+
+
+def split_blocks(text: str) -> List[Tuple[int, str]]:
+    """Split source code into blocks that each start with a top-level
+    definition, or its decorators. Any code before the first definition
+    is a block of its own.
+
+    Args:
+        text (str): Source code.
+
+    Returns:
+        List[Tuple[int, str]]: Tuples of the 0-based line where a block
+            starts and the source of the block.
+    """
+    lines = text.splitlines(keepends=True)
+
+    blocks: List[Tuple[int, str]] = []
+    start = 0
+    decorated = False  # The current block only has decorators so far.
+
+    for number, line in enumerate(lines):
+        if not DEFINITION_START.match(line):
+            continue
+
+        if number != start and not decorated:
+            blocks.append((start, "".join(lines[start:number])))
+            start = number
+
+        decorated = line.startswith("@")
+
+    if lines:
+        blocks.append((start, "".join(lines[start:])))
+
+    return blocks
+
+
+def check_source(
+    path: str, text: str, rules: RuleSet, check_module: bool = True
+) -> List[Finding]:
+    """Parse and check source code.
+
+    Args:
+        path (str): Path reported in the findings.
+        text (str): Source code.
+        rules (RuleSet): Compiled rules to apply.
+        check_module (bool, optional): Whether to check the module
+            docstring. Defaults to True.
+
+    Raises:
+        SyntaxError: If the source can't be parsed.
+
+    Returns:
+        List[Finding]: Findings of the checks.
+    """
+    module_tuple = (path, ast.parse(text))
+    findings: List[Finding] = []
+
+    if check_module:
+        check_module_doc(module_tuple, False, rules, findings)
+    check_function_doc(module_tuple, False, rules, findings)
+    check_class_doc(module_tuple, False, rules, findings)
+
+    return findings
+
+
+class Document:
+    """An open text document.
+
+    Findings are cached for each top-level definition by its source, so
+    an edit only re-checks the definitions that changed.
+    """
+
+    def __init__(self, uri: str, rules: RuleSet) -> None:
+        """Initialize the document.
+
+        Args:
+            uri (str): URI of the document.
+            rules (RuleSet): Compiled rules to apply.
+        """
+        self.uri = uri
+        self.rules = rules
+        self.findings: List[Finding] = []
+        self.parsed_blocks = 0  # Blocks parsed by the last update.
+        self._cache: Dict[Tuple[bool, str], List[Finding]] = {}
+
+    def update(self, text: str) -> List[Finding]:
+        """Check the new text of the document.
+
+        If a changed block can't be parsed on its own, the whole document
+        is checked instead. If the document can't be parsed, e.g. while
+        a line is being typed, the previous findings are kept.
+
+        Args:
+            text (str): Full text of the document.
+
+        Returns:
+            List[Finding]: Findings of the document.
+        """
+        cache: Dict[Tuple[bool, str], List[Finding]] = {}
+        findings: List[Finding] = []
+        self.parsed_blocks = 0
+
+        for start, block in split_blocks(text):
+            # The first block is also checked for the module docstring.
+            key = (start == 0, block)
+
+            if key not in cache:
+                if key in self._cache:
+                    cache[key] = self._cache[key]
+                else:
+                    try:
+                        cache[key] = check_source(
+                            self.uri, block, self.rules, check_module=key[0]
+                        )
+                    except SyntaxError:
+                        return self._update_whole(text)
+                    self.parsed_blocks += 1
+
+            if start == 0:
+                findings.extend(cache[key])
+            else:
+                # Cached findings have lines relative to their block.
+                findings.extend(
+                    finding._replace(line=finding.line + start)
+                    for finding in cache[key]
+                )
+
+        self._cache = cache
+        self.findings = findings
+        return findings
+
+    def _update_whole(self, text: str) -> List[Finding]:
+        """Check the whole text of the document at once.
+
+        Args:
+            text (str): Full text of the document.
+
+        Returns:
+            List[Finding]: Findings of the document.
+        """
+        self.parsed_blocks = 1
+        self._cache = {}
+
+        try:
+            self.findings = check_source(self.uri, text, self.rules)
+        except SyntaxError:
+            pass
+
+        return self.findings
+
+
+def to_diagnostic(finding: Finding) -> Dict[str, Any]:
+    """Convert a finding to an LSP diagnostic.
+
+    Args:
+        finding (Finding): Finding to convert.
+
+    Returns:
+        Dict[str, Any]: The diagnostic.
+    """
+    line = max(finding.line - 1, 0)
+
+    if finding.kind == "module":
+        message = "Missing module docstring"
+    elif finding.err:
+        kind = finding.kind.capitalize()
+        message = f"{kind} '{finding.name}': {finding.err}"
+    else:
+        message = f"Missing docstring in {finding.kind} '{finding.name}'"
+
+    return {
+        "range": {
+            "start": {"line": line, "character": 0},
+            "end": {"line": line + 1, "character": 0},
+        },
+        "severity": SEVERITY_WARNING,
+        "source": "pycheckdoc",
+        "code": f"{finding.kind}_err",
+        "message": message,
+    }
+
+
+def read_message(stream: IO[bytes]) -> Optional[Dict[str, Any]]:
+    """Read a JSON-RPC message with its Content-Length header.
+
+    Args:
+        stream (IO[bytes]): Stream to read from.
+
+    Returns:
+        Dict[str, Any] | None: The message, or None at the end of the
+            stream.
+    """
+    length = 0
+
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+
+        line = line.strip()
+        if not line:
+            break
+
+        name, _, value = line.decode("ascii").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+
+    return json.loads(stream.read(length))
+
+
+def write_message(stream: IO[bytes], message: Dict[str, Any]) -> None:
+    """Write a JSON-RPC message with its Content-Length header.
+
+    Args:
+        stream (IO[bytes]): Stream to write to.
+        message (Dict[str, Any]): The message.
+    """
+    body = json.dumps(message).encode()
+
+    stream.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+    stream.write(body)
+    stream.flush()
+
+
+class LanguageServer:
+    """A language server that publishes missing documentation as
+    diagnostics of open documents.
+    """
+
+    def __init__(self, output: IO[bytes], rules: Optional[RuleSet] = None):
+        """Initialize the server.
+
+        Args:
+            output (IO[bytes]): Stream to write messages to.
+            rules (RuleSet | None, optional): Compiled rules to apply.
+                Defaults to None.
+        """
+        self.output = output
+        self.rules = rules or DEFAULT_RULES
+        self.documents: Dict[str, Document] = {}
+        self.shutdown = False
+
+    def handle(self, message: Dict[str, Any]) -> bool:
+        """Handle a message from the client.
+
+        Args:
+            message (Dict[str, Any]): The message.
+
+        Returns:
+            bool: False if the server should exit, else True.
+        """
+        method = message.get("method")
+        params = message.get("params") or {}
+
+        if method == "initialize":
+            self.respond(
+                message,
+                {
+                    "capabilities": {
+                        "textDocumentSync": TEXT_DOCUMENT_SYNC_FULL
+                    },
+                    "serverInfo": {"name": "pycheckdoc"},
+                },
+            )
+        elif method == "shutdown":
+            self.shutdown = True
+            self.respond(message, None)
+        elif method == "exit":
+            return False
+        elif method == "textDocument/didOpen":
+            document = params["textDocument"]
+            self.documents[document["uri"]] = Document(
+                document["uri"], self.rules
+            )
+            self.publish(document["uri"], document["text"])
+        elif method == "textDocument/didChange":
+            uri = params["textDocument"]["uri"]
+            if uri in self.documents and params["contentChanges"]:
+                self.publish(uri, params["contentChanges"][-1]["text"])
+        elif method == "textDocument/didClose":
+            uri = params["textDocument"]["uri"]
+            self.documents.pop(uri, None)
+            self.notify(
+                "textDocument/publishDiagnostics",
+                {"uri": uri, "diagnostics": []},
+            )
+        elif "id" in message and method is not None:
+            self.respond_error(message, -32601, f"Unknown method: {method}")
+
+        return True
+
+    def publish(self, uri: str, text: str) -> None:
+        """Check a document and publish its diagnostics.
+
+        Args:
+            uri (str): URI of the document.
+            text (str): Full text of the document.
+        """
+        findings = self.documents[uri].update(text)
+
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {
+                "uri": uri,
+                "diagnostics": [to_diagnostic(f) for f in findings],
+            },
+        )
+
+    def respond(self, request: Dict[str, Any], result: Any) -> None:
+        """Send the result of a request.
+
+        Args:
+            request (Dict[str, Any]): The request.
+            result (Any): Result of the request.
+        """
+        write_message(
+            self.output,
+            {"jsonrpc": "2.0", "id": request["id"], "result": result},
+        )
+
+    def respond_error(
+        self, request: Dict[str, Any], code: int, error: str
+    ) -> None:
+        """Send an error in response to a request.
+
+        Args:
+            request (Dict[str, Any]): The request.
+            code (int): JSON-RPC error code.
+            error (str): Error message.
+        """
+        write_message(
+            self.output,
+            {
+                "jsonrpc": "2.0",
+                "id": request["id"],
+                "error": {"code": code, "message": error},
+            },
+        )
+
+    def notify(self, method: str, params: Dict[str, Any]) -> None:
+        """Send a notification.
+
+        Args:
+            method (str): Method of the notification.
+            params (Dict[str, Any]): Parameters of the notification.
+        """
+        write_message(
+            self.output, {"jsonrpc": "2.0", "method": method, "params": params}
+        )
+
+
+def serve(
+    rules: Optional[RuleSet] = None,
+    stdin: Optional[IO[bytes]] = None,
+    stdout: Optional[IO[bytes]] = None,
+) -> int:
+    """Run the language server until the client asks it to exit.
+
+    Args:
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        stdin (IO[bytes] | None, optional): Stream to read messages from.
+            Defaults to the standard input.
+        stdout (IO[bytes] | None, optional): Stream to write messages to.
+            Defaults to the standard output.
+
+    Returns:
+        int: Exit code, 0 if the client shut the server down first.
+    """
+    stdin = stdin or sys.stdin.buffer
+    server = LanguageServer(stdout or sys.stdout.buffer, rules)
+
+    while True:
+        message = read_message(stdin)
+        if message is None or not server.handle(message):
+            break
+
+    return 0 if server.shutdown else 1
@@ -2,16 +2,55 @@
 """Main"""
 
 import sys
+import time
+import asyncio
 import argparse
-from typing import List, Tuple
+from itertools import chain
+from pebble import ProcessPool  # type: ignore
+from typing import Any, Iterable, Iterator, List, Optional, Tuple
 
 # Local
-from pycheckdoc_v2.generate_ast import get_ast
-from pycheckdoc_v2.check_class import check_class_doc
-from pycheckdoc_v2.check_function import check_function_doc
-from pycheckdoc_v2.check_module import check_module_doc
-from pycheckdoc_v2.print_funcs import print_error, print_success
+from pycheckdoc_v2.generate_ast import (
+    get_ast,
+    iter_paths,
+    read_path_list,
+    sort_paths,
+)
+from pycheckdoc_v2.backends import BACKENDS, resolve_backend
+from pycheckdoc_v2.check_docstring import STYLES
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.class_index import build_hierarchy
+from pycheckdoc_v2.config import CONFIG_ERRORS, Options, load_config
+from pycheckdoc_v2.find_modules import resolve_modules
+from pycheckdoc_v2.finding_store import FindingStore, write_store
+from pycheckdoc_v2.fix import fix_file, init_fixer, is_fixable
+from pycheckdoc_v2.lsp import serve
+from pycheckdoc_v2.multi_root import check_roots
+from pycheckdoc_v2.print_funcs import (
+    print_backend,
+    print_benchmark,
+    print_error,
+    print_finding,
+    print_fix_summary,
+    print_fixed,
+    print_merge_failure,
+    print_merge_summary,
+    print_success,
+    print_worker_plan,
+)
+from pycheckdoc_v2.rules import RuleSet, compile_rules
+from pycheckdoc_v2.session import Session
+from pycheckdoc_v2.stream import benchmark_backends, stream_check
+from pycheckdoc_v2.shard import (
+    Partial,
+    merge_partials,
+    parse_shard,
+    read_partial,
+    write_partial,
+)
 from pycheckdoc_v2.usage import print_usage
+from pycheckdoc_v2.walk_cache import WalkCache
+from pycheckdoc_v2.workers import plan_workers
 
 
 parser = argparse.ArgumentParser(
@@ -28,36 +67,333 @@ parser.add_argument(
 
 parser.add_argument(
     "--no-print",
-    dest="print",
+    dest="print_msgs",
     action="store_false",
     help="Don't print error or success messages",
 )
 
+parser.add_argument(
+    "-m",
+    "--module",
+    dest="modules",
+    action="append",
+    default=[],
+    metavar="MODULE",
+    help="Check an installed module or package by its import name, "
+    + "without importing it. Can be given several times.",
+)
+
+parser.add_argument(
+    "--config",
+    dest="config",
+    default=None,
+    help="Path to a pyproject.toml with a [tool.pycheckdoc] table. "
+    + "Defaults to the nearest pyproject.toml.",
+)
+
+parser.add_argument(
+    "--multi-root",
+    dest="multi_root",
+    action="store_true",
+    help="Check and report each path as a separate root.",
+)
+
+parser.add_argument(
+    "--shard",
+    dest="shard",
+    type=parse_shard,
+    default=None,
+    metavar="i/N",
+    help="Only check the files assigned to shard i of N and write a "
+    + "partial result for `pycheckdoc merge`.",
+)
+
+parser.add_argument(
+    "--shard-output",
+    dest="shard_output",
+    default=None,
+    help="Where to write the partial result of the shard. "
+    + "Defaults to pycheckdoc-shard-i-of-N.json",
+)
+
+parser.add_argument(
+    "--stream",
+    dest="stream",
+    action="store_true",
+    help="Check each file as soon as it is parsed without keeping the "
+    + "ASTs in memory.",
+)
+
+parser.add_argument(
+    "--max-in-flight",
+    dest="max_in_flight",
+    type=int,
+    default=None,
+    help="Maximum number of files being checked at a time with --stream. "
+    + "Defaults to twice the number of workers.",
+)
+
+parser.add_argument(
+    "--files-from",
+    dest="files_from",
+    default=None,
+    metavar="FILE",
+    help="Also check the paths listed in FILE, or the standard input if "
+    + "FILE is -, separated by newlines or NUL characters. Implies --stream.",
+)
+
+parser.add_argument(
+    "--fail-fast",
+    dest="fail_fast",
+    action="store_true",
+    help="Stop at the first file with findings and cancel the files still "
+    + "being checked. Implies --stream.",
+)
+
+parser.add_argument(
+    "--count-only",
+    dest="count_only",
+    action="store_true",
+    help="Only print the number of errors, not each of them.",
+)
+
+parser.add_argument(
+    "--save-findings",
+    dest="save_findings",
+    default=None,
+    metavar="FILE",
+    help="Save all the findings of the run to FILE in a compact binary "
+    + "format, to be loaded and merged with other runs later.",
+)
+
+parser.add_argument(
+    "--cache",
+    dest="use_cache",
+    action="store_true",
+    help="Cache directory listings, the definitions of each file and the "
+    + "files of the modules given with -m, so that later runs with any "
+    + "rules neither list unchanged directories nor parse unchanged files. "
+    + "Implies --stream.",
+)
+
+parser.add_argument(
+    "--workers",
+    dest="workers",
+    type=int,
+    default=None,
+    help="Number of worker processes. Defaults to PYCHECKDOC_WORKERS, else "
+    + "to what the CPUs, cgroup CPU quota and memory available allow.",
+)
+
+parser.add_argument(
+    "--stats",
+    dest="stats",
+    action="store_true",
+    help="Print how the number of workers was decided.",
+)
+
+parser.add_argument(
+    "--backend",
+    dest="backend",
+    choices=BACKENDS,
+    default="auto",
+    help="Check files in worker processes or threads, which only check "
+    + "files in parallel on free-threaded builds. auto picks processes. "
+    + "thread implies --stream.",
+)
+
+parser.add_argument(
+    "--inherit-docs",
+    dest="inherit_docs",
+    action="store_true",
+    help="Don't report methods without a docstring that inherit one from "
+    + "the method they override, resolved through an index of the classes "
+    + "of the projects checked. Overrides the configuration.",
+)
+
+parser.add_argument(
+    "--public-api",
+    dest="public_api",
+    action="store_true",
+    help="Only check the public modules of the projects checked and the "
+    + "definitions they export through __all__, package re-exports and "
+    + "names without a leading underscore. Files without any are skipped. "
+    + "Overrides the configuration.",
+)
+
+parser.add_argument(
+    "--quality",
+    dest="quality",
+    action="store_true",
+    help="Report docstrings of too low quality: placeholders like TODO, "
+    + "docstrings that only repeat their name and docstrings shorter than "
+    + "min-length. Overrides the configuration.",
+)
+
+parser.add_argument(
+    "--doctest",
+    dest="doctest",
+    action="store_true",
+    help="Run the >>> examples of docstrings and report those that fail. "
+    + "Each module runs in its own interpreter and results are cached "
+    + "until the module changes. Overrides the configuration. "
+    + "Implies --stream.",
+)
+
+parser.add_argument(
+    "--doctest-timeout",
+    dest="doctest_timeout",
+    type=float,
+    default=None,
+    metavar="SECONDS",
+    help="Seconds an example may run for with --doctest. Overrides the "
+    + "configuration. Defaults to 5.",
+)
+
+parser.add_argument(
+    "--fix",
+    dest="fix",
+    action="store_true",
+    help="Insert Google style docstring skeletons, with the arguments, "
+    + "raised exceptions and return value of functions, where docstrings "
+    + "are missing. Each file is written once, atomically.",
+)
+
+parser.add_argument(
+    "--diff",
+    dest="diff",
+    action="store_true",
+    help="Print the unified diff of what --fix would do without writing "
+    + "any file.",
+)
+
+parser.add_argument(
+    "--style",
+    dest="style",
+    choices=STYLES,
+    default=None,
+    help="Validate docstring content against function signatures "
+    + "using this docstring style. Overrides the configuration.",
+)
+
 parser.add_argument(
     "paths", nargs="*", help="Paths to files/directories to check"
 )
-args = parser.parse_args()
+
+lsp_parser = argparse.ArgumentParser(
+    prog="pycheckdoc lsp",
+    description="Run a language server on stdio that reports missing "
+    + "documentation of open documents",
+)
+
+lsp_parser.add_argument(
+    "--config",
+    dest="config",
+    default=None,
+    help="Path to a pyproject.toml with a [tool.pycheckdoc] table. "
+    + "Defaults to the nearest pyproject.toml.",
+)
+
+merge_parser = argparse.ArgumentParser(
+    prog="pycheckdoc merge",
+    description="Merge the partial results of sharded checks",
+)
+
+merge_parser.add_argument(
+    "--no-print",
+    dest="print",
+    action="store_false",
+    help="Don't print error or success messages",
+)
+
+merge_parser.add_argument(
+    "partials", nargs="+", help="Partial result files written by --shard"
+)
+
+benchmark_parser = argparse.ArgumentParser(
+    prog="pycheckdoc benchmark",
+    description="Time checking the same files with each backend",
+)
+
+benchmark_parser.add_argument(
+    "-r",
+    "--recursive",
+    dest="recursive",
+    action="store_true",
+    help="Recurse over directories.",
+)
+
+benchmark_parser.add_argument(
+    "--config",
+    dest="config",
+    default=None,
+    help="Path to a pyproject.toml with a [tool.pycheckdoc] table. "
+    + "Defaults to the nearest pyproject.toml.",
+)
+
+benchmark_parser.add_argument(
+    "--backend",
+    dest="backends",
+    action="append",
+    choices=BACKENDS[1:],
+    default=None,
+    help="Backend to time. Can be given several times. Defaults to all.",
+)
+
+benchmark_parser.add_argument(
+    "--workers",
+    dest="workers",
+    type=int,
+    default=None,
+    help="Number of workers of each backend. Defaults to PYCHECKDOC_WORKERS, "
+    + "else to what the CPUs, cgroup CPU quota and memory available allow.",
+)
+
+benchmark_parser.add_argument(
+    "--repeat",
+    dest="repeat",
+    type=int,
+    default=3,
+    help="Number of runs of each backend, of which the fastest is kept. "
+    + "Defaults to 3.",
+)
+
+benchmark_parser.add_argument(
+    "paths", nargs="+", help="Paths to files/directories to check"
+)
 
 
 def main(
-    paths: List[str] = args.paths,
-    recursive: bool = args.recursive,
-    print_msgs: bool = args.print,
+    paths: Optional[List[str]] = None,
+    rules: Optional[RuleSet] = None,
+    options: Optional[Options] = None,
+    **fields: Any,
 ) -> Tuple[int, int]:
     """Pycheckdoc entry point.
 
-    Arguments are read from the command line if none is provided.
+    Arguments are read from the command line if no paths are provided.
+    `pycheckdoc merge` on the command line merges partial results instead,
+    `pycheckdoc benchmark` times the backends and `pycheckdoc lsp` runs a
+    language server on stdio.
 
     Args:
-        paths (List[str], optional): List of the paths to check.
-        recursive (Bool, optional): Whether to check directories recursively.
-            Defaults to `False`.
-        print_msgs (Bool, optional): Whether to print file errors and success
-            messages. Defaults to `True`.
+        paths (List[str] | None, optional): List of the paths to check.
+        rules (RuleSet | None, optional): Compiled rules to apply. If not
+            provided, rules are compiled from the configuration.
+            Defaults to None.
+        options (Options | None, optional): Options of the run. Options of
+            the rules override the configuration, or `rules` if given.
+            Defaults to the default options.
+        **fields (Any): Fields of `options` to replace, like
+            `recursive=True`.
+
+    Raises:
+        ValueError: If the options are invalid or conflict.
 
     Returns:
         Tuple[int, int]: Tuple of total errors and files with errors. If an
-            error occurs then (-1, -1) is returned.
+            error occurs then (-1, -1) is returned. With `fix` or `diff`,
+            the docstrings inserted and the files they were inserted in.
 
     Usage
     ---
@@ -65,40 +401,318 @@ def main(
     The sample below checks the current directory recursively.
 
     ```Python
-    from pycheckdoc_v2.main import main, parser
+    from pycheckdoc_v2.main import main
 
-    args = parser.parse_args([".", "-r"])   # Provide arguments
-    main(args)  # Pass the arguments to main
+    main(["."], recursive=True)
 
     ```
     """
+    if paths is None:
+        if sys.argv[1:2] == ["merge"]:
+            return main_merge(sys.argv[2:])
 
-    if len(paths) == 0:
+        if sys.argv[1:2] == ["benchmark"]:
+            return main_benchmark(sys.argv[2:])
+
+        if sys.argv[1:2] == ["lsp"]:
+            main_lsp(sys.argv[2:])
+
+        paths, rules, options = parse_command_line()
+    else:
+        options = (options or Options())._replace(**fields)
+        options.validate()
+
+    if options.modules:
+        paths = [*paths, *module_paths(options.modules, options.use_cache)]
+
+    if len(paths) == 0 and options.files_from is None and not options.modules:
         print_usage()
         sys.exit(1)
 
-    modules = get_ast(paths, recursive=recursive)
+    if rules is None:
+        # Compile the rules once for the whole run.
+        rules = compile_rules(
+            {**load_config(options.config), **options.rule_config()}
+        )
+    elif options.rule_config():
+        rules = rules.with_config(options.rule_config())
+
+    plan = plan_workers(options.workers)
+    paths, rules, options = index_projects(paths, rules, options, plan.workers)
+
+    if rules.exports is not None and not options.multi_root:
+        # Skip the files that export nothing before they are parsed. Each
+        # root is filtered by `check_roots` with multiple roots.
+        paths = [
+            path
+            for path in iter_paths(paths, options.recursive)
+            if rules.exports.contributes(path)
+        ]
+
+        if not paths:
+            if options.print_msgs:
+                print_success(0)
+            return (0, 0)
+
+    if not options.multi_root:
+        # Every mode reports the paths given in path order. Those listed
+        # by `files_from` follow, in the order of the list.
+        paths = sort_paths(paths)
+
+    if options.stats:
+        print_worker_plan(plan)
+        print_backend(resolve_backend(options.backend))
+
+    if options.shard is not None and options.shard_output is None:
+        options = options._replace(
+            shard_output="pycheckdoc-shard-{}-of-{}.json".format(
+                *options.shard
+            )
+        )
+
+    return run(paths, rules, options, plan.workers)
 
-    if modules is None:  # Files provided don't exist
-        print("Files provided don't exist")
-        return (-1, -1)
+
+def parse_command_line() -> Tuple[List[str], RuleSet, Options]:
+    """Parse the command line and compile the rules of the run. Invalid
+    options and configurations exit with a usage error.
+
+    Returns:
+        Tuple[List[str], RuleSet, Options]: The paths to check, the
+            compiled rules and the validated options.
+    """
+    args = parser.parse_args()
+    options = Options.from_args(args)
+
+    try:
+        options.validate()
+        rules = compile_rules(
+            {**load_config(options.config), **options.rule_config()}
+        )
+    except CONFIG_ERRORS as e:
+        # Before ValueError, which TOMLDecodeError is.
+        parser.error(f"can't load configuration: {e}")
+    except ValueError as e:
+        parser.error(str(e))
+
+    return args.paths, rules, options
+
+
+def index_projects(
+    paths: List[str],
+    rules: RuleSet,
+    options: Options,
+    max_workers: Optional[int] = None,
+) -> Tuple[List[str], RuleSet, Options]:
+    """Index the classes of the projects checked if the rules need their
+    hierarchy. The list of `files_from` is read in full first if the
+    rules need the hierarchy or the exports of the projects.
+
+    Args:
+        paths (List[str]): Paths to check.
+        rules (RuleSet): Compiled rules to apply.
+        options (Options): Validated options of the run.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to `None`.
+
+    Returns:
+        Tuple[List[str], RuleSet, Options]: The paths, with those listed
+            if read, the rules with the hierarchy and the options, without
+            `files_from` if read.
+    """
+    if options.files_from is not None and (
+        rules.needs_hierarchy or rules.exports is not None
+    ):
+        # The projects of all the files are indexed or the files filtered
+        # before any is checked, so the list is read in full.
+        paths = [*paths, *read_path_list(options.files_from)]
+        options = options._replace(files_from=None)
+
+    if rules.needs_hierarchy:
+        files = list(iter_paths(paths, options.recursive))
+        rules = rules.with_hierarchy(
+            build_hierarchy(files, max_workers, options.use_cache)
+        )
+
+    return paths, rules, options
+
+
+def module_paths(modules: List[str], use_cache: bool = False) -> List[str]:
+    """Get the source files of installed modules, reporting the modules
+    without any.
+
+    Args:
+        modules (List[str]): Import names of the modules.
+        use_cache (Bool, optional): Whether to go through the cache of the
+            modules resolved. Defaults to `False`.
+
+    Returns:
+        List[str]: Paths to the source files of the modules.
+    """
+    paths = []
+
+    for name, files in resolve_modules(modules, use_cache).items():
+        if not files:
+            print(f"No Python source found for module '{name}'")
+        paths.extend(files)
+
+    return paths
+
+
+def run(
+    paths: List[str],
+    rules: RuleSet,
+    options: Options,
+    max_workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Check or fix the paths, and those listed by `files_from`, in the
+    mode the options select.
+
+    Args:
+        paths (List[str]): Paths to check, sorted unless `multi_root`.
+        rules (RuleSet): Compiled rules to apply.
+        options (Options): Validated options of the run.
+        max_workers (int | None, optional): Number of workers.
+            Defaults to `None`.
+
+    Returns:
+        Tuple[int, int]: The result of the mode.
+    """
+    listed: Iterable[str] = paths
+    if options.files_from is not None:
+        listed = chain(paths, read_path_list(options.files_from))
+
+    if options.fix or options.diff:
+        return main_fix(
+            listed,
+            options.recursive,
+            options.print_msgs,
+            rules,
+            options.diff,
+            options.shard,
+            max_workers,
+        )
+
+    if options.multi_root:
+        return main_multi_root(
+            paths,
+            options.recursive,
+            options.print_msgs,
+            rules,
+            options.shard,
+            options.shard_output,
+            options.count_only,
+            options.save_findings,
+            options.use_cache,
+            max_workers,
+        )
+
+    if (
+        options.files_from is not None
+        or options.stream
+        or options.fail_fast
+        or options.use_cache
+        or rules.doctest
+        or options.backend == "thread"
+    ):
+        return main_stream(
+            listed,
+            options.recursive,
+            options.print_msgs,
+            rules,
+            options.shard,
+            options.shard_output,
+            options.max_in_flight,
+            options.fail_fast,
+            options.count_only,
+            options.save_findings,
+            options.use_cache,
+            max_workers,
+            options.backend,
+        )
+
+    return main_batch(
+        paths,
+        options.recursive,
+        options.print_msgs,
+        rules,
+        options.shard,
+        options.shard_output,
+        options.count_only,
+        options.save_findings,
+        max_workers,
+    )
+
+
+def main_batch(
+    paths: List[str],
+    recursive: bool,
+    print_msgs: bool,
+    rules: RuleSet,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    count_only: bool = False,
+    save_findings: Optional[str] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Parse all the files in worker processes, then check them.
+
+    Args:
+        paths (List[str]): Paths to check, in path order.
+        recursive (Bool): Whether to check directories recursively.
+        print_msgs (Bool): Whether to print file errors and success
+            messages.
+        rules (RuleSet): Compiled rules to apply.
+        shard (Tuple[int, int] | None, optional): Only check the files
+            assigned to this shard, given as (i, N), and write a partial
+            result. Defaults to `None`.
+        shard_output (str | None, optional): Path to write the partial
+            result to. Defaults to `None`.
+        count_only (Bool, optional): Whether to only print the number of
+            errors and not each of them. Defaults to `False`.
+        save_findings (str | None, optional): Path to save all the findings
+            to, as a `FindingStore`. Defaults to `None`.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to `None`.
+
+    Returns:
+        Tuple[int, int]: Tuple of total errors and files with errors. If
+            no files are found then (-1, -1) is returned.
+    """
+    start = time.perf_counter()
+
+    modules = get_ast(
+        paths,
+        recursive=recursive,
+        shard=shard,
+        max_workers=max_workers,
+    )
+
+    if modules is None:
+        if shard is None:  # Files provided don't exist
+            print("Files provided don't exist")
+            return (-1, -1)
+
+        modules = []  # No files were assigned to this shard
 
     total_errors = 0
     files_with_errors = 0
+    findings = FindingStore()
+    keep_findings = shard is not None or save_findings is not None
 
     for module in modules:
-        prev_count = total_errors
+        # Sorted by line, as the modules are sorted by path.
+        module_findings = check_module_node(module, rules)
 
-        module_errors = check_module_doc(module, print_msgs)
-        func_errors = check_function_doc(module, print_msgs)
-        class_errors, method_errors = check_class_doc(module, print_msgs)
+        if print_msgs and not count_only:
+            for finding in module_findings:
+                print_finding(finding)
 
-        total_errors += (
-            module_errors + func_errors + class_errors + method_errors
-        )
+        total_errors += len(module_findings)
+        files_with_errors += bool(module_findings)
 
-        if prev_count < total_errors:
-            files_with_errors += 1
+        if keep_findings:
+            findings.extend(module_findings)
 
     if print_msgs:
         if total_errors != 0 and files_with_errors != 0:
@@ -106,13 +720,414 @@ def main(
         else:
             print_success(len(modules))
 
+    if shard is not None:
+        write_partial(
+            shard_output,  # type: ignore
+            Partial(
+                shard,
+                [path for path, _ in modules],
+                list(findings),
+                time.perf_counter() - start,
+            ),
+        )
+
+    if save_findings is not None:
+        write_store(save_findings, findings)
+
+    return (total_errors, files_with_errors)
+
+
+def main_multi_root(
+    roots: List[str],
+    recursive: bool,
+    print_msgs: bool,
+    rules: RuleSet,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    count_only: bool = False,
+    save_findings: Optional[str] = None,
+    use_cache: bool = False,
+    max_workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Check several roots and report the results of each separately,
+    followed by the totals.
+
+    Args:
+        roots (List[str]): Paths to check, each as a separate root.
+        recursive (Bool): Whether to check directories recursively.
+        print_msgs (Bool): Whether to print file errors and success
+            messages.
+        rules (RuleSet): Compiled rules to apply.
+        shard (Tuple[int, int] | None, optional): Only check the files
+            assigned to this shard, given as (i, N), and write a partial
+            result. Defaults to `None`.
+        shard_output (str | None, optional): Path to write the partial
+            result to. Defaults to `None`.
+        count_only (Bool, optional): Whether to only print the number of
+            errors of each root. Defaults to `False`.
+        save_findings (str | None, optional): Path to save the findings of
+            all the roots to, as a `FindingStore`. Defaults to `None`.
+        use_cache (Bool, optional): Whether to go through the walk and
+            skeleton caches. Defaults to `False`.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to `None`.
+
+    Returns:
+        Tuple[int, int]: Tuple of total errors and files with errors of
+            all the roots. If no root has files then (-1, -1) is returned.
+    """
+    start = time.perf_counter()
+
+    results = check_roots(
+        roots,
+        recursive,
+        rules,
+        print_msgs,
+        shard=shard,
+        print_findings=not count_only,
+        use_cache=use_cache,
+        max_workers=max_workers,
+    )
+
+    num_modules = sum(result.files_checked for result in results)
+
+    if shard is not None:
+        write_partial(
+            shard_output,  # type: ignore
+            Partial(
+                shard,
+                [path for result in results for path in result.files],
+                [finding for result in results for finding in result.findings],
+                time.perf_counter() - start,
+            ),
+        )
+    elif all(result.exit_code == 2 for result in results):
+        print("Files provided don't exist")
+        return (-1, -1)
+
+    if save_findings is not None:
+        write_store(
+            save_findings,
+            FindingStore(
+                finding for result in results for finding in result.findings
+            ),
+        )
+
+    total_errors = sum(len(result.findings) for result in results)
+    files_with_errors = sum(result.files_with_errors for result in results)
+
+    if print_msgs:
+        print()
+        if total_errors != 0 and files_with_errors != 0:
+            print_error(total_errors, files_with_errors, num_modules)
+        else:
+            print_success(num_modules)
+
+    return (total_errors, files_with_errors)
+
+
+def main_stream(
+    paths: Iterable[str],
+    recursive: bool,
+    print_msgs: bool,
+    rules: RuleSet,
+    shard: Optional[Tuple[int, int]] = None,
+    shard_output: Optional[str] = None,
+    max_in_flight: Optional[int] = None,
+    fail_fast: bool = False,
+    count_only: bool = False,
+    save_findings: Optional[str] = None,
+    use_cache: bool = False,
+    max_workers: Optional[int] = None,
+    backend: str = "auto",
+) -> Tuple[int, int]:
+    """Check files as a stream, printing the findings of each file as
+    soon as it and the files before it are checked. Neither the ASTs nor,
+    unless a shard is given or they are saved, the findings are kept in
+    memory.
+
+    Files are printed in the order the paths are found in, which is path
+    order if the paths are sorted with `sort_paths`. With `fail_fast`,
+    checking stops at the first file with findings. Files still being
+    checked are cancelled and the workers stopped.
+
+    Args:
+        paths (Iterable[str]): Paths to check. Read lazily.
+        recursive (Bool): Whether to check directories recursively.
+        print_msgs (Bool): Whether to print file errors and success
+            messages.
+        rules (RuleSet): Compiled rules to apply.
+        shard (Tuple[int, int] | None, optional): Only check the files
+            assigned to this shard, given as (i, N), and write a partial
+            result. Defaults to `None`.
+        shard_output (str | None, optional): Path to write the partial
+            result to. Defaults to `None`.
+        max_in_flight (int | None, optional): Maximum number of files being
+            checked at a time. Defaults to `None`.
+        fail_fast (Bool, optional): Whether to stop at the first file with
+            findings. Defaults to `False`.
+        count_only (Bool, optional): Whether to only print the number of
+            errors and not each of them. Defaults to `False`.
+        save_findings (str | None, optional): Path to save all the findings
+            to, as a `FindingStore`. Defaults to `None`.
+        use_cache (Bool, optional): Whether to go through the walk and
+            skeleton caches. Defaults to `False`.
+        max_workers (int | None, optional): Number of workers.
+            Defaults to `None`.
+        backend (str, optional): Whether to check files in processes or
+            threads. Defaults to `auto`.
+
+    Returns:
+        Tuple[int, int]: Tuple of total errors and files with errors. If
+            no files are found then (-1, -1) is returned.
+    """
+    start = time.perf_counter()
+
+    total_errors = 0
+    files_with_errors = 0
+    num_modules = 0
+    num_paths = 0
+
+    files: List[str] = []
+    findings = FindingStore()
+    keep_findings = shard is not None or save_findings is not None
+    walk_cache = WalkCache.load() if use_cache else None
+
+    def count_paths() -> Iterator[str]:
+        """Count the paths as they are read.
+
+        Returns:
+            Iterator[str]: The valid paths.
+        """
+        nonlocal num_paths
+        for path in iter_paths(paths, recursive, shard, walk_cache):
+            num_paths += 1
+            yield path
+
+    for path, file_findings in stream_check(
+        count_paths(), rules, max_in_flight, max_workers, use_cache, backend
+    ):
+        num_modules += 1
+        total_errors += len(file_findings)
+        files_with_errors += bool(file_findings)
+
+        if print_msgs and not count_only:
+            for finding in file_findings:
+                print_finding(finding)
+
+        if shard is not None:
+            files.append(path)
+
+        if keep_findings:
+            findings.extend(file_findings)
+
+        if fail_fast and file_findings:
+            # Leaving the loop closes stream_check, which cancels the
+            # remaining files and stops its workers.
+            break
+
+    if walk_cache is not None:
+        walk_cache.save()
+
+    if shard is not None:
+        write_partial(
+            shard_output,  # type: ignore
+            Partial(
+                shard, files, list(findings), time.perf_counter() - start
+            ),
+        )
+    elif num_paths == 0:  # Files provided don't exist
+        print("Files provided don't exist")
+        return (-1, -1)
+
+    if save_findings is not None:
+        write_store(save_findings, findings)
+
+    if print_msgs:
+        if total_errors != 0 and files_with_errors != 0:
+            print_error(total_errors, files_with_errors, num_modules)
+        else:
+            print_success(num_modules)
+
     return (total_errors, files_with_errors)
 
 
+def main_fix(
+    paths: Iterable[str],
+    recursive: bool,
+    print_msgs: bool,
+    rules: RuleSet,
+    diff: bool = False,
+    shard: Optional[Tuple[int, int]] = None,
+    max_workers: Optional[int] = None,
+) -> Tuple[int, int]:
+    """Insert docstring skeletons where docstrings are missing, in
+    parallel across worker processes.
+
+    Results are reported in path order as soon as they are ready, so the
+    diff is streamed to the standard output while later files are still
+    being fixed. Archive members and notebooks are checked but not fixed.
+
+    Args:
+        paths (Iterable[str]): Paths to fix. Read lazily.
+        recursive (Bool): Whether to fix directories recursively.
+        print_msgs (Bool): Whether to print the files fixed and a summary.
+        rules (RuleSet): Compiled rules that decide what is missing.
+        diff (Bool, optional): Whether to print the unified diff of the
+            fixes instead of writing them. Defaults to `False`.
+        shard (Tuple[int, int] | None, optional): Only fix the files
+            assigned to this shard, given as (i, N). Defaults to `None`.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to `None`.
+
+    Returns:
+        Tuple[int, int]: Tuple of the docstrings inserted and the files
+            they were inserted in. If no files are found then (-1, -1) is
+            returned.
+    """
+    inserted = 0
+    files_fixed = 0
+    num_modules = 0
+
+    files = (
+        path
+        for path in iter_paths(paths, recursive, shard)
+        if is_fixable(path)
+    )
+
+    with ProcessPool(
+        max_workers=max_workers,
+        initializer=init_fixer,
+        initargs=(rules, not diff),
+    ) as pool:
+        for result in pool.map(fix_file, files).result():
+            num_modules += 1
+            inserted += result.inserted
+            files_fixed += bool(result.inserted)
+
+            if diff:
+                sys.stdout.write(result.diff)
+                sys.stdout.flush()
+
+            if print_msgs and (result.error or result.inserted and not diff):
+                print_fixed(result.path, result.inserted, result.error)
+
+    if num_modules == 0:
+        print("Files provided don't exist")
+        return (-1, -1)
+
+    if print_msgs:
+        print_fix_summary(inserted, files_fixed, num_modules, diff)
+
+    return (inserted, files_fixed)
+
+
+def main_lsp(argv: List[str]) -> None:
+    """Run the language server until the client asks it to exit, then
+    exit the process.
+
+    Args:
+        argv (List[str]): Command line arguments after `lsp`.
+    """
+    lsp_args = lsp_parser.parse_args(argv)
+
+    sys.exit(serve(compile_rules(load_config(lsp_args.config))))
+
+
+def main_merge(argv: List[str]) -> Tuple[int, int]:
+    """Merge the partial results of sharded checks into one report.
+
+    Args:
+        argv (List[str]): Command line arguments after `merge`.
+
+    Returns:
+        Tuple[int, int]: Tuple of total errors and files with errors of
+            all the shards. If a partial result can't be read or the
+            partial results don't belong together then (-1, -1) is
+            returned.
+    """
+    merge_args = merge_parser.parse_args(argv)
+
+    try:
+        report = merge_partials(
+            [read_partial(path) for path in merge_args.partials]
+        )
+    except (OSError, ValueError) as e:
+        print_merge_failure(str(e))
+        return (-1, -1)
+
+    total_errors = len(report.findings)
+    files_with_errors = len({finding.path for finding in report.findings})
+
+    if merge_args.print:
+        for finding in report.findings:
+            print_finding(finding)
+
+        print_merge_summary(
+            len(merge_args.partials),
+            report.missing_shards,
+            report.seconds,
+            report.wall_seconds,
+        )
+
+        if total_errors != 0 and files_with_errors != 0:
+            print_error(total_errors, files_with_errors, len(report.files))
+        else:
+            print_success(len(report.files))
+
+    return (total_errors, files_with_errors)
+
+
+def main_benchmark(argv: List[str]) -> Tuple[int, int]:
+    """Time checking the same files with each backend and print the
+    timings. Nothing is reported but the timings.
+
+    Args:
+        argv (List[str]): Command line arguments after `benchmark`.
+
+    Returns:
+        Tuple[int, int]: (0, 0), or (-1, -1) if no files are found.
+    """
+    benchmark_args = benchmark_parser.parse_args(argv)
+
+    if benchmark_args.repeat < 1:
+        benchmark_parser.error("--repeat must be at least 1")
+
+    try:
+        plan = plan_workers(benchmark_args.workers)
+        rules = compile_rules(load_config(benchmark_args.config))
+    except CONFIG_ERRORS as e:
+        # Before ValueError, which TOMLDecodeError is.
+        benchmark_parser.error(f"can't load configuration: {e}")
+    except ValueError as e:
+        benchmark_parser.error(str(e))
+
+    files = list(iter_paths(benchmark_args.paths, benchmark_args.recursive))
+
+    if not files:
+        print("Files provided don't exist")
+        return (-1, -1)
+
+    if rules.needs_hierarchy:
+        rules = rules.with_hierarchy(build_hierarchy(files, plan.workers))
+
+    timings = benchmark_backends(
+        files,
+        benchmark_args.backends or BACKENDS[1:],
+        rules,
+        plan.workers,
+        benchmark_args.repeat,
+    )
+    print_benchmark(timings, len(files), plan.workers)
+
+    return (0, 0)
+
+
 def check_doc(
     paths: List[str],
     recursive: bool = False,
     print_msgs: bool = False,
+    rules: Optional[RuleSet] = None,
 ) -> Tuple[int, int]:
     """Check python file documentation.
     Use this in other python files instead of main.
@@ -123,6 +1138,9 @@ def check_doc(
             Defaults to `False`.
         print_msgs (Bool, optional): Whether to print file errors and success
             messages. Defaults to `False`.
+        rules (RuleSet | None, optional): Compiled rules to apply. If not
+            provided, rules are compiled from the nearest pyproject.toml.
+            Defaults to None.
 
     Raises:
         ValueError: If length of paths is 0.
@@ -137,8 +1155,61 @@ def check_doc(
         paths=paths,
         recursive=recursive,
         print_msgs=print_msgs,
+        rules=rules,
     )
 
 
+async def check_doc_async(
+    paths: List[str],
+    recursive: bool = False,
+    rules: Optional[RuleSet] = None,
+    session: Optional[Session] = None,
+) -> Tuple[int, int]:
+    """Check python file documentation without blocking the event loop.
+    Use this in async code instead of `check_doc`.
+
+    Pass a long-lived `Session` to share its workers between calls,
+    otherwise workers are started and stopped for this call, and the
+    projects of the paths are indexed first if the rules need it, like
+    `check_doc` does.
+
+    Args:
+        paths (List[str]): List of the paths to check.
+        recursive (Bool, optional): Whether to check directories recursively.
+            Defaults to `False`.
+        rules (RuleSet | None, optional): Compiled rules to apply if no
+            session is given. If not provided, rules are compiled from the
+            nearest pyproject.toml. Defaults to None.
+        session (Session | None, optional): Session whose workers and rules
+            to use. Defaults to None.
+
+    Raises:
+        ValueError: If length of paths is 0.
+
+    Returns:
+        Tuple[int, int]: Tuple of total errors and files with errors. If
+            no files are found then (-1, -1) is returned.
+    """
+    if len(paths) == 0:
+        raise ValueError
+
+    if session is not None:
+        return await session.check(paths, recursive)
+
+    if rules is None:
+        rules = compile_rules(load_config())
+
+    if rules.needs_hierarchy:
+        # Indexed in a thread, which starts its own worker processes.
+        hierarchy = await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: build_hierarchy(list(iter_paths(paths, recursive))),
+        )
+        rules = rules.with_hierarchy(hierarchy)
+
+    async with Session(rules) as own_session:
+        return await own_session.check(paths, recursive)
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""Check several roots in one run with results sharded per root"""
+
+import time
+from itertools import zip_longest
+from pebble import ProcessPool  # type: ignore
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.check_file import check_file, init_worker
+from pycheckdoc_v2.findings import Finding, check_error, path_order
+from pycheckdoc_v2.generate_ast import validate_paths
+from pycheckdoc_v2.print_funcs import (
+    print_error,
+    print_finding,
+    print_root_header,
+    print_success,
+)
+from pycheckdoc_v2.rules import RuleSet
+from pycheckdoc_v2.walk_cache import WalkCache
+from pycheckdoc_v2.workers import default_workers
+
+# Number of files sent to a worker at a time. Small chunks keep the
+# scheduling fair between roots.
+CHUNKSIZE = 8
+
+
+class RootResult(NamedTuple):
+    """Result of checking a single root.
+
+    `exit_code` is 0 if no documentation is missing, 1 if some is
+    missing and 2 if the root has no files to check.
+    """
+
+    root: str
+    findings: List[Finding]
+    files: List[str]
+    files_checked: int
+    files_with_errors: int
+    seconds: float
+    exit_code: int
+
+
+def interleave(groups: List[List[str]]) -> Iterator[Tuple[int, str]]:
+    """Interleave the files of several roots in round robin order.
+
+    A root with many files therefore doesn't delay the others, which
+    finish as soon as their own files are done.
+
+    Args:
+        groups (List[List[str]]): Files of each root.
+
+    Returns:
+        Iterator[Tuple[int, str]]: Tuples of the root index and the path.
+    """
+    for row in zip_longest(*groups):
+        for index, path in enumerate(row):
+            if path is not None:
+                yield (index, path)
+
+
+def _make_result(
+    root: str,
+    findings: List[Finding],
+    files: List[str],
+    seconds: float,
+    has_files: bool,
+) -> RootResult:
+    """Build the result of a root once all its files are checked.
+
+    Args:
+        root (str): The root.
+        findings (List[Finding]): Findings of the files in the root.
+        files (List[str]): Non empty files that were checked.
+        seconds (float): Seconds taken until the root was done.
+        has_files (bool): Whether the root had files to check.
+
+    Returns:
+        RootResult: The result of the root.
+    """
+    files_with_errors = len({finding.path for finding in findings})
+
+    if not has_files:
+        exit_code = 2
+    elif findings:
+        exit_code = 1
+    else:
+        exit_code = 0
+
+    return RootResult(
+        root,
+        findings,
+        files,
+        len(files),
+        files_with_errors,
+        seconds,
+        exit_code,
+    )
+
+
+def print_root_result(
+    result: RootResult, print_findings: bool = True
+) -> None:
+    """Print the findings and summary of a root.
+
+    Args:
+        result (RootResult): Result to print.
+        print_findings (bool, optional): Whether to print each finding or
+            only the summary. Defaults to `True`.
+    """
+    print_root_header(result.root, result.seconds, result.exit_code)
+
+    if print_findings:
+        for finding in result.findings:
+            print_finding(finding)
+
+    if result.exit_code == 2:
+        print("Files provided don't exist")
+    elif result.findings:
+        print_error(
+            len(result.findings),
+            result.files_with_errors,
+            result.files_checked,
+        )
+    else:
+        print_success(result.files_checked)
+
+
+def check_roots(
+    roots: List[str],
+    recursive: bool = False,
+    rules: Optional[RuleSet] = None,
+    print_msgs: bool = True,
+    max_workers: Optional[int] = None,
+    shard: Optional[Tuple[int, int]] = None,
+    print_findings: bool = True,
+    use_cache: bool = False,
+) -> List[RootResult]:
+    """Check several roots with a single worker pool.
+
+    Files of all the roots are interleaved so that the pool works on
+    every root at once. Each root is reported as soon as all its files
+    have been checked.
+
+    Args:
+        roots (List[str]): Files or directories to check, each reported
+            separately.
+        recursive (bool, optional): Check directories recursively.
+            Defaults to `False`.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        print_msgs (bool, optional): Whether to print the results of each
+            root. Defaults to `True`.
+        max_workers (int | None, optional): Number of worker processes.
+            Defaults to what the CPUs and memory available allow.
+        shard (Tuple[int, int] | None, optional): Only check the files
+            assigned to this shard, given as (i, N). Defaults to None.
+        print_findings (bool, optional): Whether to print each finding or
+            only the summaries of the roots. Defaults to `True`.
+        use_cache (bool, optional): Whether to go through the walk and
+            skeleton caches. Defaults to `False`.
+
+    Returns:
+        List[RootResult]: Results in the order of the roots.
+    """
+    walk_cache = WalkCache.load() if use_cache else None
+
+    groups = [
+        sorted(
+            validate_paths([root], recursive, shard, walk_cache),
+            key=path_order,
+        )
+        for root in roots
+    ]
+    has_files = [bool(group) for group in groups]
+
+    if walk_cache is not None:
+        walk_cache.save()
+
+    if rules is not None and rules.exports is not None:
+        # Skip the files that export nothing before they are parsed.
+        groups = [
+            [path for path in group if rules.exports.contributes(path)]
+            for group in groups
+        ]
+
+    tasks = list(interleave(groups))
+
+    remaining = [len(group) for group in groups]
+    findings: List[List[Finding]] = [[] for _ in roots]
+    checked: List[List[str]] = [[] for _ in roots]
+    results: List[Optional[RootResult]] = [None] * len(roots)
+
+    start = time.perf_counter()
+
+    for index, root in enumerate(roots):
+        if remaining[index] == 0:
+            results[index] = _make_result(
+                root, [], [], 0.0, has_files[index]
+            )
+            if print_msgs:
+                print_root_result(
+                    results[index], print_findings  # type: ignore
+                )
+
+    with ProcessPool(
+        max_workers=max_workers or default_workers(),
+        initializer=init_worker,
+        initargs=(rules, use_cache),
+    ) as pool:
+        future = pool.map(
+            check_file, [path for _, path in tasks], chunksize=CHUNKSIZE
+        )
+        iterator = future.result()
+
+        for index, path in tasks:
+            try:
+                result = next(iterator)
+            except StopIteration:
+                break
+            except Exception as e:
+                result = (path, [check_error(path, e)])
+
+            if result:
+                checked[index].append(result[0])
+                findings[index].extend(result[1])
+
+            remaining[index] -= 1
+            if remaining[index] == 0:
+                results[index] = _make_result(
+                    roots[index],
+                    findings[index],
+                    checked[index],
+                    time.perf_counter() - start,
+                    True,
+                )
+                if print_msgs:
+                    print_root_result(
+                        results[index], print_findings  # type: ignore
+                    )
+
+    return [result for result in results if result is not None]
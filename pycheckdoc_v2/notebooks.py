@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""Read the code cells of Jupyter notebooks as one module"""
+
+import ast
+import codecs
+import json
+import re
+from bisect import bisect_right
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Tuple,
+)
+
+# Local
+from pycheckdoc_v2.findings import Finding
+
+NOTEBOOK_SUFFIX = ".ipynb"
+
+# Directory where Jupyter keeps copies of the notebooks next to them.
+CHECKPOINTS_DIRECTORY = ".ipynb_checkpoints"
+
+# Number of bytes of a notebook read at a time.
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_STRING_SPECIAL = re.compile(r'["\\]')
+_STRUCTURE = re.compile(r'["\[\]{}]')
+_SCALAR_END = re.compile(r"[ \t\n\r,\]}]")
+
+# Lines IPython transforms before running a cell: line magics, shell
+# commands, their assignments and help requests.
+_MAGIC = re.compile(
+    r"^([ \t]*)(?:(?:[\w.]+[ \t]*=[ \t]*)?[%!]|\?+[\w.]|[\w.]+\?\??[ \t]*$)",
+    re.MULTILINE,
+)
+
+
+class CellMap(NamedTuple):
+    """Where the code cells of a notebook start in its module.
+
+    `starts` holds the first line of each code cell in the module and
+    `cells` the 1-based position of the cell in the notebook, so markdown
+    cells are counted like in the notebook's interface.
+    """
+
+    starts: Tuple[int, ...]
+    cells: Tuple[int, ...]
+
+    def locate(self, line: int) -> Tuple[int, int]:
+        """Get the cell and line in the cell of a line of the module.
+
+        Args:
+            line (int): Line in the module, from 1.
+
+        Returns:
+            Tuple[int, int]: Position of the cell and line in the cell.
+        """
+        index = max(bisect_right(self.starts, line) - 1, 0)
+        return (self.cells[index], line - self.starts[index] + 1)
+
+    def locate_findings(self, findings: List[Finding]) -> List[Finding]:
+        """Report findings at the cell and line in the cell.
+
+        The module finding has no line, so it is left as is.
+
+        Args:
+            findings (List[Finding]): Findings with lines of the module.
+
+        Returns:
+            List[Finding]: The findings with their cell.
+        """
+        located = []
+
+        for finding in findings:
+            if finding.line > 0 and self.starts:
+                cell, line = self.locate(finding.line)
+                finding = finding._replace(line=line, cell=cell)
+            located.append(finding)
+
+        return located
+
+
+class NotebookSource(NamedTuple):
+    """The code cells of a notebook joined into the source of a module."""
+
+    source: bytes
+    cell_map: CellMap
+
+
+def is_notebook(path: str) -> bool:
+    """Check if a path points to a notebook.
+
+    Args:
+        path (str): Path to the file, or `archive!member`.
+
+    Returns:
+        bool: True if the path has the suffix of a notebook.
+    """
+    return path.endswith(NOTEBOOK_SUFFIX)
+
+
+class _Scanner:
+    """Walk the JSON of a notebook a chunk at a time.
+
+    Only the values asked for are decoded. Skipped values, like the
+    outputs of the cells, are scanned for their end and dropped as they
+    are read, so memory stays around the size of a chunk however large
+    they are.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int) -> None:
+        """Initialize the scanner.
+
+        Args:
+            stream (BinaryIO): The notebook, opened in binary mode.
+            chunk_size (int): Number of bytes read at a time.
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        """Read the next chunk, dropping what was already consumed.
+
+        Returns:
+            bool: False if the end of the notebook was reached.
+        """
+        data = self.stream.read(self.chunk_size)
+        text = self.decoder.decode(data, final=not data)
+
+        self.buffer = self.buffer[self.pos:] + text
+        self.pos = 0
+
+        return bool(data)
+
+    def _peek(self) -> str:
+        """Skip whitespace and get the next character.
+
+        Raises:
+            ValueError: If the notebook ends.
+
+        Returns:
+            str: The character.
+        """
+        while True:
+            match = _WHITESPACE.match(self.buffer, self.pos)
+            self.pos = match.end()  # type: ignore
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                raise ValueError("Notebook ends unexpectedly")
+
+    def _expect(self, chars: str) -> str:
+        """Consume the next character, which must be one of chars.
+
+        Args:
+            chars (str): Characters allowed.
+
+        Raises:
+            ValueError: If the next character isn't allowed.
+
+        Returns:
+            str: The character.
+        """
+        char = self._peek()
+        if char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, found {char!r}")
+        self.pos += 1
+        return char
+
+    def _string_end(self) -> int:
+        """Find the end of the string starting at the current position.
+
+        The string is dropped from the buffer as it is scanned.
+
+        Raises:
+            ValueError: If the string isn't terminated.
+
+        Returns:
+            int: Position right after the closing quote.
+        """
+        index = self.pos + 1
+
+        while True:
+            match = _STRING_SPECIAL.search(self.buffer, index)
+
+            if match is None:
+                index = len(self.buffer)
+            elif match.group() == '"':
+                return match.end()
+            elif match.end() < len(self.buffer):
+                index = match.end() + 1  # Skip the escaped character.
+                continue
+            else:
+                index = match.start()  # Wait for the escaped character.
+
+            self.pos = index
+
+            if not self._fill():
+                raise ValueError("Unterminated string in notebook")
+            index = 0
+
+    def skip_value(self) -> None:
+        """Skip the next value without decoding it.
+
+        Raises:
+            ValueError: If the notebook ends within the value.
+        """
+        char = self._peek()
+
+        if char == '"':
+            self.pos = self._string_end()
+            return
+
+        if char not in "[{":
+            while True:
+                match = _SCALAR_END.search(self.buffer, self.pos)
+                if match is not None:
+                    self.pos = match.start()
+                    return
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    return
+
+        depth = 0
+
+        while True:
+            match = _STRUCTURE.search(self.buffer, self.pos)
+
+            if match is None:
+                self.pos = len(self.buffer)
+                if not self._fill():
+                    raise ValueError("Notebook ends unexpectedly")
+                continue
+
+            self.pos = match.start()
+
+            if match.group() == '"':
+                self.pos = self._string_end()
+                continue
+
+            self.pos += 1
+            depth += 1 if match.group() in "[{" else -1
+
+            if depth == 0:
+                return
+
+    def read_value(self) -> object:
+        """Decode the next value, meant for small values like the source
+        of a cell.
+
+        Raises:
+            ValueError: If the value isn't valid JSON.
+
+        Returns:
+            object: The value.
+        """
+        self._peek()
+        decoder = json.JSONDecoder()
+
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+
+            # A number could go on in the next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.pos = end
+            return value
+
+    def iter_object(self) -> Iterator[str]:
+        """Iterate over the keys of the next object.
+
+        The value of each key must be read or skipped before the next key
+        is asked for.
+
+        Raises:
+            ValueError: If the next value isn't an object.
+
+        Returns:
+            Iterator[str]: The keys.
+        """
+        self._expect("{")
+
+        if self._peek() == "}":
+            self.pos += 1
+            return
+
+        while True:
+            key = self.read_value()
+            self._expect(":")
+            yield str(key)
+            if self._expect(",}") == "}":
+                return
+
+    def iter_array(self) -> Iterator[None]:
+        """Iterate over the items of the next array.
+
+        Each item must be read or skipped before the next one is asked
+        for.
+
+        Raises:
+            ValueError: If the next value isn't an array.
+
+        Returns:
+            Iterator[None]: One value per item.
+        """
+        self._expect("[")
+
+        if self._peek() == "]":
+            self.pos += 1
+            return
+
+        while True:
+            yield None
+            if self._expect(",]") == "]":
+                return
+
+
+def iter_cells(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Iterator[Dict[str, object]]:
+    """Lazily read the cells of a notebook, without their outputs.
+
+    Only `cell_type` and `source` are decoded, everything else is skipped
+    as it is read. Reading stops at the end of the cells, so the metadata
+    after them isn't read at all.
+
+    Args:
+        stream (BinaryIO): The notebook, opened in binary mode.
+        chunk_size (int, optional): Number of bytes read at a time.
+            Defaults to 64 KiB.
+
+    Raises:
+        ValueError: If the notebook isn't valid JSON.
+
+    Returns:
+        Iterator[Dict[str, object]]: The type and source of each cell.
+    """
+    scanner = _Scanner(stream, chunk_size)
+
+    for key in scanner.iter_object():
+        if key != "cells":
+            scanner.skip_value()
+            continue
+
+        for _ in scanner.iter_array():
+            cell: Dict[str, object] = {}
+            for cell_key in scanner.iter_object():
+                if cell_key in ("cell_type", "source"):
+                    cell[cell_key] = scanner.read_value()
+                else:
+                    scanner.skip_value()
+            yield cell
+
+        return
+
+
+def strip_magics(source: str) -> str:
+    """Turn the IPython syntax of a cell into plain Python.
+
+    Line magics, shell commands and help requests become `pass`, so
+    blocks stay valid and lines don't move. Cells that already parse
+    are left untouched, so strings that look like magics are kept.
+
+    Args:
+        source (str): Source of a code cell.
+
+    Returns:
+        str: The source without IPython syntax.
+    """
+    if not _MAGIC.search(source):
+        return source
+
+    try:
+        ast.parse(source)
+        return source
+    except SyntaxError:
+        pass
+
+    lines = source.split("\n")
+    continued = False
+
+    for number, line in enumerate(lines):
+        match = None if continued else _MAGIC.match(line)
+
+        if continued:
+            lines[number] = ""
+        elif match:
+            lines[number] = f"{match.group(1)}pass"
+
+        continued = (continued or bool(match)) and line.endswith("\\")
+
+    return "\n".join(lines)
+
+
+def read_notebook(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> NotebookSource:
+    """Join the code cells of a notebook into the source of a module.
+
+    Cells starting with a cell magic, like `%%bash`, aren't Python and
+    are left out.
+
+    Args:
+        stream (BinaryIO): The notebook, opened in binary mode.
+        chunk_size (int, optional): Number of bytes read at a time.
+            Defaults to 64 KiB.
+
+    Raises:
+        ValueError: If the notebook isn't valid JSON.
+
+    Returns:
+        NotebookSource: The source and where each cell starts in it.
+    """
+    parts: List[str] = []
+    starts: List[int] = []
+    cells: List[int] = []
+    line = 1
+
+    for position, cell in enumerate(iter_cells(stream, chunk_size), 1):
+        source = cell.get("source", "")
+        if isinstance(source, list):
+            source = "".join(source)
+
+        if (
+            cell.get("cell_type") != "code"
+            or not isinstance(source, str)
+            or not source.strip()
+            or source.lstrip().startswith("%%")
+        ):
+            continue
+
+        source = strip_magics(source)
+        if not source.endswith("\n"):
+            source += "\n"
+
+        parts.append(source)
+        starts.append(line)
+        cells.append(position)
+        line += source.count("\n")
+
+    return NotebookSource(
+        "".join(parts).encode("utf-8", "replace"),
+        CellMap(tuple(starts), tuple(cells)),
+    )
@@ -1,7 +1,11 @@
 """Functions for printing results of the checks"""
 
 import sys
-from typing import Optional
+from typing import Dict, List, Optional
+
+# Local
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.workers import WorkerPlan
 
 
 def print_module_success(module_name: str, msg: Optional[str] = None) -> None:
@@ -242,6 +246,162 @@ def print_error(error_count: int, error_files: int, num_modules: int) -> None:
     print(f"\033[1;31m{error_str}\033[0m", file=sys.stderr)
 
 
+def print_root_header(root: str, seconds: float, exit_code: int) -> None:
+    """Print the header of the results of a root.
+
+    Args:
+        root (str): The root that was checked.
+        seconds (float): Seconds taken to check the root.
+        exit_code (int): Exit code of the root.
+    """
+
+    print(
+        f"\033[1;37m==> {root}\033[0m ({seconds:.2f}s, exit {exit_code})"
+    )
+
+
+def print_merge_summary(
+    num_shards: int, missing: List[int], seconds: float, wall_seconds: float
+) -> None:
+    """Print a summary of merged shards.
+
+    Args:
+        num_shards (int): Number of partial results merged.
+        missing (List[int]): Shards without a partial result.
+        seconds (float): Total seconds taken by all the shards.
+        wall_seconds (float): Seconds taken by the slowest shard.
+    """
+
+    print(
+        f"Merged {num_shards} shard",
+        end="s" if num_shards != 1 else "",
+    )
+    print(f" ({wall_seconds:.2f}s slowest, {seconds:.2f}s total)")
+
+    if missing:
+        print(
+            "\033[1;31mMissing shards: "
+            + f"{', '.join(map(str, missing))}\033[0m",
+            file=sys.stderr,
+        )
+
+
+def print_merge_failure(err: str) -> None:
+    """Print why partial results couldn't be merged.
+
+    Args:
+        err (str): Error that occurred.
+    """
+
+    print(f"\033[1;31mCan't merge: {err}\033[0m", file=sys.stderr)
+
+
+def print_worker_plan(plan: WorkerPlan) -> None:
+    """Print how the number of workers was decided.
+
+    Args:
+        plan (WorkerPlan): The decision.
+    """
+    mib = 2**20
+
+    if plan.override:
+        reason = "override"
+    else:
+        reason = f"{plan.cpus} cpus"
+        if plan.affinity is not None:
+            reason += f", affinity {plan.affinity}"
+        if plan.quota is not None:
+            reason += f", cgroup quota {plan.quota:g}"
+        if plan.memory is not None:
+            reason += (
+                f", {plan.memory // mib} MiB available"
+                + f" / {plan.per_worker // mib} MiB per worker"
+            )
+
+    print(f"Workers: {plan.workers} ({reason})")
+
+
+def print_backend(backend: str) -> None:
+    """Print what the workers run in.
+
+    Args:
+        backend (str): The backend resolved for this run.
+    """
+    print(f"Backend: {backend}")
+
+
+def print_benchmark(
+    timings: Dict[str, float], num_modules: int, workers: int
+) -> None:
+    """Print how long each backend took to check the same files.
+
+    Args:
+        timings (Dict[str, float]): Seconds the fastest run of each
+            backend took.
+        num_modules (int): Number of modules checked by each run.
+        workers (int): Number of workers of each backend.
+    """
+    fastest = min(timings.values())
+
+    print(
+        f"Checked {num_modules} source file"
+        + ("s" if num_modules != 1 else "")
+        + f" with {workers} worker"
+        + ("s" if workers != 1 else "")
+    )
+
+    for backend, seconds in timings.items():
+        if seconds == fastest:
+            print(f"\033[1;32m{backend}: {seconds:.3f}s (fastest)\033[0m")
+        else:
+            print(f"{backend}: {seconds:.3f}s ({seconds / fastest:.1f}x)")
+
+
+def print_fixed(path: str, inserted: int, error: Optional[str]) -> None:
+    """Print the docstrings inserted in a file, or why it couldn't be
+    fixed.
+
+    Args:
+        path (str): Path to the file.
+        inserted (int): Number of docstrings inserted.
+        error (str | None): Why the file couldn't be fixed, if it couldn't.
+    """
+    if error is not None:
+        print(f"\033[1;31m{path}: can't fix: {error}\033[0m", file=sys.stderr)
+        return
+
+    plural = "s" if inserted > 1 else ""
+    print(
+        f"\033[1;33m{path}:\033[1;32m {inserted} docstring{plural} "
+        + "inserted\033[0m",
+        file=sys.stderr,
+    )
+
+
+def print_fix_summary(
+    inserted: int, files_fixed: int, num_modules: int, dry_run: bool
+) -> None:
+    """Print how many docstrings were, or would be, inserted.
+
+    Args:
+        inserted (int): Number of docstrings inserted.
+        files_fixed (int): Number of files with docstrings inserted.
+        num_modules (int): Number of modules checked.
+        dry_run (bool): Whether the fixes were only shown as a diff.
+    """
+    verb = "Would insert" if dry_run else "Inserted"
+    print(
+        f"\033[1;32m{verb} {inserted} docstring"
+        + ("s" if inserted != 1 else "")
+        + f" in {files_fixed} source file"
+        + ("s" if files_fixed != 1 else "")
+        + f" (checked {num_modules} source file"
+        + ("s" if num_modules != 1 else "")
+        + ")\033[0m",
+        file=sys.stderr,
+    )
+
+
 def print_success(num_modules: int) -> None:
     """Print success message when all documentation
     is present.
@@ -259,3 +419,32 @@ def print_success(num_modules: int) -> None:
         print("s\033[0m")
     else:
         print("\033[0m")
+
+
+def print_finding(finding: Finding) -> None:
+    """Print a finding with the print function of its kind.
+
+    Findings of notebooks are printed at `path:cell_N`.
+
+    Args:
+        finding (Finding): Finding to print.
+    """
+    path = finding.path
+    if finding.cell is not None:
+        path = f"{path}:cell_{finding.cell}"
+
+    if finding.kind == "module":
+        print_module_err(path, finding.err)
+    elif finding.kind == "function":
+        print_function_err(path, finding.name, finding.err, line=finding.line)
+    elif finding.kind == "class":
+        print_class_err(path, finding.name, finding.err, line=finding.line)
+    else:
+        class_name, _, method_name = finding.name.partition(".")
+        print_method_err(
+            path,
+            class_name,
+            method_name,
+            finding.err,
+            line=finding.line,
+        )
@@ -0,0 +1,711 @@
+#!/usr/bin/env python3
+"""Rule registry and compiled rule sets"""
+
+import ast
+import copy
+import re
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+
+# Local
+from pycheckdoc_v2.check_docstring import STYLES
+from pycheckdoc_v2.class_index import Hierarchy
+from pycheckdoc_v2.exports import ExportGraph
+
+KINDS = ("module", "function", "class", "method")
+
+
+class Target(NamedTuple):
+    """What a rule sees of a definition, the same whether it comes from
+    the AST or from a cached skeleton.
+
+    `name` is "" for the module and doesn't include the class for methods.
+    `decorators` are the trailing names of the decorators, so `@overload`
+    and `@typing.overload` both give `overload`.
+    """
+
+    name: str
+    kind: str
+    decorators: Tuple[str, ...]
+
+
+Predicate = Callable[[Target], bool]
+
+
+class Rule(NamedTuple):
+    """A registered rule.
+
+    A rule is a predicate that returns `True` if a definition should be
+    ignored by the checks. It is given the `Target` of the definition.
+    """
+
+    name: str
+    kinds: Tuple[str, ...]
+    predicate: Predicate
+
+
+RULES: Dict[str, Rule] = {}
+
+# Configuration keys that are not ignore rules.
+OPTIONS: Dict[str, Any] = {
+    "min-length": 0,
+    "style": None,
+    "inherit-docs": False,
+    "public-api": False,
+    "doctest": False,
+    "doctest-timeout": 5.0,
+    "quality": False,
+    "placeholders": None,
+}
+
+# Placeholder words searched anywhere in docstrings. `compile_placeholders`
+# rewrites each pattern to start with a literal character, so the search
+# skips ahead to the characters that can start a match instead of trying
+# every pattern at every one.
+PLACEHOLDERS = (
+    r"\bTODO\b",
+    r"\bFIXME\b",
+    r"\bXXX\b",
+    r"\bTBD\b",
+    # Not "Insert docstring skeletons", which describes rather than asks.
+    r"\b[Ii]nsert (?:a |the |your )?"
+    + r"(?:docstring|description|documentation)(?: here)?\b(?![ \t]*\w)",
+    r"\b[Ll]orem ipsum\b",
+)
+
+# Words that don't count when comparing a docstring with its name.
+_FILLER_WORDS = frozenset(
+    ("a", "an", "the", "class", "function", "method", "module")
+)
+
+# Short docstrings that are placeholders as a whole, once reduced to their
+# words. The empty string stands for docstrings like "...".
+_PLACEHOLDER_WORDS = frozenset(
+    (
+        "",
+        "description",
+        "docstring",
+        "documentation",
+        "empty",
+        "fixme",
+        "na",
+        "none",
+        "placeholder",
+        "summary",
+        "tbd",
+        "todo",
+    )
+)
+
+_WORD = re.compile(r"[^\W_]+")
+
+# The start of a pattern that can be rewritten to start with a literal
+# character: a word boundary, a class of letters like `[Ii]` and letters,
+# where neither the class nor the last letter is repeated.
+_LITERAL_HEAD = re.compile(
+    r"(\\b)?(?:\[([A-Za-z]+)\](?![*+?{]))?([A-Za-z]*)(?![*+?{])"
+)
+
+
+def register_rule(
+    name: str, kinds: Tuple[str, ...] = KINDS
+) -> Callable[[Predicate], Predicate]:
+    """Register a rule so that it can be enabled from the configuration.
+
+    Args:
+        name (str): Configuration key of the rule.
+        kinds (Tuple[str, ...], optional): Kinds of definitions the rule
+            applies to. Defaults to all kinds.
+
+    Returns:
+        Callable: Decorator that registers the predicate.
+    """
+
+    def decorator(predicate: Predicate) -> Predicate:
+        RULES[name] = Rule(name, kinds, predicate)
+        return predicate
+
+    return decorator
+
+
+def _decorator_names(node: ast.AST) -> List[str]:
+    """Get the trailing names of the decorators of a definition.
+
+    `@overload` and `@typing.overload` both give `overload` while
+    `@value.setter` gives `setter`.
+
+    Args:
+        node (ast.AST): Definition node or skeleton `Definition`.
+
+    Returns:
+        List[str]: Names of the decorators.
+    """
+    # Definition skeletons keep the names instead of the decorators.
+    decorators = getattr(node, "decorators", None)
+    if decorators is not None:
+        return list(decorators)
+
+    names = []
+
+    for decorator in getattr(node, "decorator_list", []):
+        if isinstance(decorator, ast.Call):
+            decorator = decorator.func
+
+        if isinstance(decorator, ast.Name):
+            names.append(decorator.id)
+        elif isinstance(decorator, ast.Attribute):
+            names.append(decorator.attr)
+
+    return names
+
+
+def _is_dunder(name: str) -> bool:
+    """Check if name is a dunder name like `__init__`.
+
+    Args:
+        name (str): Name to check.
+
+    Returns:
+        bool: True if name is a dunder name.
+    """
+    return len(name) > 4 and name.startswith("__") and name.endswith("__")
+
+
+@register_rule("ignore-private", ("function", "class", "method"))
+def is_private(target: Target) -> bool:
+    """Check if the definition is private, i.e. starts with an underscore
+    but is not a dunder.
+
+    Args:
+        target (Target): Function or class.
+
+    Returns:
+        bool: True if the definition is private.
+    """
+    return target.name.startswith("_") and not _is_dunder(target.name)
+
+
+@register_rule("ignore-dunder", ("function", "method"))
+def is_dunder(target: Target) -> bool:
+    """Check if the definition is a dunder like `__init__`.
+
+    Args:
+        target (Target): Function or method.
+
+    Returns:
+        bool: True if the definition is a dunder.
+    """
+    return _is_dunder(target.name)
+
+
+@register_rule("ignore-overload", ("function", "method"))
+def is_overload(target: Target) -> bool:
+    """Check if the definition is decorated with `typing.overload`.
+
+    Args:
+        target (Target): Function or method.
+
+    Returns:
+        bool: True if the definition is an overload.
+    """
+    return "overload" in target.decorators
+
+
+@register_rule("ignore-property-setters", ("method",))
+def is_property_setter(target: Target) -> bool:
+    """Check if the method is a property setter or deleter.
+
+    Args:
+        target (Target): Method.
+
+    Returns:
+        bool: True if the method is a setter or deleter.
+    """
+    return "setter" in target.decorators or "deleter" in target.decorators
+
+
+@register_rule("ignore-tests", ("function", "class", "method"))
+def is_test(target: Target) -> bool:
+    """Check if the definition is a test function or a test class.
+
+    Args:
+        target (Target): Function, class or method.
+
+    Returns:
+        bool: True if the definition is a test.
+    """
+    if target.kind == "class":
+        return target.name.startswith("Test")
+
+    return target.name.startswith("test")
+
+
+def _words(text: str) -> str:
+    """Join the words of a text or name, without case, separators and
+    filler words, so that `get_value` and "Get the value." match.
+
+    Args:
+        text (str): The text or name.
+
+    Returns:
+        str: The words joined.
+    """
+    return "".join(
+        word
+        for word in _WORD.findall(text.lower())
+        if word not in _FILLER_WORDS
+    )
+
+
+def module_stem(path: str) -> str:
+    """Get the name a module docstring is compared with, the name of its
+    package for an `__init__.py`.
+
+    Args:
+        path (str): Path of the module, or `archive!member`.
+
+    Returns:
+        str: The name.
+    """
+    head, _, tail = path.replace("\\", "/").rpartition("/")
+    stem = tail.split(".", 1)[0]
+
+    if stem == "__init__":
+        return head.rpartition("/")[2]
+
+    return stem
+
+
+def _literal_alternatives(pattern: str) -> List[str]:
+    """Rewrite a pattern into alternatives that start with a literal
+    character.
+
+    A class of letters at the start gives one alternative per letter. A
+    word boundary at the start is checked after the word instead, by a
+    lookbehind, so `\\bTODO` becomes `TODO(?<!\\wTODO)`.
+
+    Args:
+        pattern (str): Regular expression.
+
+    Returns:
+        List[str]: The alternatives, or the pattern itself if its start
+            can't be rewritten.
+    """
+    match = _LITERAL_HEAD.match(pattern)
+    boundary, letters, word = match.groups()  # type: ignore
+
+    if not letters and not (boundary and word):
+        return [pattern]
+
+    rest = pattern[match.end():]  # type: ignore
+    alternatives = []
+
+    for letter in dict.fromkeys(letters or [""]):
+        head = letter + word
+        if boundary:
+            head += f"(?<!\\w{head})"
+        alternatives.append(head + rest)
+
+    return alternatives
+
+
+def compile_placeholders(
+    patterns: Sequence[str],
+) -> Optional[Pattern[str]]:
+    """Compile placeholder patterns into one regular expression, so that
+    a docstring is searched once whatever the number of patterns.
+
+    The search only skips ahead to the characters that can start a match
+    when every alternative starts with a literal one, so patterns starting
+    with a class of letters or a word boundary, like `\\b[Ii]nsert`, are
+    rewritten by `_literal_alternatives`.
+
+    Args:
+        patterns (Sequence[str]): Regular expressions of placeholders.
+
+    Raises:
+        ValueError: If a pattern isn't a valid regular expression.
+
+    Returns:
+        Pattern[str] | None: The alternation of the patterns, or None if
+            there are none.
+    """
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise ValueError(
+                f"Invalid placeholder pattern: '{pattern}' ({e})"
+            ) from None
+
+    if not patterns:
+        return None
+
+    try:
+        # Valid patterns can still conflict once combined, e.g. with
+        # global flags, groups of the same name or numbered references.
+        return re.compile(
+            "|".join(
+                f"(?:{expanded})"
+                for pattern in patterns
+                for expanded in _literal_alternatives(pattern)
+            )
+        )
+    except re.error as e:
+        raise ValueError(
+            f"Placeholder patterns can't be combined ({e})"
+        ) from None
+
+
+# Compiled once, as every rule set without its own patterns uses it.
+DEFAULT_PLACEHOLDERS = compile_placeholders(PLACEHOLDERS)
+
+
+class RuleSet:
+    """Rules compiled from a configuration.
+
+    The enabled rules are grouped into a single table mapping each kind
+    of definition to its predicates. The rule set is built once and is
+    picklable so that it can be sent to worker processes.
+    """
+
+    def __init__(
+        self,
+        table: Optional[Dict[str, Tuple[Predicate, ...]]] = None,
+        min_length: int = 0,
+        style: Optional[str] = None,
+        inherit_docs: bool = False,
+        public_api: bool = False,
+        doctest: bool = False,
+        doctest_timeout: float = 5.0,
+        placeholders: Optional[Pattern[str]] = DEFAULT_PLACEHOLDERS,
+        quality: bool = False,
+    ) -> None:
+        """Initialize the rule set.
+
+        Args:
+            table (Dict[str, Tuple[Predicate, ...]] | None, optional):
+                Predicates for each kind of definition. Defaults to None.
+            min_length (int, optional): Minimum length of a docstring for
+                it to count as documentation. Defaults to 0.
+            style (str | None, optional): Docstring style to validate the
+                content of function docstrings against. Content is not
+                validated if None. Defaults to None.
+            inherit_docs (bool, optional): Whether methods without a
+                docstring inherit the docstring of the method they
+                override. Defaults to `False`.
+            public_api (bool, optional): Whether to only check the
+                definitions exported by the public modules of the project.
+                Defaults to `False`.
+            doctest (bool, optional): Whether to run the examples of
+                docstrings. Defaults to `False`.
+            doctest_timeout (float, optional): Seconds an example may run
+                for. Defaults to 5.0.
+            placeholders (Pattern[str] | None, optional): Pattern found in
+                placeholder docstrings, from `compile_placeholders`.
+                Defaults to the pattern of `PLACEHOLDERS`.
+            quality (bool, optional): Whether to report placeholder
+                docstrings, docstrings that repeat their name and
+                docstrings shorter than `min_length`. Defaults to `False`.
+        """
+        self.table = {kind: () for kind in KINDS}
+        self.table.update(table or {})
+        self.min_length = min_length
+        self.style = style
+        self.inherit_docs = inherit_docs
+        self.public_api = public_api
+        self.doctest = doctest
+        self.doctest_timeout = doctest_timeout
+        self.placeholders = placeholders
+        self.quality = quality
+
+        # Index of the project and its public API, set by `with_hierarchy`.
+        self.hierarchy: Optional[Hierarchy] = None
+        self.exports: Optional[ExportGraph] = None
+
+    @property
+    def needs_hierarchy(self) -> bool:
+        """Whether the rules need an index of the project.
+
+        Returns:
+            bool: True if docstrings are inherited or only the public API
+                is checked, and there's no index yet.
+        """
+        return (self.inherit_docs or self.public_api) and (
+            self.hierarchy is None
+        )
+
+    def with_config(self, overrides: Dict[str, Any]) -> "RuleSet":
+        """Get a copy of the rules with some options overridden, like the
+        flags of the command line override the configuration.
+
+        The overrides are validated like the configuration. The ignore
+        rules are kept but not the index of the project.
+
+        Args:
+            overrides (Dict[str, Any]): Values of keys of `OPTIONS`.
+
+        Raises:
+            ValueError: If a key isn't an option or a value is invalid.
+
+        Returns:
+            RuleSet: The copy.
+        """
+        for key in overrides:
+            if key not in OPTIONS:
+                raise ValueError(f"Unknown option: '{key}'")
+
+        options = {
+            "min-length": self.min_length,
+            "style": self.style,
+            "inherit-docs": self.inherit_docs,
+            "public-api": self.public_api,
+            "doctest": self.doctest,
+            "doctest-timeout": self.doctest_timeout,
+            "quality": self.quality,
+            # None means there are none, unlike in the configuration.
+            "placeholders": self.placeholders or [],
+        }
+        options.update(overrides)
+
+        return RuleSet(self.table, **_rule_options(options))
+
+    def with_hierarchy(self, hierarchy: Hierarchy) -> "RuleSet":
+        """Get a copy of the rules that resolves inherited docstrings
+        and the public API through an index of the project.
+
+        Args:
+            hierarchy (Hierarchy): Index of the project.
+
+        Returns:
+            RuleSet: The copy.
+        """
+        rules = copy.copy(self)
+        rules.hierarchy = hierarchy
+        if self.public_api:
+            rules.exports = ExportGraph(hierarchy)
+        return rules
+
+    def ignores(self, kind: str, node: Any) -> bool:
+        """Check if a definition is ignored by the rules.
+
+        The rules are given the same `Target` for a node of the AST and
+        for the `Definition` of its cached skeleton.
+
+        Args:
+            kind (str): Kind of the definition, one of `KINDS`.
+            node (Any): Definition node or skeleton `Definition`.
+
+        Returns:
+            bool: True if any of the rules ignores the definition.
+        """
+        predicates = self.table[kind]
+        if not predicates:
+            return False
+
+        target = Target(
+            getattr(node, "name", ""), kind, tuple(_decorator_names(node))
+        )
+        return any(predicate(target) for predicate in predicates)
+
+    def has_doc(self, node: ast.AST) -> bool:
+        """Check if a node has documentation that satisfies the rules.
+
+        Args:
+            node (ast.AST): Module, class or function node.
+
+        Returns:
+            bool: True if the node has an acceptable docstring.
+        """
+        return self.accepts(ast.get_docstring(node))  # type: ignore
+
+    def accepts(self, docstring: Optional[str]) -> bool:
+        """Check if a cleaned up docstring satisfies the rules.
+
+        Args:
+            docstring (str | None): The docstring, or None if there's none.
+
+        Returns:
+            bool: True if the docstring is acceptable documentation.
+        """
+        if not docstring:
+            return False
+
+        return len(docstring) >= self.min_length
+
+    def node_quality_error(self, node: ast.AST, name: str) -> Optional[str]:
+        """Get why the docstring of a node is of too low quality.
+
+        Args:
+            node (ast.AST): Module, class or function node.
+            name (str): Name of the definition, or of the module.
+
+        Returns:
+            str | None: The reason, or None if the docstring is missing,
+                fine or quality isn't checked.
+        """
+        if not self.quality:
+            return None
+
+        docstring = ast.get_docstring(node)  # type: ignore
+        return self.quality_error(docstring, name)
+
+    def quality_error(
+        self, docstring: Optional[str], name: str
+    ) -> Optional[str]:
+        """Get why a cleaned up docstring is of too low quality.
+
+        Args:
+            docstring (str | None): The docstring, or None if there's none.
+            name (str): Name of the definition, or of the module.
+
+        Returns:
+            str | None: The reason, or None if the docstring is missing,
+                fine or quality isn't checked.
+        """
+        if not self.quality or not docstring:
+            return None
+
+        if self.placeholders is not None:
+            match = self.placeholders.search(docstring)
+            if match is not None:
+                return f"placeholder docstring: '{match.group().strip()}'"
+
+        # Only docstrings about as short as a name are reduced to words.
+        if len(docstring) <= 2 * len(name) + 32:
+            words = _words(docstring)
+            if words in _PLACEHOLDER_WORDS:
+                return f"placeholder docstring: '{docstring}'"
+            if words == _words(name):
+                return "docstring only repeats the name"
+
+        if len(docstring) < self.min_length:
+            return f"docstring is shorter than {self.min_length} characters"
+
+        return None
+
+    def inherits_doc(self, path: str, class_name: str, method: str) -> bool:
+        """Check if a method without a docstring inherits acceptable
+        documentation from a method it overrides.
+
+        Args:
+            path (str): Path of the module defining the class.
+            class_name (str): Name of the class.
+            method (str): Name of the method.
+
+        Returns:
+            bool: True if docstrings are inherited and the inherited one
+                satisfies the rules.
+        """
+        if not self.inherit_docs or self.hierarchy is None:
+            return False
+
+        length = self.hierarchy.inherited_doc_length(path, class_name, method)
+
+        return length > 0 and length >= self.min_length
+
+    def is_public(self, path: str, qualname: str) -> bool:
+        """Check if a definition is checked by the public API rules.
+
+        Args:
+            path (str): Path of the module.
+            qualname (str): Name of the definition, `Class.method` for
+                methods or "" for the module itself.
+
+        Returns:
+            bool: True unless only the public API is checked and the
+                definition isn't part of it.
+        """
+        if not self.public_api or self.exports is None:
+            return True
+
+        return self.exports.is_public(path, qualname)
+
+
+DEFAULT_RULES = RuleSet()
+
+
+def _rule_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate the options of a rule set, from the configuration or the
+    command line, and convert them to the arguments of `RuleSet`.
+
+    Args:
+        options (Dict[str, Any]): Value of each key of `OPTIONS`.
+
+    Raises:
+        ValueError: If a docstring style is unknown, a number is out of
+            range or a placeholder pattern is invalid.
+
+    Returns:
+        Dict[str, Any]: Keyword arguments of `RuleSet`.
+    """
+    style = options["style"]
+    if style is not None and style not in STYLES:
+        raise ValueError(
+            f"Unknown docstring style: '{style}'. "
+            + f"Choose from {', '.join(STYLES)}"
+        )
+
+    min_length = int(options["min-length"])
+    if min_length < 0:
+        raise ValueError("min-length must be at least 0")
+
+    doctest_timeout = float(options["doctest-timeout"])
+    if not doctest_timeout > 0:
+        raise ValueError("doctest-timeout must be positive")
+
+    placeholders = options["placeholders"]
+    if placeholders is None:
+        placeholders = DEFAULT_PLACEHOLDERS
+    elif not isinstance(placeholders, re.Pattern):
+        placeholders = compile_placeholders(placeholders)
+
+    return {
+        "min_length": min_length,
+        "style": style,
+        "inherit_docs": bool(options["inherit-docs"]),
+        "public_api": bool(options["public-api"]),
+        "doctest": bool(options["doctest"]),
+        "doctest_timeout": doctest_timeout,
+        "placeholders": placeholders,
+        "quality": bool(options["quality"]),
+    }
+
+
+def compile_rules(config: Dict[str, Any]) -> RuleSet:
+    """Compile a configuration into a rule set.
+
+    Args:
+        config (Dict[str, Any]): The `[tool.pycheckdoc]` configuration.
+
+    Raises:
+        ValueError: If the configuration has an unknown key or an
+            invalid option.
+
+    Returns:
+        RuleSet: The compiled rules.
+    """
+    table: Dict[str, Tuple[Predicate, ...]] = {kind: () for kind in KINDS}
+    options = dict(OPTIONS)
+
+    for key, value in config.items():
+        if key in OPTIONS:
+            options[key] = value
+        elif key in RULES:
+            if value:
+                rule = RULES[key]
+                for kind in rule.kinds:
+                    table[kind] += (rule.predicate,)
+        else:
+            raise ValueError(f"Unknown configuration key: '{key}'")
+
+    return RuleSet(table, **_rule_options(options))
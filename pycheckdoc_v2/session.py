@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""Check files from asyncio code with long-lived shared workers"""
+
+import asyncio
+from collections import deque
+from concurrent.futures import Future
+from typing import AsyncIterator, Deque, List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.backends import CheckPool
+from pycheckdoc_v2.findings import Finding, check_error
+from pycheckdoc_v2.generate_ast import iter_paths
+from pycheckdoc_v2.rules import RuleSet
+from pycheckdoc_v2.workers import default_workers
+
+
+class Session:
+    """Workers shared by every check made through the session.
+
+    The workers are started on the first check and kept until the
+    session is closed, so requests of an async service neither start a
+    pool each nor block the event loop. At most `max_in_flight` files are
+    scheduled at a time across all the checks running concurrently; a
+    check waits for a free slot before scheduling its next file.
+
+    The workers keep the rules they are started with, so rules that
+    inherit docstrings or check the public API must already have the
+    index of the projects the session checks, from `with_hierarchy`.
+
+    Usage
+    ---
+
+    ```Python
+    async with Session(rules) as session:
+        async for path, findings in session.iter_findings(["."], True):
+            print(path, findings)
+    ```
+    """
+
+    def __init__(
+        self,
+        rules: Optional[RuleSet] = None,
+        max_workers: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+        backend: str = "auto",
+        use_cache: bool = False,
+    ) -> None:
+        """Initialize the session. No worker is started yet.
+
+        Args:
+            rules (RuleSet | None, optional): Compiled rules to apply.
+                Defaults to None.
+            max_workers (int | None, optional): Number of workers.
+                Defaults to what the CPUs and memory available allow.
+            max_in_flight (int | None, optional): Maximum number of files
+                scheduled at a time by all the checks. Defaults to twice
+                the number of workers.
+            backend (str, optional): Whether to check files in processes or
+                threads, see `resolve_backend`. Defaults to `auto`.
+            use_cache (bool, optional): Whether to go through the skeleton
+                cache. Defaults to `False`.
+
+        Raises:
+            ValueError: If the rules need an index of the projects and
+                have none.
+        """
+        if rules is not None and rules.needs_hierarchy:
+            raise ValueError(
+                "Rules with inherit-docs or public-api need the index of the "
+                + "projects: pass rules.with_hierarchy(build_hierarchy(paths))"
+            )
+
+        self.rules = rules
+        self.max_workers = max_workers or default_workers()
+        self.max_in_flight = max(1, max_in_flight or 2 * self.max_workers)
+        self.backend = backend
+        self.use_cache = use_cache
+
+        self._pool: Optional[CheckPool] = None
+        # Created in the loop of the first check, as before Python 3.10 a
+        # semaphore is bound to the loop current when it is created.
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._closed = False
+
+    async def __aenter__(self) -> "Session":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _get_pool(self) -> CheckPool:
+        """Get the workers, starting them on first use.
+
+        Raises:
+            RuntimeError: If the session is closed.
+
+        Returns:
+            CheckPool: The workers of the session.
+        """
+        if self._closed:
+            raise RuntimeError("Session is closed")
+
+        if self._pool is None:
+            self._pool = CheckPool(
+                self.backend, self.max_workers, self.rules, self.use_cache
+            )
+
+        return self._pool
+
+    async def _submit(self, path: str) -> "asyncio.Future":
+        """Schedule a file once a slot is free.
+
+        The slot is given back as soon as the file is done or cancelled,
+        whether or not its result was read.
+
+        Args:
+            path (str): Path of the file.
+
+        Returns:
+            asyncio.Future: Future of the result of `check_file`.
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_in_flight)
+
+        slots = self._slots
+        await slots.acquire()
+
+        try:
+            future = self._get_pool().submit(path)
+        except BaseException:
+            slots.release()
+            raise
+
+        loop = asyncio.get_running_loop()
+
+        def release(_: Future) -> None:
+            """Give the slot back from the thread completing the file."""
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(slots.release)
+
+        future.add_done_callback(release)
+
+        return asyncio.wrap_future(future)
+
+    async def iter_findings(
+        self, paths: List[str], recursive: bool = False
+    ) -> AsyncIterator[Tuple[str, List[Finding]]]:
+        """Check the files at paths with the session's workers.
+
+        Results are yielded in the order of the paths. Directories are
+        walked in a thread so the event loop isn't blocked.
+
+        If the caller stops iterating or its task is cancelled, the files
+        still scheduled are cancelled and their slots given back. The
+        workers keep running for the other checks.
+
+        Args:
+            paths (List[str]): Paths to files / directories to check.
+            recursive (bool, optional): Whether to check directories
+                recursively. Defaults to `False`.
+
+        Returns:
+            AsyncIterator[Tuple[str, List[Finding]]]: Tuples of the path of
+                each non empty file and its findings.
+        """
+        files = await self._list_files(paths, recursive)
+
+        async for result in self._iter_files(files):
+            yield result
+
+    async def _list_files(
+        self, paths: List[str], recursive: bool
+    ) -> List[str]:
+        """List the files at paths in a thread.
+
+        Args:
+            paths (List[str]): Paths to files / directories to check.
+            recursive (bool): Whether to walk directories recursively.
+
+        Returns:
+            List[str]: The files found.
+        """
+        # Not `asyncio.to_thread`, which needs Python 3.9.
+        return await asyncio.get_running_loop().run_in_executor(
+            None, list, iter_paths(paths, recursive, None)
+        )
+
+    async def _iter_files(
+        self, files: List[str]
+    ) -> AsyncIterator[Tuple[str, List[Finding]]]:
+        """Check files with the session's workers, see `iter_findings`.
+        Files that export nothing are skipped if only the public API is
+        checked.
+
+        Args:
+            files (List[str]): Paths to the files.
+
+        Returns:
+            AsyncIterator[Tuple[str, List[Finding]]]: Tuples of the path of
+                each non empty file and its findings.
+        """
+        if self.rules is not None and self.rules.exports is not None:
+            exports = self.rules.exports
+            files = [path for path in files if exports.contributes(path)]
+
+        in_flight: Deque[Tuple[str, "asyncio.Future"]] = deque()
+
+        async def collect() -> Optional[Tuple[str, List[Finding]]]:
+            """Wait for the oldest scheduled file.
+
+            Returns:
+                Tuple[str, List[Finding]] | None: Result of the file, with
+                    the error as its finding if it couldn't be checked, or
+                    None if it is empty.
+            """
+            path, future = in_flight[0]
+            try:
+                return await future
+            except Exception as e:
+                return (path, [check_error(path, e)])
+            finally:
+                if future.done():
+                    in_flight.popleft()
+
+        try:
+            for path in files:
+                while in_flight and (
+                    len(in_flight) >= self.max_in_flight
+                    or in_flight[0][1].done()
+                ):
+                    result = await collect()
+                    if result:
+                        yield result
+
+                in_flight.append((path, await self._submit(path)))
+
+            while in_flight:
+                result = await collect()
+                if result:
+                    yield result
+        finally:
+            for _, future in in_flight:
+                future.cancel()
+
+    async def check(
+        self, paths: List[str], recursive: bool = False
+    ) -> Tuple[int, int]:
+        """Check the files at paths with the session's workers.
+
+        Args:
+            paths (List[str]): Paths to files / directories to check.
+            recursive (bool, optional): Whether to check directories
+                recursively. Defaults to `False`.
+
+        Returns:
+            Tuple[int, int]: Tuple of total errors and files with errors. If
+                no files are found then (-1, -1) is returned.
+        """
+        files = await self._list_files(paths, recursive)
+        if not files:
+            return (-1, -1)
+
+        total_errors = 0
+        files_with_errors = 0
+
+        async for _, findings in self._iter_files(files):
+            total_errors += len(findings)
+            files_with_errors += bool(findings)
+
+        return (total_errors, files_with_errors)
+
+    async def close(self) -> None:
+        """Stop the workers once their current files are done. Joining
+        them happens in a thread so the event loop isn't blocked.
+        """
+        self._closed = True
+
+        if self._pool is not None:
+            pool, self._pool = self._pool, None
+            await asyncio.get_running_loop().run_in_executor(
+                None, pool.close
+            )
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""Split checks across machines and merge their partial results"""
+
+import json
+import os
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.findings import Finding, finding_order, path_order
+
+PARTIAL_VERSION = 1
+
+
+class Partial(NamedTuple):
+    """Result of checking one shard."""
+
+    shard: Tuple[int, int]
+    files: List[str]
+    findings: List[Finding]
+    seconds: float
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """Parse a shard given as `i/N`, where shards are numbered from 1.
+
+    Args:
+        value (str): The shard, e.g. "2/5".
+
+    Raises:
+        ValueError: If the value is not of the form `i/N` with
+            1 <= i <= N.
+
+    Returns:
+        Tuple[int, int]: Tuple of the shard number and number of shards.
+    """
+    index, _, count = value.partition("/")
+
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise ValueError(f"Shard must be of the form i/N, not '{value}'")
+
+    if not 1 <= shard[0] <= shard[1]:
+        raise ValueError(f"Shard must satisfy 1 <= i <= N, not '{value}'")
+
+    return shard
+
+
+def relative_path(path: str) -> str:
+    """Get the path relative to the current working directory, with
+    forward slashes so that it is the same on every machine.
+
+    Args:
+        path (str): Absolute or relative path.
+
+    Returns:
+        str: The relative path.
+    """
+    return Path(os.path.relpath(path)).as_posix()
+
+
+def shard_of(path: str, count: int) -> int:
+    """Get the shard a file is assigned to.
+
+    The shard is derived from a stable hash of the relative path, so
+    every machine assigns the same files to the same shard.
+
+    Args:
+        path (str): Path to the file.
+        count (int): Number of shards.
+
+    Returns:
+        int: The shard number, from 1 to count.
+    """
+    return zlib.crc32(relative_path(path).encode()) % count + 1
+
+
+def in_shard(path: str, shard: Optional[Tuple[int, int]]) -> bool:
+    """Check if a file belongs to the given shard.
+
+    Args:
+        path (str): Path to the file.
+        shard (Tuple[int, int] | None): Tuple of the shard number and
+            number of shards. Every file belongs to shard None.
+
+    Returns:
+        bool: True if the file is checked by the shard.
+    """
+    if shard is None:
+        return True
+
+    return shard_of(path, shard[1]) == shard[0]
+
+
+def write_partial(path: str, partial: Partial) -> None:
+    """Write the result of a shard to a file.
+
+    Paths are stored relative to the current working directory.
+
+    Args:
+        path (str): Path to write the partial result to.
+        partial (Partial): Result of the shard.
+    """
+    data: Dict[str, Any] = {
+        "version": PARTIAL_VERSION,
+        "shard": list(partial.shard),
+        "files": sorted(relative_path(file) for file in partial.files),
+        "findings": [
+            [relative_path(finding.path), *finding[1:]]
+            for finding in partial.findings
+        ],
+        "seconds": partial.seconds,
+    }
+
+    with open(path, "w") as f:
+        json.dump(data, f)
+
+
+def read_partial(path: str) -> Partial:
+    """Read the result of a shard from a file.
+
+    Args:
+        path (str): Path to the partial result.
+
+    Raises:
+        ValueError: If the file is not a partial result of a supported
+            version.
+
+    Returns:
+        Partial: Result of the shard.
+    """
+    with open(path) as f:
+        data = json.load(f)
+
+    if data.get("version") != PARTIAL_VERSION:
+        raise ValueError(f"{path}: unsupported partial result")
+
+    return Partial(
+        tuple(data["shard"]),  # type: ignore
+        data["files"],
+        [Finding(*finding) for finding in data["findings"]],
+        data["seconds"],
+    )
+
+
+class MergedReport(NamedTuple):
+    """Partial results of all the shards combined."""
+
+    findings: List[Finding]
+    files: List[str]
+    missing_shards: List[int]
+    seconds: float
+    wall_seconds: float
+
+
+def merge_partials(partials: List[Partial]) -> MergedReport:
+    """Combine the partial results of shards into one report.
+
+    Args:
+        partials (List[Partial]): Partial results to combine.
+
+    Raises:
+        ValueError: If the partials don't have the same number of shards
+            or a shard is given twice.
+
+    Returns:
+        MergedReport: The combined report. Findings and files are sorted.
+    """
+    counts = {partial.shard[1] for partial in partials}
+    if len(counts) > 1:
+        raise ValueError("Partial results have different numbers of shards")
+
+    seen = [partial.shard[0] for partial in partials]
+    if len(seen) != len(set(seen)):
+        raise ValueError("Partial results have duplicate shards")
+
+    count = counts.pop() if counts else 0
+    missing = sorted(set(range(1, count + 1)) - set(seen))
+
+    findings: List[Finding] = []
+    files: List[str] = []
+
+    for partial in partials:
+        findings.extend(partial.findings)
+        files.extend(partial.files)
+
+    return MergedReport(
+        sorted(findings, key=finding_order),
+        sorted(files, key=path_order),
+        missing,
+        sum(partial.seconds for partial in partials),
+        max((partial.seconds for partial in partials), default=0.0),
+    )
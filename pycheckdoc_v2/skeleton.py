@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+"""Cache the definitions of modules so rules can be applied without
+parsing"""
+
+import ast
+import hashlib
+import inspect
+import os
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.cache import cache_dir
+from pycheckdoc_v2.check_docstring import (
+    _returns_and_raises,
+    check_docstring_text,
+    get_arg_names,
+)
+from pycheckdoc_v2.findings import Finding, finding_order
+from pycheckdoc_v2.generate_ast import read_source
+from pycheckdoc_v2.rules import (
+    KINDS,
+    RuleSet,
+    _decorator_names,
+    module_stem,
+)
+from pycheckdoc_v2.stubs import stub_path
+
+SKELETON_MAGIC = b"PCDK"
+SKELETON_VERSION = 1
+
+# Kind, first and last line, and flags of a definition.
+_RECORD = struct.Struct("<BIIB")
+_LENGTH = struct.Struct("<I")
+
+_HAS_DOCSTRING = 1
+_RETURNS = 2
+_RAISES = 4
+
+
+class Definition(NamedTuple):
+    """Everything the rules need to know about a definition, whatever
+    the configuration.
+
+    `qualname` is "" for the module and `Class.method` for methods.
+    `docstring` is the raw docstring, before it is cleaned up.
+    """
+
+    qualname: str
+    kind: str
+    line: int
+    end_line: int
+    decorators: Tuple[str, ...]
+    args: Tuple[str, ...]
+    docstring: Optional[str]
+    returns: bool = False
+    raises: bool = False
+
+    @property
+    def name(self) -> str:
+        """Name of the definition without its class.
+
+        Returns:
+            str: The name.
+        """
+        return self.qualname.rpartition(".")[2]
+
+
+def _function_definition(
+    node: ast.FunctionDef, qualname: str, kind: str
+) -> Definition:
+    """Get the skeleton of a function or method.
+
+    Args:
+        node (ast.FunctionDef): Function node.
+        qualname (str): Qualified name of the function.
+        kind (str): "function" or "method".
+
+    Returns:
+        Definition: The skeleton.
+    """
+    returns, raises = _returns_and_raises(node)
+
+    return Definition(
+        qualname,
+        kind,
+        node.lineno,
+        node.end_lineno or node.lineno,
+        tuple(_decorator_names(node)),
+        tuple(get_arg_names(node, is_method=kind == "method")),
+        ast.get_docstring(node, clean=False),
+        returns,
+        raises,
+    )
+
+
+def extract_skeleton(module_node: ast.Module) -> List[Definition]:
+    """Get the definitions that the checks look at in a module: the
+    module itself, its functions, its classes and their methods.
+
+    Args:
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        List[Definition]: The definitions, with the methods of each class
+            right after the class.
+    """
+    definitions = [
+        Definition(
+            "",
+            "module",
+            0,
+            0,
+            (),
+            (),
+            ast.get_docstring(module_node, clean=False),
+        )
+    ]
+
+    for node in module_node.body:
+        if type(node) is ast.FunctionDef:
+            definitions.append(
+                _function_definition(node, node.name, "function")
+            )
+        elif type(node) is ast.ClassDef:
+            definitions.append(
+                Definition(
+                    node.name,
+                    "class",
+                    node.lineno,
+                    node.end_lineno or node.lineno,
+                    tuple(_decorator_names(node)),
+                    (),
+                    ast.get_docstring(node, clean=False),
+                )
+            )
+            definitions.extend(
+                _function_definition(
+                    method, f"{node.name}.{method.name}", "method"
+                )
+                for method in node.body
+                if type(method) is ast.FunctionDef
+            )
+
+    return definitions
+
+
+def check_skeleton(
+    path: str, definitions: List[Definition], rules: RuleSet
+) -> List[Finding]:
+    """Apply rules to the definitions of a module.
+
+    Gives the same findings as the checks on the AST of the module.
+
+    Args:
+        path (str): Path of the module.
+        definitions (List[Definition]): Definitions of the module.
+        rules (RuleSet): Compiled rules to apply.
+
+    Returns:
+        List[Finding]: Findings sorted by line, with the module first.
+    """
+    findings: List[Finding] = []
+    skip_methods = False
+
+    for definition in definitions:
+        kind = definition.kind
+
+        if not rules.is_public(path, definition.qualname):
+            continue
+
+        if kind == "class":
+            # Methods of an ignored class are ignored as well.
+            skip_methods = rules.ignores(kind, definition)
+            if skip_methods:
+                continue
+        elif kind == "method" and skip_methods:
+            continue
+        elif rules.ignores(kind, definition):
+            continue
+
+        docstring = definition.docstring
+        if docstring is not None:
+            docstring = inspect.cleandoc(docstring)
+
+        name = definition.qualname
+        err = rules.quality_error(
+            docstring,
+            module_stem(path) if kind == "module" else definition.name,
+        )
+
+        if err or not rules.accepts(docstring):
+            if (
+                kind == "method"
+                and docstring is None
+                and rules.inherits_doc(path, *name.split("."))
+            ):
+                continue
+            findings.append(Finding(path, definition.line, kind, name, err))
+        elif rules.style and kind in ("function", "method"):
+            for err in check_docstring_text(
+                docstring,  # type: ignore
+                list(definition.args),
+                definition.returns and definition.name != "__init__",
+                definition.raises,
+                rules.style,
+            ):
+                findings.append(
+                    Finding(path, definition.line, kind, name, err)
+                )
+
+    return sorted(findings, key=finding_order)
+
+
+def _pack_string(value: str) -> bytes:
+    """Serialize a string as its length and UTF-8 bytes.
+
+    Args:
+        value (str): The string.
+
+    Returns:
+        bytes: The serialized string.
+    """
+    data = value.encode("utf-8", "surrogatepass")
+    return _LENGTH.pack(len(data)) + data
+
+
+def _unpack_string(body: bytes, offset: int) -> Tuple[str, int]:
+    """Deserialize a string written by `_pack_string`.
+
+    Args:
+        body (bytes): The serialized definitions.
+        offset (int): Where the string starts.
+
+    Returns:
+        Tuple[str, int]: The string and the offset after it.
+    """
+    (size,) = _LENGTH.unpack_from(body, offset)
+    offset += _LENGTH.size
+
+    return (
+        body[offset:offset + size].decode("utf-8", "surrogatepass"),
+        offset + size,
+    )
+
+
+def encode_skeleton(definitions: List[Definition]) -> bytes:
+    """Serialize the definitions of a module.
+
+    Args:
+        definitions (List[Definition]): The definitions.
+
+    Returns:
+        bytes: The serialized definitions.
+    """
+    parts = [_LENGTH.pack(len(definitions))]
+
+    for definition in definitions:
+        flags = (
+            (_HAS_DOCSTRING if definition.docstring is not None else 0)
+            | (_RETURNS if definition.returns else 0)
+            | (_RAISES if definition.raises else 0)
+        )
+        parts.append(
+            _RECORD.pack(
+                KINDS.index(definition.kind),
+                definition.line,
+                definition.end_line,
+                flags,
+            )
+        )
+        parts.append(_pack_string(definition.qualname))
+        parts.append(_pack_string("\0".join(definition.decorators)))
+        parts.append(_pack_string("\0".join(definition.args)))
+        parts.append(_pack_string(definition.docstring or ""))
+
+    return (
+        SKELETON_MAGIC
+        + bytes([SKELETON_VERSION])
+        + zlib.compress(b"".join(parts))
+    )
+
+
+def decode_skeleton(data: bytes) -> List[Definition]:
+    """Deserialize definitions written by `encode_skeleton`.
+
+    Args:
+        data (bytes): The serialized definitions.
+
+    Raises:
+        ValueError: If the data isn't a skeleton of a supported version.
+
+    Returns:
+        List[Definition]: The definitions.
+    """
+    if data[:4] != SKELETON_MAGIC or data[4:5] != bytes([SKELETON_VERSION]):
+        raise ValueError("Not a skeleton of a supported version")
+
+    body = zlib.decompress(data[5:])
+    (count,) = _LENGTH.unpack_from(body)
+    offset = _LENGTH.size
+
+    definitions = []
+
+    for _ in range(count):
+        kind, line, end_line, flags = _RECORD.unpack_from(body, offset)
+        offset += _RECORD.size
+
+        qualname, offset = _unpack_string(body, offset)
+        decorators, offset = _unpack_string(body, offset)
+        args, offset = _unpack_string(body, offset)
+        docstring, offset = _unpack_string(body, offset)
+
+        definitions.append(
+            Definition(
+                qualname,
+                KINDS[kind],
+                line,
+                end_line,
+                tuple(decorators.split("\0")) if decorators else (),
+                tuple(args.split("\0")) if args else (),
+                docstring if flags & _HAS_DOCSTRING else None,
+                bool(flags & _RETURNS),
+                bool(flags & _RAISES),
+            )
+        )
+
+    return definitions
+
+
+def content_hash(content: bytes) -> str:
+    """Get the key of the skeleton of a module's source.
+
+    Args:
+        content (bytes): Source of the module.
+
+    Returns:
+        str: The key.
+    """
+    digest = hashlib.sha256(bytes([SKELETON_VERSION]))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+def skeleton_path(key: str) -> Path:
+    """Get where the skeleton with the given key is cached.
+
+    Args:
+        key (str): Content hash of the module.
+
+    Returns:
+        Path: Path of the cached skeleton.
+    """
+    return cache_dir() / "skeletons" / key[:2] / key
+
+
+def load_skeleton(
+    path: str, content: Optional[bytes] = None
+) -> Optional[List[Definition]]:
+    """Get the definitions of the module at path.
+
+    The module is only parsed if no skeleton is cached for its content.
+    A parsed skeleton is cached for the next time.
+
+    Args:
+        path (str): Path to the module, or `archive!member`.
+        content (bytes | None, optional): Source of the module if it was
+            already read. Defaults to None.
+
+    Returns:
+        List[Definition] | None: The definitions, or None if the module
+            is empty.
+    """
+    if content is None:
+        content = read_source(path)
+
+    if not content:
+        return None
+
+    cached = skeleton_path(content_hash(content))
+
+    try:
+        return decode_skeleton(cached.read_bytes())
+    except (OSError, ValueError, zlib.error, struct.error):
+        pass
+
+    definitions = extract_skeleton(ast.parse(content))
+
+    try:
+        cached.parent.mkdir(parents=True, exist_ok=True)
+        temp = cached.with_name(
+            f"{cached.name}.{os.getpid()}.{threading.get_ident()}"
+        )
+        temp.write_bytes(encode_skeleton(definitions))
+        os.replace(temp, cached)
+    except OSError:
+        pass  # The cache is only an optimization.
+
+    return definitions
+
+
+def merge_stub_skeleton(
+    path: str, definitions: List[Definition]
+) -> List[Definition]:
+    """Give the definitions of a module without a docstring the
+    docstring of the same definition in its `.pyi` stub.
+
+    The stub is only read if a definition has no docstring, through the
+    skeleton cache as well.
+
+    Args:
+        path (str): Path to the module, or `archive!member`.
+        definitions (List[Definition]): Definitions of the module.
+
+    Returns:
+        List[Definition]: The definitions with the docstrings of the stub.
+    """
+    stub = stub_path(path)
+
+    if stub is None or all(d.docstring is not None for d in definitions):
+        return definitions
+
+    try:
+        stub_definitions = load_skeleton(stub)
+    except (OSError, KeyError):
+        return definitions
+
+    docstrings: Dict[str, str] = {}
+    for definition in stub_definitions or []:
+        if definition.docstring is not None:
+            docstrings.setdefault(definition.qualname, definition.docstring)
+
+    return [
+        definition._replace(docstring=docstrings.get(definition.qualname))
+        if definition.docstring is None
+        else definition
+        for definition in definitions
+    ]
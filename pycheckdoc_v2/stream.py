@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Check files as a stream with bounded memory"""
+
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.backends import CheckPool, resolve_backend
+from pycheckdoc_v2.findings import Finding, check_error
+from pycheckdoc_v2.rules import RuleSet
+from pycheckdoc_v2.workers import default_workers
+
+
+def stream_check(
+    paths: Iterable[str],
+    rules: Optional[RuleSet] = None,
+    max_in_flight: Optional[int] = None,
+    max_workers: Optional[int] = None,
+    use_cache: bool = False,
+    backend: str = "auto",
+) -> Iterator[Tuple[str, List[Finding]]]:
+    """Check files one by one as they are read from paths.
+
+    Each file is parsed and checked in a worker and its AST is dropped
+    there, so only findings reach this process. At most `max_in_flight`
+    files are scheduled at a time, which bounds memory no matter how many
+    paths there are.
+
+    Results are yielded in the order of the paths: a reorder buffer holds
+    the results that complete early and each one is yielded as soon as
+    all the files before it are done, even while more paths are read.
+
+    If the caller stops iterating early, e.g. on the first finding, the
+    outstanding files are cancelled and the workers are stopped and
+    joined before the iterator closes, so no workers are left behind.
+
+    Args:
+        paths (Iterable[str]): Paths of the files to check. Read lazily.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        max_in_flight (int | None, optional): Maximum number of files
+            scheduled but not yet yielded. Defaults to twice the number
+            of workers.
+        max_workers (int | None, optional): Number of workers.
+            Defaults to what the CPUs and memory available allow.
+        use_cache (bool, optional): Whether to go through the skeleton
+            cache. Defaults to `False`.
+        backend (str, optional): Whether to check files in processes or
+            threads, see `resolve_backend`. Defaults to `auto`.
+
+    Returns:
+        Iterator[Tuple[str, List[Finding]]]: Tuples of the path of each
+            non empty file and its findings.
+    """
+    max_workers = max_workers or default_workers()
+    max_in_flight = max(1, max_in_flight or 2 * max_workers)
+
+    in_flight: Deque = deque()
+    pool = CheckPool(backend, max_workers, rules, use_cache)
+
+    def collect() -> Optional[Tuple[str, List[Finding]]]:
+        """Wait for the oldest scheduled file.
+
+        Returns:
+            Tuple[str, List[Finding]] | None: Result of the file, with the
+                error as its finding if it couldn't be checked, or None if
+                it is empty.
+        """
+        path, future = in_flight.popleft()
+        try:
+            return future.result()
+        except Exception as e:
+            return (path, [check_error(path, e)])
+
+    finished = False
+
+    try:
+        for path in paths:
+            while in_flight and (
+                len(in_flight) >= max_in_flight or in_flight[0][1].done()
+            ):
+                result = collect()
+                if result:
+                    yield result
+
+            in_flight.append((path, pool.submit(path)))
+
+        while in_flight:
+            result = collect()
+            if result:
+                yield result
+
+        finished = True
+    finally:
+        if not finished:  # Stopped early, cancel the outstanding work.
+            for _, future in in_flight:
+                future.cancel()
+        pool.close(cancel=not finished)
+
+
+def benchmark_backends(
+    paths: Iterable[str],
+    backends: Iterable[str] = ("process", "thread"),
+    rules: Optional[RuleSet] = None,
+    max_workers: Optional[int] = None,
+    repeat: int = 3,
+) -> Dict[str, float]:
+    """Time checking the same files with each backend.
+
+    Args:
+        paths (Iterable[str]): Paths of the files to check.
+        backends (Iterable[str], optional): Backends to time.
+            Defaults to processes and threads.
+        rules (RuleSet | None, optional): Compiled rules to apply.
+            Defaults to None.
+        max_workers (int | None, optional): Number of workers.
+            Defaults to what the CPUs and memory available allow.
+        repeat (int, optional): Number of runs of each backend, of which
+            the fastest is kept. Defaults to 3.
+
+    Returns:
+        Dict[str, float]: Seconds the fastest run of each backend took,
+            pool start up and shut down included.
+    """
+    files: List[str] = list(paths)
+    timings: Dict[str, float] = {}
+
+    for backend in map(resolve_backend, backends):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in stream_check(
+                files, rules, max_workers=max_workers, backend=backend
+            ):
+                pass
+            best = min(best, time.perf_counter() - start)
+
+        timings[backend] = best
+
+    return timings
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Pair .pyi stubs with their implementations"""
+
+import ast
+from typing import Collection, Dict, Iterator, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.notebooks import NOTEBOOK_SUFFIX
+
+STUB_SUFFIX = ".pyi"
+SOURCE_SUFFIXES = (".py", STUB_SUFFIX, NOTEBOOK_SUFFIX)
+
+_DEFINITIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)
+
+
+def stub_path(path: str) -> Optional[str]:
+    """Get the path the stub of a module would have.
+
+    Args:
+        path (str): Path to the module, or `archive!member`.
+
+    Returns:
+        str | None: Path to the `.pyi` sibling, or None if path is not a
+            `.py` file.
+    """
+    return path + "i" if path.endswith(".py") else None
+
+
+def is_paired_stub(name: str, names: Collection[str]) -> bool:
+    """Check if a file is a stub whose implementation is listed too.
+
+    Paired stubs are checked together with their implementation, so
+    they aren't checked on their own.
+
+    Args:
+        name (str): Name of the file.
+        names (Collection[str]): Names of the files in the same directory,
+            ideally a set.
+
+    Returns:
+        bool: True if name is a `.pyi` file with a `.py` sibling in names.
+    """
+    return name.endswith(STUB_SUFFIX) and name[:-1] in names
+
+
+def _iter_definitions(
+    module_node: ast.Module,
+) -> Iterator[Tuple[str, ast.AST]]:
+    """Get the definitions that can have a docstring in a module.
+
+    Args:
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        Iterator[Tuple[str, ast.AST]]: Qualified name and node of the
+            module, its functions, classes and their methods. The
+            qualified name of the module is "".
+    """
+    yield ("", module_node)
+
+    for node in module_node.body:
+        if not isinstance(node, _DEFINITIONS):
+            continue
+
+        yield (node.name, node)
+
+        if isinstance(node, ast.ClassDef):
+            for method in node.body:
+                if isinstance(method, _DEFINITIONS[:2]):
+                    yield (f"{node.name}.{method.name}", method)
+
+
+def missing_docstrings(module_node: ast.Module) -> bool:
+    """Check if any definition of a module has no docstring.
+
+    Args:
+        module_node (ast.Module): AST of the module.
+
+    Returns:
+        bool: True if a stub could document something more.
+    """
+    return any(
+        ast.get_docstring(node) is None  # type: ignore
+        for _, node in _iter_definitions(module_node)
+    )
+
+
+def stub_docstrings(stub_node: ast.Module) -> Dict[str, str]:
+    """Get the raw docstrings of the definitions of a stub.
+
+    For overloads, the first docstring is kept.
+
+    Args:
+        stub_node (ast.Module): AST of the stub.
+
+    Returns:
+        Dict[str, str]: Docstring of each documented definition by
+            qualified name.
+    """
+    docstrings: Dict[str, str] = {}
+
+    for qualname, node in _iter_definitions(stub_node):
+        docstring = ast.get_docstring(node, clean=False)  # type: ignore
+        if docstring is not None:
+            docstrings.setdefault(qualname, docstring)
+
+    return docstrings
+
+
+def merge_stub(module_node: ast.Module, stub_node: ast.Module) -> int:
+    """Give the definitions of a module without a docstring the
+    docstring of the same definition in its stub.
+
+    The docstring is inserted at the start of the definition's body, so
+    every check sees the definition as documented by its stub.
+
+    Args:
+        module_node (ast.Module): AST of the module. Modified in place.
+        stub_node (ast.Module): AST of its stub.
+
+    Returns:
+        int: Number of docstrings taken from the stub.
+    """
+    docstrings = stub_docstrings(stub_node)
+    merged = 0
+
+    for qualname, node in _iter_definitions(module_node):
+        docstring = docstrings.get(qualname)
+        if docstring is None or ast.get_docstring(node) is not None:
+            continue
+
+        body = node.body  # type: ignore
+        line = body[0].lineno if body else 1
+        expr = ast.Expr(ast.Constant(docstring))
+        for child in (expr, expr.value):
+            child.lineno = child.end_lineno = line
+            child.col_offset = child.end_col_offset = 0
+        body.insert(0, expr)
+        merged += 1
+
+    return merged
@@ -9,8 +9,8 @@ or absolute.
 
 Path is relative if it's a direct child of the cwd.
 
-If path to a directory is provided, any .py files existing
-in the directory are checked.
+If path to a directory is provided, any .py, .pyi and .ipynb
+files existing in the directory are checked.
 
 Both relative and absolute paths can be passed as arguments
 for the same call.
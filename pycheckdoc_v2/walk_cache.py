@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Keep directory listings between runs to skip walking unchanged
+directories"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Local
+from pycheckdoc_v2.cache import cache_dir
+from pycheckdoc_v2.notebooks import CHECKPOINTS_DIRECTORY
+from pycheckdoc_v2.stubs import SOURCE_SUFFIXES
+
+WALK_CACHE_FILE = "walk.json"
+WALK_CACHE_VERSION = 4
+
+# Listings of directories modified this recently aren't kept. Another
+# change within the resolution of the modification time wouldn't change
+# it, so the listing couldn't be trusted.
+RACY_NANOSECONDS = 2 * 10**9
+
+# Name of an entry and whether it's a directory.
+Entry = Tuple[str, bool]
+
+
+def scan_directory(directory: str) -> List[Entry]:
+    """List the child directories and .py, .pyi and .ipynb files of a
+    directory.
+
+    The copies Jupyter keeps in `.ipynb_checkpoints` are left out, and
+    so are links to directories, which could loop back to their parent.
+
+    Args:
+        directory (str): Directory to list.
+
+    Returns:
+        List[Entry]: Tuples of the name of each entry and whether it's a
+            directory, sorted by name. Empty if the directory can't be
+            read.
+    """
+    try:
+        with os.scandir(directory) as scan:
+            entries = sorted(scan, key=lambda entry: entry.name)
+    except OSError:
+        return []
+
+    listing = []
+
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            if entry.name != CHECKPOINTS_DIRECTORY:
+                listing.append((entry.name, True))
+        elif entry.name.endswith(SOURCE_SUFFIXES) and entry.is_file():
+            listing.append((entry.name, False))
+
+    return listing
+
+
+class WalkCache:
+    """Listings of directories with their modification time.
+
+    A directory's modification time changes whenever an entry is added
+    to it, removed from it or renamed in it, so its cached listing is
+    used as long as the time is the same. Only changed directories are
+    listed again.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        listings: Optional[Dict[str, Tuple[int, List[Entry]]]] = None,
+    ) -> None:
+        """Initialize the cache.
+
+        Args:
+            path (Path | None, optional): File the cache is saved to.
+                Defaults to `walk.json` in the cache directory.
+            listings (Dict[str, Tuple[int, List[Entry]]] | None, optional):
+                Modification time and listing of each directory.
+                Defaults to None.
+        """
+        self.path = path or cache_dir() / WALK_CACHE_FILE
+        self.listings = listings or {}
+        self.scanned = 0
+        self.dirty = False
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "WalkCache":
+        """Load the cache saved by a previous run.
+
+        Args:
+            path (Path | None, optional): File the cache is saved to.
+                Defaults to `walk.json` in the cache directory.
+
+        Returns:
+            WalkCache: The cache. Empty if there is no cache or it can't
+                be read.
+        """
+        cache = cls(path)
+
+        try:
+            with open(cache.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cache
+
+        if data.get("version") == WALK_CACHE_VERSION:
+            cache.listings = {
+                directory: (mtime, [(name, is_dir) for name, is_dir in items])
+                for directory, (mtime, items) in data["listings"].items()
+            }
+
+        return cache
+
+    def list_directory(self, directory: str) -> List[Entry]:
+        """List the child directories and .py, .pyi and .ipynb files of
+        a directory, from the cache if it hasn't changed.
+
+        Args:
+            directory (str): Absolute path of the directory.
+
+        Returns:
+            List[Entry]: Tuples of the name of each entry and whether it's
+                a directory, sorted by name.
+        """
+        try:
+            mtime = os.stat(directory).st_mtime_ns
+        except OSError:
+            if self.listings.pop(directory, None) is not None:
+                self.dirty = True
+            return []
+
+        cached = self.listings.get(directory)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+
+        listing = scan_directory(directory)
+        self.scanned += 1
+
+        if time.time_ns() - mtime > RACY_NANOSECONDS:
+            self.listings[directory] = (mtime, listing)
+            self.dirty = True
+        elif cached is not None:
+            del self.listings[directory]
+            self.dirty = True
+
+        return listing
+
+    def save(self) -> None:
+        """Save the cache if it changed. Errors are ignored as the cache
+        is only an optimization.
+        """
+        if not self.dirty:
+            return
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temp = self.path.with_name(f"{self.path.name}.{os.getpid()}")
+            with open(temp, "w") as f:
+                json.dump(
+                    {"version": WALK_CACHE_VERSION, "listings": self.listings},
+                    f,
+                )
+            os.replace(temp, self.path)
+        except OSError:
+            return
+
+        self.dirty = False
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""Size worker pools from the CPUs and memory actually available"""
+
+import math
+import os
+from functools import lru_cache
+from multiprocessing import cpu_count
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+PROC_ROOT = "/proc"
+
+# Environment variable that overrides the number of workers.
+WORKERS_ENV = "PYCHECKDOC_WORKERS"
+
+# Memory a worker needs on top of what it shares with the parent, for
+# the source and AST of the file it is checking.
+WORKER_HEADROOM = 32 * 2**20
+
+# cgroup v1 reports this or more for an unlimited memory limit.
+_V1_UNLIMITED = 2**60
+
+
+class WorkerPlan(NamedTuple):
+    """Number of workers and what it was derived from.
+
+    Limits that don't apply are None.
+    """
+
+    workers: int
+    cpus: int
+    affinity: Optional[int]
+    quota: Optional[float]
+    memory: Optional[int]
+    per_worker: int
+    override: Optional[int] = None
+
+
+def _read(path: Path) -> Optional[str]:
+    """Read a small file, like a cgroup control file.
+
+    Args:
+        path (Path): Path to the file.
+
+    Returns:
+        str | None: The stripped content, or None if it can't be read.
+    """
+    try:
+        return path.read_text().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def _own_cgroup(proc_root: str) -> str:
+    """Get the cgroup v2 group of this process.
+
+    Args:
+        proc_root (str): Mount point of procfs.
+
+    Returns:
+        str: The group relative to the cgroup root, "" for the root.
+    """
+    for line in (_read(Path(proc_root, "self", "cgroup")) or "").split("\n"):
+        if line.startswith("0::"):
+            return line[3:].strip("/")
+    return ""
+
+
+def _cgroup_files(cgroup_root: str, proc_root: str, name: str) -> List[Path]:
+    """Get the candidate paths of a cgroup v2 control file, the group of
+    this process first, then the root as seen from a container.
+
+    Args:
+        cgroup_root (str): Mount point of the cgroup filesystem.
+        proc_root (str): Mount point of procfs.
+        name (str): Name of the control file.
+
+    Returns:
+        List[Path]: Paths to try in order.
+    """
+    own = _own_cgroup(proc_root)
+    paths = [Path(cgroup_root, own, name)] if own else []
+    return paths + [Path(cgroup_root, name)]
+
+
+def cgroup_cpu_quota(
+    cgroup_root: str = CGROUP_ROOT, proc_root: str = PROC_ROOT
+) -> Optional[float]:
+    """Get the CPU quota of this process's cgroup in CPUs.
+
+    Args:
+        cgroup_root (str, optional): Mount point of the cgroup filesystem.
+            Defaults to `/sys/fs/cgroup`.
+        proc_root (str, optional): Mount point of procfs.
+            Defaults to `/proc`.
+
+    Returns:
+        float | None: The quota, e.g. 2.0 for 2 CPUs, or None if there's
+            no quota.
+    """
+    # cgroup v2: "<quota> <period>" or "max <period>".
+    for path in _cgroup_files(cgroup_root, proc_root, "cpu.max"):
+        text = _read(path)
+        if text is not None:
+            quota, _, period = text.partition(" ")
+            if quota == "max" or not period:
+                return None
+            return int(quota) / int(period)
+
+    # cgroup v1: the quota is -1 without a limit.
+    for controller in ("cpu", "cpu,cpuacct", "cpuacct,cpu"):
+        quota = _read(Path(cgroup_root, controller, "cpu.cfs_quota_us"))
+        period = _read(Path(cgroup_root, controller, "cpu.cfs_period_us"))
+        if quota is not None and period is not None:
+            if int(quota) <= 0:
+                return None
+            return int(quota) / int(period)
+
+    return None
+
+
+def cgroup_memory_available(
+    cgroup_root: str = CGROUP_ROOT, proc_root: str = PROC_ROOT
+) -> Optional[int]:
+    """Get the memory left under this process's cgroup memory limit.
+
+    Args:
+        cgroup_root (str, optional): Mount point of the cgroup filesystem.
+            Defaults to `/sys/fs/cgroup`.
+        proc_root (str, optional): Mount point of procfs.
+            Defaults to `/proc`.
+
+    Returns:
+        int | None: Bytes available, or None if there's no limit.
+    """
+    # cgroup v2: "max" without a limit.
+    for path in _cgroup_files(cgroup_root, proc_root, "memory.max"):
+        limit = _read(path)
+        if limit is not None:
+            if limit == "max":
+                return None
+            usage = _read(path.with_name("memory.current")) or "0"
+            return max(0, int(limit) - int(usage))
+
+    # cgroup v1
+    memory = Path(cgroup_root, "memory")
+    limit = _read(memory / "memory.limit_in_bytes")
+    if limit is not None and int(limit) < _V1_UNLIMITED:
+        usage = _read(memory / "memory.usage_in_bytes") or "0"
+        return max(0, int(limit) - int(usage))
+
+    return None
+
+
+def memory_available(
+    cgroup_root: str = CGROUP_ROOT, proc_root: str = PROC_ROOT
+) -> Optional[int]:
+    """Get the memory available to new processes, the lower of what is
+    left under the cgroup limit and what the system has available.
+
+    Args:
+        cgroup_root (str, optional): Mount point of the cgroup filesystem.
+            Defaults to `/sys/fs/cgroup`.
+        proc_root (str, optional): Mount point of procfs.
+            Defaults to `/proc`.
+
+    Returns:
+        int | None: Bytes available, or None if unknown.
+    """
+    available = cgroup_memory_available(cgroup_root, proc_root)
+
+    for line in (_read(Path(proc_root, "meminfo")) or "").split("\n"):
+        if line.startswith("MemAvailable:"):
+            system = int(line.split()[1]) * 1024
+            available = system if available is None else min(available, system)
+            break
+
+    return available
+
+
+def worker_memory(proc_root: str = PROC_ROOT) -> int:
+    """Estimate the memory each worker needs.
+
+    Workers start as copies of this process, so its resident set size
+    plus some room for the file being checked is used.
+
+    Args:
+        proc_root (str, optional): Mount point of procfs.
+            Defaults to `/proc`.
+
+    Returns:
+        int: Estimated bytes per worker.
+    """
+    statm = _read(Path(proc_root, "self", "statm"))
+    rss = 0
+
+    if statm:
+        rss = int(statm.split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    return rss + WORKER_HEADROOM
+
+
+def env_workers() -> Optional[int]:
+    """Get the number of workers set by `PYCHECKDOC_WORKERS`.
+
+    Raises:
+        ValueError: If the variable isn't an integer of at least 1.
+
+    Returns:
+        int | None: The number of workers, or None if the variable isn't
+            set or is empty.
+    """
+    value = os.environ.get(WORKERS_ENV, "").strip()
+
+    if not value:
+        return None
+
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+
+    if workers < 1:
+        raise ValueError(
+            f"{WORKERS_ENV} must be an integer of at least 1, not '{value}'"
+        )
+
+    return workers
+
+
+def plan_workers(
+    override: Optional[int] = None,
+    cgroup_root: str = CGROUP_ROOT,
+    proc_root: str = PROC_ROOT,
+) -> WorkerPlan:
+    """Decide how many workers to run.
+
+    The number is the lowest of the CPU count, the CPUs this process
+    may run on, the cgroup CPU quota rounded up, and the number of
+    workers that fit in the available memory. It is at least 1.
+
+    Args:
+        override (int | None, optional): Number of workers to use instead.
+            Defaults to `PYCHECKDOC_WORKERS` if set, else None.
+        cgroup_root (str, optional): Mount point of the cgroup filesystem.
+            Defaults to `/sys/fs/cgroup`.
+        proc_root (str, optional): Mount point of procfs.
+            Defaults to `/proc`.
+
+    Raises:
+        ValueError: If the number of workers to use instead is less than
+            1, or `PYCHECKDOC_WORKERS` isn't an integer of at least 1.
+
+    Returns:
+        WorkerPlan: The number of workers and the limits it came from.
+    """
+    if override is None:
+        override = env_workers()
+    elif override < 1:
+        raise ValueError("--workers must be at least 1")
+
+    cpus = cpu_count()
+    affinity = (
+        len(os.sched_getaffinity(0))
+        if hasattr(os, "sched_getaffinity")
+        else None
+    )
+    quota = cgroup_cpu_quota(cgroup_root, proc_root)
+    memory = memory_available(cgroup_root, proc_root)
+    per_worker = worker_memory(proc_root)
+
+    limits = [cpus]
+    if affinity:
+        limits.append(affinity)
+    if quota is not None:
+        limits.append(math.ceil(quota))
+    if memory is not None:
+        limits.append(memory // per_worker)
+
+    workers = override if override is not None else max(1, min(limits))
+
+    return WorkerPlan(
+        workers, cpus, affinity, quota, memory, per_worker, override
+    )
+
+
+@lru_cache(maxsize=None)
+def default_workers() -> int:
+    """Get the number of workers for pools not given one explicitly.
+
+    Returns:
+        int: Number of workers.
+    """
+    return plan_workers().workers
@@ -2,7 +2,8 @@
 
 from setuptools import setup, find_packages
 
-VERSION = "2.2.0"
+from pycheckdoc_v2 import VERSION
+
 DESCRIPTION = (
     "Check documentation is present on module, class, function and methods."
 )
@@ -25,5 +26,10 @@ setup(
         "Programming Language :: Python :: 3",
     ],
 
-    scripts=['bin/pycheckdoc']
+    scripts=['bin/pycheckdoc'],
+    entry_points={
+        "flake8.extension": [
+            "DOC = pycheckdoc_v2.flake8_plugin:DocChecker",
+        ],
+    },
 )
@@ -0,0 +1,97 @@
+import io
+import tarfile
+import zipfile
+
+from pycheckdoc_v2.archives import split_archive_path
+from pycheckdoc_v2.generate_ast import get_module_node, validate_paths
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import RuleSet
+
+MEMBERS = {
+    "pkg/__init__.py": '"""Package"""\n',
+    "pkg/module.py": '"""Module"""\n\ndef func():\n    pass\n',
+    "pkg/data.txt": "not python",
+}
+
+
+def make_wheel(path):
+    with zipfile.ZipFile(path, "w") as wheel:
+        for name, content in MEMBERS.items():
+            wheel.writestr(name, content)
+    return path
+
+
+def make_sdist(path):
+    with tarfile.open(path, "w:gz") as sdist:
+        for name, content in MEMBERS.items():
+            data = content.encode()
+            info = tarfile.TarInfo(f"pkg-1.0/{name}")
+            info.size = len(data)
+            sdist.addfile(info, io.BytesIO(data))
+    return path
+
+
+def test_split_archive_path():
+    """
+    GIVEN paths with and without an archive member
+    WHEN they are split
+    THEN only paths into archives give the archive and member.
+    """
+    assert split_archive_path("/a/b!c.whl!pkg/m.py") == (
+        "/a/b!c.whl",
+        "pkg/m.py",
+    )
+    assert split_archive_path("/a/b!c.py") is None
+
+
+def test_validate_paths_archives(tmp_path):
+    """
+    GIVEN a wheel and an sdist
+    WHEN the paths are validated
+    THEN the .py members of both are returned as archive!member.
+    """
+    wheel = make_wheel(tmp_path / "pkg-1.0-py3-none-any.whl")
+    sdist = make_sdist(tmp_path / "pkg-1.0.tar.gz")
+
+    assert validate_paths([str(wheel), str(sdist)]) == {
+        f"{wheel}!pkg/__init__.py",
+        f"{wheel}!pkg/module.py",
+        f"{sdist}!pkg-1.0/pkg/__init__.py",
+        f"{sdist}!pkg-1.0/pkg/module.py",
+    }
+
+
+def test_get_module_node_archive(tmp_path):
+    """
+    GIVEN a path to a member of an sdist
+    WHEN its module node is generated
+    THEN the source is read from the archive.
+    """
+    sdist = make_sdist(tmp_path / "pkg-1.0.tar.gz")
+    path = f"{sdist}!pkg-1.0/pkg/module.py"
+
+    module_path, module_node = get_module_node(path)
+
+    assert module_path == path
+    assert module_node.body[1].name == "func"
+
+
+def test_main_archives(tmp_path):
+    """
+    GIVEN a wheel and an sdist with an undocumented function each
+    WHEN they are checked, with and without streaming
+    THEN both functions are found without extracting the archives.
+    """
+    wheel = make_wheel(tmp_path / "pkg-1.0-py3-none-any.whl")
+    sdist = make_sdist(tmp_path / "pkg-1.0.tar.gz")
+    paths = [str(wheel), str(sdist)]
+
+    assert main(paths, print_msgs=False, rules=RuleSet()) == (2, 2)
+    assert main(paths, print_msgs=False, rules=RuleSet(), stream=True) == (
+        2,
+        2,
+    )
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "pkg-1.0-py3-none-any.whl",
+        "pkg-1.0.tar.gz",
+    ]
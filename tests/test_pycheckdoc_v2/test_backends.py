@@ -0,0 +1,110 @@
+import sys
+
+import pytest
+
+from pycheckdoc_v2.backends import CheckPool, resolve_backend
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.stream import benchmark_backends, stream_check
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(
+            '"""Module."""\n' * (i % 2) + f"def f{i}():\n    pass\n"
+        )
+        paths.append(str(path))
+    return paths
+
+
+def test_backends_give_the_same_findings(files):
+    """
+    GIVEN files with and without findings
+    WHEN they are checked in processes and in threads
+    THEN the results are the same and in the same order.
+    """
+    processes = list(stream_check(files, max_workers=2, backend="process"))
+    threads = list(stream_check(files, max_workers=2, backend="thread"))
+
+    assert threads == processes
+    assert [path for path, _ in threads] == files
+
+
+def test_resolve_backend():
+    """
+    GIVEN the backends, including auto, and an unknown one
+    WHEN they are resolved
+    THEN auto picks processes, the others are kept and the unknown one
+        raises ValueError.
+    """
+    assert resolve_backend("auto") == "process"
+    assert resolve_backend("process") == "process"
+    assert resolve_backend("thread") == "thread"
+
+    for backend in ("interpreter", "fork"):
+        with pytest.raises(ValueError):
+            resolve_backend(backend)
+
+
+def test_thread_pool_close_cancels_pending(files):
+    """
+    GIVEN a thread pool with more files scheduled than workers
+    WHEN it is closed with cancel
+    THEN the files not started are cancelled and the others finish.
+    """
+    pool = CheckPool("thread", 1)
+    futures = [pool.submit(path) for path in files * 5]
+
+    pool.close(cancel=True)
+
+    assert all(future.done() for future in futures)
+    assert any(future.cancelled() for future in futures)
+    assert not futures[0].cancelled()
+
+
+def test_main_thread_backend_fail_fast(files):
+    """
+    GIVEN files with findings
+    WHEN main is called with the thread backend and fail_fast
+    THEN it stops at the first file with findings.
+    """
+    assert main(
+        files, print_msgs=False, backend="thread", fail_fast=True
+    ) == (2, 1)
+
+
+def test_benchmark_backends(files):
+    """
+    GIVEN a corpus of files
+    WHEN the backends are benchmarked
+    THEN each available backend is timed once.
+    """
+    timings = benchmark_backends(
+        files, ["process", "thread"], max_workers=1, repeat=1
+    )
+
+    assert sorted(timings) == ["process", "thread"]
+    assert all(seconds > 0 for seconds in timings.values())
+
+
+def test_main_benchmark(files, monkeypatch, capsys):
+    """
+    GIVEN a corpus of files
+    WHEN the backends are benchmarked from the command line
+    THEN the timing of each backend asked for is printed.
+    """
+    monkeypatch.setattr(
+        sys,
+        "argv",
+        ["pycheckdoc", "benchmark", "--backend", "thread", "--repeat", "1"]
+        + files,
+    )
+
+    assert main() == (0, 0)
+
+    output = capsys.readouterr().out
+    assert "Checked 6 source files" in output
+    assert "thread: " in output
+    assert "process: " not in output
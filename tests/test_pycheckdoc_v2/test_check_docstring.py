@@ -0,0 +1,197 @@
+import ast
+
+from pycheckdoc_v2.check_docstring import (
+    check_docstring_content,
+    parse_docstring,
+)
+from pycheckdoc_v2.check_function import check_function_doc
+from pycheckdoc_v2.rules import compile_rules
+
+
+def function_node(source):
+    return ast.parse(source).body[0]
+
+
+GOOGLE = '''
+def func(a, b, *args, c=1, **kwargs):
+    """Func.
+
+    Args:
+        a (int): First.
+            Continued description: with a colon.
+        d (int): Misnamed.
+        *args: Extra positional arguments.
+        c (int, optional): Keyword only.
+        **kwargs: Extra keyword arguments.
+
+    Raises:
+        ValueError: If a is negative.
+    """
+    if a < 0:
+        raise ValueError
+    return a + b
+'''
+
+
+def test_google():
+    """
+    GIVEN a Google style docstring with a misnamed argument and no
+        Returns section
+    WHEN its content is checked
+    THEN the misnamed argument and the missing section are reported.
+    """
+    assert check_docstring_content(function_node(GOOGLE)) == [
+        "argument 'd' should be 'b'",
+        "missing Returns section",
+    ]
+
+
+def test_google_method():
+    """
+    GIVEN a method whose docstring documents all arguments except self
+    WHEN its content is checked
+    THEN no problems are reported.
+    """
+    node = function_node(
+        '''
+def method(self, a):
+    """Method.
+
+    Args:
+        a (int): First.
+    """
+'''
+    )
+
+    assert check_docstring_content(node, is_method=True) == []
+    assert check_docstring_content(node) == ["missing argument 'self'"]
+
+
+def test_numpy():
+    """
+    GIVEN a NumPy style docstring with an extra argument
+    WHEN its content is checked
+    THEN the extra argument is reported.
+    """
+    node = function_node(
+        '''
+def func(a):
+    """Func.
+
+    Parameters
+    ----------
+    a : int
+        First.
+    b : int
+        Does not exist.
+
+    Returns
+    -------
+    int
+        a
+    """
+    return a
+'''
+    )
+
+    assert check_docstring_content(node, "numpy") == [
+        "documented argument 'b' does not exist"
+    ]
+
+
+def test_sphinx():
+    """
+    GIVEN a Sphinx style docstring that doesn't document raised errors
+    WHEN its content is checked
+    THEN the missing argument and Raises section are reported.
+    """
+    node = function_node(
+        '''
+def func(a, b):
+    """Func.
+
+    :param int a: First.
+    :returns: a
+    """
+    if b:
+        raise KeyError(b)
+    return a
+'''
+    )
+
+    assert check_docstring_content(node, "sphinx") == [
+        "missing argument 'b'",
+        "missing Raises section",
+    ]
+
+
+CAUGHT = '''
+def func(path):
+    """Func.
+
+    Args:
+        path (str): Path.
+    """
+    try:
+        if not path:
+            raise RuntimeError("empty")
+        try:
+            raise FileNotFoundError(path)
+        except OSError:
+            raise
+    except (KeyError, RuntimeError) as e:
+        print(e)
+    try:
+        raise ValueError(path)
+    except:  # noqa: E722
+        pass
+    try:
+        raise errors.Custom
+    except Exception:
+        pass
+'''
+
+
+def test_caught_raises():
+    """
+    GIVEN a function whose raises are caught by enclosing try blocks
+    WHEN its content is checked
+    THEN no Raises section is required, unless a raise escapes its
+        handlers.
+    """
+    assert check_docstring_content(function_node(CAUGHT)) == []
+
+    escaping = CAUGHT.replace("except OSError:", "except KeyError:")
+    assert check_docstring_content(function_node(escaping)) == [
+        "missing Raises section"
+    ]
+
+    in_handler = CAUGHT.replace("print(e)", "raise TypeError from e")
+    assert check_docstring_content(function_node(in_handler)) == [
+        "missing Raises section"
+    ]
+
+
+def test_parse_cached():
+    """
+    GIVEN a docstring that has already been parsed
+    WHEN it is parsed again
+    THEN the cached result is returned.
+    """
+    docstring = "Func.\n\nArgs:\n    a (int): First.\n"
+
+    assert parse_docstring(docstring) is parse_docstring(docstring)
+    assert parse_docstring(docstring).params == ("a",)
+
+
+def test_check_function_doc_style():
+    """
+    GIVEN rules with a docstring style
+    WHEN a module is checked
+    THEN problems in docstring content are counted as errors.
+    """
+    module = ("module.py", ast.parse(GOOGLE))
+    rules = compile_rules({"style": "google"})
+
+    assert check_function_doc(module, False) == 0
+    assert check_function_doc(module, False, rules) == 2
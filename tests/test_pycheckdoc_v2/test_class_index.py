@@ -0,0 +1,235 @@
+import ast
+import os
+import time
+
+import pytest
+
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.class_index import (
+    ClassIndex,
+    ClassInfo,
+    Hierarchy,
+    ModuleIndex,
+    build_hierarchy,
+)
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import compile_rules
+
+FILES = {
+    "pkg/__init__.py": "from .base import Base\n",
+    "pkg/base.py": '''class Base:
+    """Base."""
+
+    def run(self):
+        """Run the thing."""
+
+    def short(self):
+        """Hi."""
+
+    def bare(self):
+        pass
+''',
+    "pkg/impl.py": '''"""Impl."""
+from pkg import Base
+
+
+class Impl(Base):
+    """Impl."""
+
+    def run(self):
+        pass
+
+    def short(self):
+        pass
+
+    def bare(self):
+        pass
+
+    def new(self):
+        pass
+''',
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/deep.py": '''"""Deep."""
+from ..impl import Impl as Parent
+
+
+class Deep(Parent):
+    """Deep."""
+
+    def run(self):
+        pass
+
+    def __init__(self):
+        """Make it."""
+''',
+}
+
+
+def age(root):
+    """Make every file under root look modified a while ago."""
+    past = time.time() - 60
+    for directory, _, names in os.walk(root):
+        for name in names:
+            os.utime(os.path.join(directory, name), (past, past))
+
+
+@pytest.fixture
+def project(tmp_path):
+    for name, source in FILES.items():
+        path = tmp_path / "project" / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    age(tmp_path / "project")
+    return tmp_path / "project" / "pkg"
+
+
+def method_findings(paths, rules):
+    """Get the names of the methods reported in the files at paths."""
+    return [
+        finding.name
+        for path in paths
+        for finding in check_module_node(
+            (str(path), ast.parse(path.read_text())), rules
+        )
+        if finding.kind == "method"
+    ]
+
+
+def test_inherited_docs_across_modules(project, tmp_path):
+    """
+    GIVEN overriding methods without docstrings in other modules than
+        their bases, imported through re-exports and relative imports
+    WHEN they are checked with docstring inheritance
+    THEN only the methods without a documented base method are reported.
+    """
+    paths = [project / "impl.py", project / "sub" / "deep.py"]
+    hierarchy = build_hierarchy(
+        [str(paths[0])], 1, index_path=tmp_path / "classes.json"
+    )
+
+    rules = compile_rules({})
+    assert method_findings(paths, rules) == [
+        "Impl.run",
+        "Impl.short",
+        "Impl.bare",
+        "Impl.new",
+        "Deep.run",
+    ]
+
+    rules = compile_rules({"inherit-docs": True}).with_hierarchy(hierarchy)
+    assert method_findings(paths, rules) == ["Impl.bare", "Impl.new"]
+
+    rules = compile_rules({"inherit-docs": True, "min-length": 5})
+    rules = rules.with_hierarchy(hierarchy)
+    assert method_findings(paths, rules) == [
+        "Impl.short",
+        "Impl.bare",
+        "Impl.new",
+    ]
+
+
+def test_hierarchy_mro():
+    """
+    GIVEN a diamond of classes
+    WHEN the method resolution order is computed
+    THEN it is the C3 linearization, so a method is inherited from the
+        first base defining it like at runtime.
+    """
+    hierarchy = Hierarchy(
+        [
+            (
+                "m.py",
+                ModuleIndex(
+                    "m",
+                    {
+                        "A": ClassInfo((), {"f": 3}),
+                        "B": ClassInfo(("m.A",), {}),
+                        "C": ClassInfo(("m.A",), {"f": 10}),
+                        "D": ClassInfo(("m.B", "m.C"), {"f": 0}),
+                    },
+                    {},
+                ),
+            )
+        ]
+    )
+
+    assert hierarchy.mro("m.D") == ["m.D", "m.B", "m.C", "m.A"]
+    assert hierarchy.inherited_doc_length("m.py", "D", "f") == 10
+
+
+def test_class_index_is_incremental(project, tmp_path):
+    """
+    GIVEN a project indexed once
+    WHEN it is indexed again, after a file changes, then without a file
+    THEN no file is indexed again, then only the changed one is, then
+        the missing one is dropped from the saved index.
+    """
+    index_path = tmp_path / "classes.json"
+    files = [str(path) for path in sorted(project.rglob("*.py"))]
+
+    index = ClassIndex.load(index_path)
+    first = index.update(files, 1)
+    index.save()
+    assert index.indexed == 5
+
+    index = ClassIndex.load(index_path)
+    second = index.update(files, 1)
+    assert index.indexed == 0
+    assert second.classes == first.classes
+
+    base = project / "base.py"
+    base.write_text("class Base:\n    pass\n")
+    past = time.time() - 30
+    os.utime(base, (past, past))
+
+    index = ClassIndex.load(index_path)
+    third = index.update(files, 1)
+    assert index.indexed == 1
+    assert third.classes["pkg.base.Base"].methods == {}
+
+    index.update(files[1:], 1)
+    index.save()
+    assert sorted(ClassIndex.load(index_path).files) == files[1:]
+
+
+def test_main_inherit_docs(project, tmp_path, monkeypatch):
+    """
+    GIVEN a project with overriding methods without docstrings
+    WHEN main is called with inherit_docs, with and without the cache
+    THEN the same methods are reported.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    rules = compile_rules({})
+    paths = [str(project / "impl.py"), str(project / "sub")]
+
+    assert main(paths, print_msgs=False, rules=rules) == (5, 2)
+
+    for use_cache in (False, True):
+        assert main(
+            paths,
+            print_msgs=False,
+            rules=rules,
+            inherit_docs=True,
+            use_cache=use_cache,
+        ) == (2, 1)
+        assert (tmp_path / "cache" / "classes").is_dir() == use_cache
+
+    assert len(list((tmp_path / "cache" / "classes").iterdir())) == 1
+
+
+def test_main_inherit_docs_files_from(project, tmp_path, monkeypatch):
+    """
+    GIVEN a list of files of a project with overriding methods without
+        docstrings
+    WHEN main is called with inherit_docs and the list as files_from
+    THEN the bases of the listed files are found like for paths.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    listed = tmp_path / "files.txt"
+    listed.write_text(
+        f"{project / 'impl.py'}\n{project / 'sub' / 'deep.py'}\n"
+    )
+
+    assert main(
+        [], print_msgs=False, inherit_docs=True, files_from=str(listed)
+    ) == (2, 1)
@@ -0,0 +1,176 @@
+import sys
+
+import pytest
+
+from pycheckdoc_v2.doctests import run_doctests, run_examples
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import compile_rules
+from pycheckdoc_v2.skeleton import load_skeleton
+
+MODULE = '''"""Maths.
+
+>>> 1 + 1
+2
+"""
+import time
+
+print("printed at import")
+
+CALLS = []
+
+
+def add(a, b):
+    """Add two numbers.
+
+    >>> add(1, 2)
+    4
+    >>> CALLS.append(1)
+    >>> len(CALLS)
+    1
+    """
+    return a + b
+
+
+def fail():
+    """Raise.
+
+    >>> fail()
+    Traceback (most recent call last):
+    ...
+    ValueError: expected
+    """
+    raise ValueError("raised")
+
+
+def slow():
+    """Sleep.
+
+    >>> slow()
+    >>> add(2, 2)
+    4
+    """
+    time.sleep(30)
+
+
+def undocumented():
+    pass
+'''
+
+
+@pytest.fixture
+def module(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "maths.py"
+    path.write_text(MODULE)
+    return str(path)
+
+
+def errors(findings):
+    """Get the line, name and error of each finding."""
+    return [(f.line, f.name, f.err) for f in findings]
+
+
+def test_run_examples(module, monkeypatch):
+    """
+    GIVEN a module that prints at import, with passing, failing and slow
+        examples
+    WHEN its examples are run with a timeout
+    THEN the failures are kept at their line in the docstring, the slow
+        example times out and the next one still runs.
+    """
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    definitions = load_skeleton(module)
+    docstrings = [d.docstring for d in definitions if d.docstring]
+
+    try:
+        results = run_examples(module, docstrings, 0.5)
+    finally:
+        sys.modules.pop("maths", None)
+
+    assert results == [
+        [],
+        [(3, "`add(1, 2)` printed '3' instead of '4'", False)],
+        [
+            (
+                3,
+                "`fail()` raised 'ValueError: raised' instead of "
+                + "'ValueError: expected'",
+                False,
+            )
+        ],
+        [(3, "`slow()` timed out after 0.5s", True)],
+    ]
+
+
+def test_run_doctests_caches_results(module, tmp_path):
+    """
+    GIVEN a module with examples
+    WHEN they are run twice
+    THEN the results are the same, the docstrings without timeouts are
+        cached and only the slow one runs again.
+    """
+    definitions = load_skeleton(module)
+
+    first = run_doctests(module, definitions, 0.5)
+    cached = sorted((tmp_path / "cache" / "doctests").glob("*/*"))
+    second = run_doctests(module, definitions, 0.5)
+
+    assert first == second
+    assert errors(first) == [
+        (
+            13,
+            "add",
+            "doctest failed at line 3 of the docstring: "
+            + "`add(1, 2)` printed '3' instead of '4'",
+        ),
+        (
+            25,
+            "fail",
+            "doctest failed at line 3 of the docstring: `fail()` raised "
+            + "'ValueError: raised' instead of 'ValueError: expected'",
+        ),
+        (
+            36,
+            "slow",
+            "doctest failed at line 3 of the docstring: "
+            + "`slow()` timed out after 0.5s",
+        ),
+    ]
+    assert len(cached) == 3
+
+
+def test_run_doctests_import_error(tmp_path, monkeypatch):
+    """
+    GIVEN a module with examples that can't be imported
+    WHEN its examples are run
+    THEN each docstring with examples is reported once.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "broken.py"
+    path.write_text('"""Broken.\n\n>>> 1\n1\n"""\nimport missing_module\n')
+
+    (finding,) = run_doctests(str(path), load_skeleton(str(path)), 1)
+
+    assert finding.kind == "module"
+    assert finding.err.startswith(
+        "doctest failed: module can't be imported: ModuleNotFoundError"
+    )
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_main_doctest(module, capsys, use_cache):
+    """
+    GIVEN a module with failing examples and a missing docstring
+    WHEN it is checked with doctest
+    THEN the failures are reported along with the missing docstring.
+    """
+    rules = compile_rules({"doctest-timeout": 0.5})
+
+    result = main([module], rules=rules, doctest=True, use_cache=use_cache)
+
+    err = capsys.readouterr().err
+    assert result == (4, 1)
+    assert "add(1, 2)" in err
+    assert "undocumented" in err
+    assert main([module], rules=rules, print_msgs=False) == (1, 1)
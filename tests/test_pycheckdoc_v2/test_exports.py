@@ -0,0 +1,168 @@
+import pytest
+
+from pycheckdoc_v2.class_index import build_hierarchy
+from pycheckdoc_v2.exports import ExportGraph
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import compile_rules
+
+FILES = {
+    "pkg/__init__.py": '''"""Package."""
+from . import util
+from ._impl import Engine, make
+
+__all__ = ["Engine", "make", "util", "VERSION"]
+
+VERSION = "1.0"
+''',
+    "pkg/_impl.py": """class Engine:
+    def run(self):
+        pass
+
+    def _helper(self):
+        pass
+
+
+class Hidden:
+    pass
+
+
+def make():
+    pass
+
+
+def _make_private():
+    pass
+""",
+    "pkg/util.py": """def tool():
+    pass
+
+
+def _tool():
+    pass
+""",
+    "pkg/_internal.py": """def secret():
+    pass
+""",
+    "pkg/sub/__init__.py": "",
+    "pkg/sub/mod.py": """__all__ = ["only"]
+
+
+def only():
+    pass
+
+
+def other():
+    pass
+""",
+}
+
+PUBLIC = [
+    ("pkg/_impl.py", "Engine"),
+    ("pkg/_impl.py", "Engine.run"),
+    ("pkg/_impl.py", "make"),
+    ("pkg/util.py", ""),
+    ("pkg/util.py", "tool"),
+    ("pkg/sub/mod.py", ""),
+    ("pkg/sub/mod.py", "only"),
+]
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    for name, source in FILES.items():
+        path = tmp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(source)
+    return tmp_path
+
+
+def test_export_graph(project):
+    """
+    GIVEN a package exporting names through __all__, re-exports from a
+        private module and public modules without __all__
+    WHEN its export graph is built
+    THEN only the reachable public definitions are public and files
+        without any don't contribute.
+    """
+    graph = ExportGraph(build_hierarchy([str(project / "pkg")], 1))
+
+    def path(name):
+        return str(project / name)
+
+    assert graph.public == {
+        "pkg._impl": {"Engine", "make"},
+        "pkg.util": {"tool"},
+        "pkg.sub.mod": {"only"},
+    }
+    assert graph.public_modules == {
+        "pkg",
+        "pkg.util",
+        "pkg.sub",
+        "pkg.sub.mod",
+    }
+
+    assert all(graph.is_public(path(file), name) for file, name in PUBLIC)
+    assert not graph.is_public(path("pkg/_impl.py"), "")
+    assert not graph.is_public(path("pkg/_impl.py"), "Engine._helper")
+    assert not graph.is_public(path("pkg/_impl.py"), "Hidden")
+    assert not graph.is_public(path("pkg/sub/mod.py"), "other")
+
+    assert graph.contributes(path("pkg/_impl.py"))
+    assert not graph.contributes(path("pkg/_internal.py"))
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_main_public_api(project, capsys, use_cache):
+    """
+    GIVEN a package with public and private definitions
+    WHEN it is checked in public API mode
+    THEN only the public definitions are reported and the file without
+        any isn't checked.
+    """
+    rules = compile_rules({})
+    paths = [str(project / "pkg")]
+
+    assert main(paths, recursive=True, rules=rules, print_msgs=False) == (
+        15,
+        4,
+    )
+
+    result = main(
+        paths,
+        recursive=True,
+        rules=rules,
+        public_api=True,
+        use_cache=use_cache,
+    )
+
+    assert result == (len(PUBLIC), 3)
+    assert "(checked 4 source files)" in capsys.readouterr().err
+
+
+@pytest.mark.parametrize("mode", ["multi_root", "files_from"])
+def test_main_public_api_modes(project, tmp_path, monkeypatch, capsys, mode):
+    """
+    GIVEN a package with public and private definitions
+    WHEN it is checked in public API mode with multiple roots or with the
+        files listed in a file
+    THEN the files without any public definition are skipped like for
+        the paths given.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    listed = tmp_path / "files.txt"
+    listed.write_text(
+        "".join(f"{path}\n" for path in sorted(project.rglob("*.py")))
+    )
+
+    if mode == "multi_root":
+        fields = {"paths": [str(project / "pkg")], "multi_root": True}
+    else:
+        fields = {"paths": [], "files_from": str(listed)}
+
+    result = main(
+        recursive=True, rules=compile_rules({}), public_api=True, **fields
+    )
+
+    assert result == (len(PUBLIC), 3)
+    assert "(checked 4 source files)" in capsys.readouterr().err
@@ -0,0 +1,73 @@
+import sys
+
+import pytest
+
+from pycheckdoc_v2 import find_modules
+from pycheckdoc_v2.find_modules import resolve_module, resolve_modules
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A site directory with a package that fails if it is imported."""
+    site = tmp_path / "site"
+    package = site / "explosive"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text("raise RuntimeError('imported')\n")
+    (package / "sub" / "__init__.py").write_text("")
+    (package / "sub" / "leaf.py").write_text("")
+    (site / "single.py").write_text("")
+
+    monkeypatch.syspath_prepend(str(site))
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    return site
+
+
+def test_resolve_module(site):
+    """
+    GIVEN an installed package whose import raises an error
+    WHEN the package, a subpackage and a module are resolved
+    THEN their source files are found without importing them.
+    """
+    package = site / "explosive"
+
+    assert resolve_module("explosive") == sorted(
+        [
+            str(package / "__init__.py"),
+            str(package / "sub" / "__init__.py"),
+            str(package / "sub" / "leaf.py"),
+        ]
+    )
+    assert resolve_module("explosive.sub.leaf") == [
+        str(package / "sub" / "leaf.py")
+    ]
+    assert resolve_module("single") == [str(site / "single.py")]
+    assert resolve_module("missing_module") == []
+    assert "explosive" not in sys.modules
+
+
+def test_resolve_modules_cache(site, monkeypatch):
+    """
+    GIVEN modules that have been resolved before with the cache
+    WHEN they are resolved again in the same environment
+    THEN the cached files are returned until the environment changes, and
+        the cache is neither read nor written without use_cache.
+    """
+    assert resolve_modules(["explosive"])
+    expected = resolve_modules(["single"], use_cache=True)
+
+    def fail(name):
+        raise AssertionError(f"{name} was resolved again")
+
+    monkeypatch.setattr(find_modules, "resolve_module", fail)
+    assert resolve_modules(["single"], use_cache=True) == expected
+
+    with pytest.raises(AssertionError):  # Not read
+        resolve_modules(["single"])
+    with pytest.raises(AssertionError):  # Not written
+        resolve_modules(["explosive"], use_cache=True)
+
+    monkeypatch.setattr(
+        find_modules, "environment_fingerprint", lambda: "changed"
+    )
+    with pytest.raises(AssertionError):
+        resolve_modules(["single"], use_cache=True)
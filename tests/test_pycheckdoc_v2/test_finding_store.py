@@ -0,0 +1,149 @@
+import tracemalloc
+
+import pytest
+
+from pycheckdoc_v2.finding_store import (
+    FindingStore,
+    merge_stores,
+    read_store,
+    write_store,
+)
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.main import main
+
+FINDINGS = [
+    Finding("/repo/a.py", 0, "module", ""),
+    Finding("/repo/a.py", 3, "function", "f"),
+    Finding("/repo/a.py", 3, "function", "f", "missing argument 'x'"),
+    Finding("/repo/b.py", 7, "method", "A.m"),
+]
+
+
+def many_findings(count):
+    for i in range(count):
+        yield Finding(
+            f"/home/user/projects/repo/package/module_{i // 50}.py",
+            i % 400 + 1,
+            "function",
+            f"function_{i % 500}",
+            None if i % 4 else "missing Returns section",
+        )
+
+
+def test_store_round_trip(tmp_path):
+    """
+    GIVEN a store with findings with and without messages
+    WHEN it is written to a file and read back
+    THEN the same findings are returned in the same order.
+    """
+    path = tmp_path / "findings.bin"
+    write_store(str(path), FindingStore(FINDINGS))
+
+    store = read_store(str(path))
+
+    assert list(store) == FINDINGS
+    assert store[2].err == "missing argument 'x'"
+
+
+def test_store_rejects_other_data():
+    """
+    GIVEN data that isn't a serialized store
+    WHEN it is deserialized
+    THEN a ValueError is raised.
+    """
+    with pytest.raises(ValueError):
+        FindingStore.from_bytes(b'{"version": 1}')
+
+
+def test_store_group_by():
+    """
+    GIVEN a store
+    WHEN findings are grouped by file and kind
+    THEN the counts and findings of each group are returned.
+    """
+    store = FindingStore(FINDINGS)
+
+    assert store.count_by_file() == {"/repo/a.py": 3, "/repo/b.py": 1}
+    assert store.count_by_kind() == {"module": 1, "function": 2, "method": 1}
+    assert store.for_file("/repo/b.py") == [FINDINGS[3]]
+    assert store.for_file("/repo/c.py") == []
+    assert store.for_kind("function") == FINDINGS[1:3]
+
+
+def test_store_for_file_across_ranges(tmp_path):
+    """
+    GIVEN stores whose files are added in several runs of rows, merged
+        and read back
+    WHEN the findings of a file are asked for
+    THEN those of every run are returned in the order they were added.
+    """
+    interleaved = FINDINGS[:2] + FINDINGS[3:] + FINDINGS[2:3]
+    path = tmp_path / "findings.bin"
+    write_store(
+        str(path),
+        merge_stores([FindingStore(interleaved), FindingStore(FINDINGS)]),
+    )
+
+    store = read_store(str(path))
+
+    assert store.for_file("/repo/a.py") == (
+        FINDINGS[:2] + FINDINGS[2:3] + FINDINGS[:3]
+    )
+    assert store.for_file("/repo/b.py") == FINDINGS[3:] * 2
+    assert store.count_by_file() == {"/repo/a.py": 6, "/repo/b.py": 2}
+
+
+def test_merge_stores_interns_tables():
+    """
+    GIVEN stores sharing paths and names
+    WHEN they are merged
+    THEN all their findings are kept and shared strings are stored once.
+    """
+    first = FindingStore(FINDINGS[:2])
+    second = FindingStore(FINDINGS[1:])
+
+    merged = merge_stores([first, second])
+
+    assert list(merged) == FINDINGS[:2] + FINDINGS[1:]
+    assert merged.files == ["/repo/a.py", "/repo/b.py"]
+    assert merged.count_by_file() == {"/repo/a.py": 4, "/repo/b.py": 1}
+
+
+def test_store_is_compact():
+    """
+    GIVEN many findings over a few hundred files
+    WHEN they are kept in a store instead of a list
+    THEN they take a fraction of the memory.
+    """
+    tracemalloc.start()
+    try:
+        findings = list(many_findings(50_000))
+        as_list = tracemalloc.get_traced_memory()[0]
+        del findings
+
+        before = tracemalloc.get_traced_memory()[0]
+        store = FindingStore(many_findings(50_000))
+        as_store = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+    assert len(store) == 50_000
+    assert as_store * 5 < as_list
+
+
+def test_main_save_findings(tmp_path):
+    """
+    GIVEN a file with missing documentation
+    WHEN it is checked with save_findings
+    THEN its findings are saved in a store.
+    """
+    module = tmp_path / "module.py"
+    module.write_text("def f():\n    pass\n")
+    output = tmp_path / "findings.bin"
+
+    main([str(module)], print_msgs=False, save_findings=str(output))
+
+    assert [finding[1:4] for finding in read_store(str(output))] == [
+        (0, "module", ""),
+        (1, "function", "f"),
+    ]
@@ -0,0 +1,266 @@
+import ast
+
+import pytest
+
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.fix import _Source, apply_edits, plan_edits
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import compile_rules
+
+SOURCE = '''#!/usr/bin/env python3
+import os
+
+
+def parse(path: str, strict: bool = False, *rest, sep="\\n") -> dict:
+    if strict:
+        raise ValueError(path)
+    try:
+        raise KeyError(path)
+    except LookupError:
+        pass
+    return {}
+
+
+def one_liner(): return 1
+
+
+class Plain:
+    @property
+    def value(self):
+        return os.sep
+
+    def short(self):
+        """Hi."""
+
+
+class Inline: x = 1
+'''
+
+EXPECTED = '''#!/usr/bin/env python3
+"""TODO: Describe the module."""
+import os
+
+
+def parse(path: str, strict: bool = False, *rest, sep="\\n") -> dict:
+    """TODO: Describe `parse`.
+
+    Args:
+        path (str): TODO.
+        strict (bool, optional): TODO. Defaults to False.
+        *rest: TODO.
+        sep (optional): TODO. Defaults to "\\\\n".
+
+    Raises:
+        ValueError: TODO.
+
+    Returns:
+        dict: TODO.
+    """
+    if strict:
+        raise ValueError(path)
+    try:
+        raise KeyError(path)
+    except LookupError:
+        pass
+    return {}
+
+
+def one_liner():
+    """TODO: Describe `one_liner`.
+
+    Returns:
+        TODO: Describe the return value.
+    """
+    return 1
+
+
+class Plain:
+    """TODO: Describe `Plain`."""
+
+    @property
+    def value(self):
+        """TODO: Describe `value`.
+
+        Returns:
+            TODO: Describe the return value.
+        """
+        return os.sep
+
+    def short(self):
+        """Hi."""
+
+
+class Inline:
+    """TODO: Describe `Inline`."""
+    x = 1
+'''
+
+
+def fix(content, rules):
+    """Fix a source in memory."""
+    module_node = ast.parse(content)
+    findings = check_module_node(("m.py", module_node), rules)
+    return apply_edits(
+        content, plan_edits(module_node, _Source(content), findings)
+    )
+
+
+def test_fix_source():
+    """
+    GIVEN a module with undocumented functions, methods and classes,
+        some with their body on the line of the definition
+    WHEN it is fixed
+    THEN Google style skeletons are inserted, without the exceptions the
+        functions catch, and a docstring that is too short is left as it
+        is.
+    """
+    rules = compile_rules({"min-length": 5})
+
+    assert fix(SOURCE.encode(), rules).decode() == EXPECTED
+
+
+def test_fixed_source_passes_checks():
+    """
+    GIVEN a module fixed with a docstring style
+    WHEN it is checked again
+    THEN its functions match their docstrings.
+    """
+    rules = compile_rules({"style": "google"})
+    fixed = fix(SOURCE.encode(), rules)
+
+    assert check_module_node(("m.py", ast.parse(fixed)), rules) == []
+
+
+def test_fixed_source_is_placeholder():
+    """
+    GIVEN a module fixed with skeletons
+    WHEN it is checked for docstring quality
+    THEN every inserted skeleton is reported as a placeholder.
+    """
+    fixed = fix(SOURCE.encode(), compile_rules({}))
+
+    findings = check_module_node(
+        ("m.py", ast.parse(fixed)), compile_rules({"quality": True})
+    )
+
+    assert [(f.name, f.err) for f in findings] == [
+        ("", "placeholder docstring: 'TODO'"),
+        ("parse", "placeholder docstring: 'TODO'"),
+        ("one_liner", "placeholder docstring: 'TODO'"),
+        ("Plain", "placeholder docstring: 'TODO'"),
+        ("Plain.value", "placeholder docstring: 'TODO'"),
+        ("Inline", "placeholder docstring: 'TODO'"),
+    ]
+
+
+@pytest.mark.parametrize(
+    "encoding, newline, prefix",
+    [
+        ("latin-1", "\r\n", b"# -*- coding: latin-1 -*-\r\n"),
+        ("utf-8", "\n", b"\xef\xbb\xbf"),
+    ],
+)
+def test_fix_keeps_bytes(encoding, newline, prefix):
+    """
+    GIVEN a module in another encoding or with a BOM, and non ASCII text
+        before the definitions
+    WHEN it is fixed
+    THEN only the skeletons are inserted, with the newlines of the module,
+        and every other byte is kept.
+    """
+    source = 'x = "é"; y = 2\ndef f(): return "é"\n'.replace("\n", newline)
+    content = prefix + source.encode(encoding)
+
+    fixed = fix(content, compile_rules({}))
+    text = fixed.decode(encoding)
+
+    assert fixed.startswith(prefix)
+    assert '"""TODO: Describe the module."""' + newline in text
+    assert f'def f():{newline}    """TODO: Describe `f`.' in text
+    assert text.endswith(f'    """{newline}    return "é"{newline}')
+    assert "\n" not in text.replace(newline, "")
+
+
+def test_fix_keeps_tabs():
+    """
+    GIVEN a module indented with tabs, and with tabs and spaces mixed,
+        with bodies on their own line and on the line of the definition
+    WHEN it is fixed
+    THEN the skeletons are indented like the line of their definition
+        followed by the indent unit of the module, and the module parses.
+    """
+    source = (
+        "class Tabs:\n"
+        "\tdef inline(self): return 1\n"
+        "\n"
+        "\tdef block(self, x):\n"
+        "\t\treturn x\n"
+        "\n"
+        "\n"
+        "def mixed():\n"
+        "\t  return 2\n"
+    )
+
+    fixed = fix(source.encode(), compile_rules({})).decode()
+    ast.parse(fixed)
+    lines = fixed.splitlines()
+
+    assert '\t"""TODO: Describe `Tabs`."""' in lines
+    assert "\tdef inline(self):" in lines
+    assert '\t\t"""TODO: Describe `inline`.' in lines
+    assert "\t\treturn 1" in lines
+    assert '\t\t"""TODO: Describe `block`.' in lines
+    assert '\t  """TODO: Describe `mixed`.' in lines
+    assert not any(line.startswith(" ") for line in lines)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    for name in ("a.py", "b.py"):
+        (tmp_path / name).write_text(SOURCE)
+    (tmp_path / "done.py").write_text('"""Done."""\n')
+    return tmp_path
+
+
+def test_main_diff(project, capsys):
+    """
+    GIVEN modules with missing docstrings
+    WHEN the fixes are asked for as a diff
+    THEN the diff is printed in path order and no file is written.
+    """
+    rules = compile_rules({})
+
+    assert main([str(project)], rules=rules, diff=True) == (12, 2)
+
+    out = capsys.readouterr().out
+    assert out.index("+++ b/a.py") < out.index("+++ b/b.py")
+    assert "done.py" not in out
+    assert (project / "a.py").read_text() == SOURCE
+
+
+def test_main_fix(project):
+    """
+    GIVEN modules with missing docstrings
+    WHEN they are fixed, then fixed again
+    THEN every skeleton is written once and nothing is left to insert.
+    """
+    rules = compile_rules({})
+    mode = (project / "a.py").stat().st_mode
+
+    assert main([str(project)], rules=rules, fix=True, print_msgs=False) == (
+        12,
+        2,
+    )
+    assert main([str(project)], rules=rules, fix=True, print_msgs=False) == (
+        0,
+        0,
+    )
+    assert main([str(project)], rules=rules, print_msgs=False) == (0, 0)
+
+    assert (project / "a.py").stat().st_mode == mode
+    assert sorted(path.name for path in project.iterdir()) == [
+        "a.py",
+        "b.py",
+        "done.py",
+    ]
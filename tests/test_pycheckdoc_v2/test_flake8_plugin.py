@@ -0,0 +1,114 @@
+import ast
+import subprocess
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from pycheckdoc_v2 import VERSION
+from pycheckdoc_v2.config import tomllib
+from pycheckdoc_v2.flake8_plugin import DocChecker
+from pycheckdoc_v2.rules import compile_rules
+
+ROOT = Path(__file__).parents[2]
+
+SOURCE = '''def func(a):
+    """Func"""
+
+
+class NoDoc:
+    def method(self):
+        pass
+'''
+
+
+def test_run():
+    """
+    GIVEN an AST parsed by flake8
+    WHEN the plugin runs on it
+    THEN findings are yielded in flake8's format.
+    """
+    DocChecker.rules = None
+    results = list(DocChecker(ast.parse(SOURCE), "module.py").run())
+
+    assert [result[:3] for result in results] == [
+        (1, 0, "DOC100 Missing module docstring"),
+        (5, 0, "DOC102 Missing docstring in class 'NoDoc'"),
+        (6, 0, "DOC103 Missing docstring in method 'NoDoc.method'"),
+    ]
+    assert results[0][3] is DocChecker
+
+
+def test_run_with_style():
+    """
+    GIVEN rules with a docstring style
+    WHEN the plugin runs
+    THEN problems in docstring content are reported with DOC110.
+    """
+    DocChecker.rules = compile_rules({"style": "google"})
+    try:
+        results = list(DocChecker(ast.parse(SOURCE), "module.py").run())
+    finally:
+        DocChecker.rules = None
+
+    assert (1, 0, "DOC110 function 'func': missing argument 'a'") in [
+        result[:3] for result in results
+    ]
+
+
+@pytest.mark.skipif(tomllib is None, reason="tomllib/tomli not available")
+def test_parse_options_drops_project_options(tmp_path, capsys):
+    """
+    GIVEN a configuration with options that need the index of the project
+    WHEN the plugin parses its options
+    THEN they are turned off with a warning and the other options kept.
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        "[tool.pycheckdoc]\ninherit-docs = true\npublic-api = true\n"
+        + 'style = "google"\n'
+    )
+
+    try:
+        DocChecker.parse_options(
+            SimpleNamespace(pycheckdoc_config=str(pyproject))
+        )
+        rules = DocChecker.rules
+    finally:
+        DocChecker.rules = None
+
+    assert not rules.inherit_docs and not rules.public_api
+    assert rules.style == "google"
+    assert "inherit-docs, public-api are ignored" in capsys.readouterr().err
+    assert DocChecker.version == VERSION
+
+
+def test_flake8(tmp_path):
+    """
+    GIVEN flake8 configured with the plugin as a local plugin
+    WHEN flake8 runs on a file
+    THEN the documentation findings are in its output.
+    """
+    pytest.importorskip("flake8")
+
+    (tmp_path / "module.py").write_text(SOURCE)
+    (tmp_path / "setup.cfg").write_text(
+        "[flake8:local-plugins]\n"
+        + "extension =\n"
+        + "    DOC = pycheckdoc_v2.flake8_plugin:DocChecker\n"
+        + f"paths = {ROOT}\n"
+    )
+
+    process = subprocess.run(
+        [sys.executable, "-m", "flake8", "--select=DOC", "module.py"],
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+    )
+
+    assert process.stdout.splitlines() == [
+        "module.py:1:1: DOC100 Missing module docstring",
+        "module.py:5:1: DOC102 Missing docstring in class 'NoDoc'",
+        "module.py:6:1: DOC103 Missing docstring in method 'NoDoc.method'",
+    ]
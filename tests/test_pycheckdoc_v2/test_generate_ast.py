@@ -0,0 +1,71 @@
+from pycheckdoc_v2.generate_ast import iter_paths, read_path_list
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import RuleSet
+
+
+def test_read_path_list_newlines(tmp_path):
+    """
+    GIVEN a list of paths separated by newlines
+    WHEN it is read in small chunks
+    THEN every path is returned without separators or empty entries.
+    """
+    path_list = tmp_path / "paths.txt"
+    path_list.write_bytes(b"a.py\r\nsrc/b c.py\n\nd.py")
+
+    assert list(read_path_list(str(path_list), chunk_size=3)) == [
+        "a.py",
+        "src/b c.py",
+        "d.py",
+    ]
+
+
+def test_read_path_list_nul(tmp_path):
+    """
+    GIVEN a list of paths separated by NUL characters
+    WHEN it is read in small chunks
+    THEN paths with newlines in them are kept whole.
+    """
+    path_list = tmp_path / "paths.txt"
+    path_list.write_bytes(b"a.py\0new\nline.py\0")
+
+    assert list(read_path_list(str(path_list), chunk_size=4)) == [
+        "a.py",
+        "new\nline.py",
+    ]
+
+
+def test_main_files_from(tmp_path):
+    """
+    GIVEN a file listing modules, one of them without documentation
+    WHEN main is called with the list and no paths
+    THEN the listed modules are checked.
+    """
+    (tmp_path / "a.py").write_text('"""A"""\n')
+    (tmp_path / "b.py").write_text("x = 1\n")
+    (tmp_path / "unlisted.py").write_text("x = 1\n")
+
+    path_list = tmp_path / "paths.txt"
+    path_list.write_text(f"{tmp_path / 'a.py'}\n{tmp_path / 'b.py'}\n")
+
+    assert main(
+        [], print_msgs=False, rules=RuleSet(), files_from=str(path_list)
+    ) == (1, 1)
+
+
+def test_iter_paths_path_order(tmp_path):
+    """
+    GIVEN a tree whose files are created out of order
+    WHEN it is walked recursively
+    THEN files are yielded in path order, a directory before its siblings
+    that sort after it.
+    """
+    for name in ["b.py", "a/z.py", "a.py", "a/b/c.py", "a-b.py", "c.txt"]:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+
+    paths = list(iter_paths([str(tmp_path)], recursive=True))
+
+    assert paths == [
+        str(tmp_path / name)
+        for name in ["a/b/c.py", "a/z.py", "a-b.py", "a.py", "b.py"]
+    ]
@@ -0,0 +1,172 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.lsp import Document, read_message, split_blocks
+from pycheckdoc_v2.rules import RuleSet
+
+ROOT = Path(__file__).parents[2]
+
+SOURCE = '''"""Module"""
+
+import os
+
+
+@decorator
+def first():
+    pass
+
+
+class Second:
+    """Second"""
+
+    def method(self):
+        pass
+'''
+
+
+def encode(message):
+    body = json.dumps(message).encode()
+    return f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+
+
+def test_split_blocks():
+    """
+    GIVEN source code with a header, a decorated function and a class
+    WHEN it is split into blocks
+    THEN each definition starts a block together with its decorators.
+    """
+    blocks = split_blocks(SOURCE)
+
+    assert [start for start, _ in blocks] == [0, 5, 10]
+    assert "".join(block for _, block in blocks) == SOURCE
+
+
+def test_document_rechecks_changed_block():
+    """
+    GIVEN an open document
+    WHEN a single definition is edited
+    THEN only that definition is parsed again and the lines of the
+        findings still match the document.
+    """
+    document = Document("file:///a.py", RuleSet())
+
+    assert document.update(SOURCE) == [
+        Finding("file:///a.py", 7, "function", "first"),
+        Finding("file:///a.py", 14, "method", "Second.method"),
+    ]
+    assert document.parsed_blocks == 3
+
+    edited = SOURCE.replace("    pass\n", '    """First"""\n', 1)
+    edited = edited.replace("import os\n", "import os\nimport re\n")
+
+    assert document.update(edited) == [
+        Finding("file:///a.py", 15, "method", "Second.method"),
+    ]
+    assert document.parsed_blocks == 2
+
+
+def test_document_keeps_findings_on_syntax_error():
+    """
+    GIVEN an open document
+    WHEN it is edited into code that can't be parsed
+    THEN the previous findings are kept.
+    """
+    document = Document("file:///a.py", RuleSet())
+    findings = document.update(SOURCE)
+
+    assert document.update(SOURCE + "def broken(:\n") == findings
+
+
+def test_document_large_file_single_edit():
+    """
+    GIVEN a large open document
+    WHEN one function is edited
+    THEN a single block is parsed again.
+    """
+    source = '"""Module"""\n' + "".join(
+        f"\n\ndef f{i}(a):\n    return [a for _ in range(10)]\n"
+        for i in range(2000)
+    )
+    document = Document("file:///big.py", RuleSet())
+    document.update(source)
+
+    findings = document.update(source.replace("def f1000(a):", "def g(a):"))
+
+    assert document.parsed_blocks == 1
+    assert len(findings) == 2000
+
+
+def test_read_message():
+    """
+    GIVEN a stream with a JSON-RPC message
+    WHEN the message is read
+    THEN its content is returned and None follows at the end.
+    """
+    stream = io.BytesIO(encode({"jsonrpc": "2.0", "method": "exit"}))
+
+    assert read_message(stream) == {"jsonrpc": "2.0", "method": "exit"}
+    assert read_message(stream) is None
+
+
+def test_lsp_session():
+    """
+    GIVEN a language server started with `pycheckdoc lsp`
+    WHEN a client opens a document, changes it and shuts down
+    THEN diagnostics are published for each version and the server
+        exits with 0.
+    """
+    uri = "file:///a.py"
+    messages = [
+        {"jsonrpc": "2.0", "id": 1, "method": "initialize", "params": {}},
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didOpen",
+            "params": {
+                "textDocument": {"uri": uri, "version": 1, "text": SOURCE}
+            },
+        },
+        {
+            "jsonrpc": "2.0",
+            "method": "textDocument/didChange",
+            "params": {
+                "textDocument": {"uri": uri, "version": 2},
+                "contentChanges": [{"text": '"""Module"""\n'}],
+            },
+        },
+        {"jsonrpc": "2.0", "id": 2, "method": "shutdown"},
+        {"jsonrpc": "2.0", "method": "exit"},
+    ]
+
+    process = subprocess.run(
+        [sys.executable, str(ROOT / "bin" / "pycheckdoc"), "lsp"],
+        cwd=ROOT,
+        input=b"".join(map(encode, messages)),
+        capture_output=True,
+        env={"PYTHONPATH": str(ROOT)},
+    )
+    assert process.returncode == 0
+
+    output = io.BytesIO(process.stdout)
+    responses = []
+    while True:
+        message = read_message(output)
+        if message is None:
+            break
+        responses.append(message)
+
+    assert responses[0]["result"]["capabilities"]["textDocumentSync"] == 1
+
+    opened, changed = (
+        response["params"]["diagnostics"]
+        for response in responses
+        if response.get("method") == "textDocument/publishDiagnostics"
+    )
+    assert [d["range"]["start"]["line"] for d in opened] == [6, 13]
+    assert opened[0]["message"] == "Missing docstring in function 'first'"
+    assert changed == []
+
+    assert responses[-1] == {"jsonrpc": "2.0", "id": 2, "result": None}
@@ -0,0 +1,86 @@
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.multi_root import check_roots, interleave
+from pycheckdoc_v2.rules import compile_rules
+
+
+def make_root(tmp_path, name, sources):
+    root = tmp_path / name
+    root.mkdir()
+    for file_name, source in sources.items():
+        (root / file_name).write_text(source)
+    return root
+
+
+def test_interleave():
+    """
+    GIVEN the files of roots of different sizes
+    WHEN they are interleaved
+    THEN files are taken from each root in turn.
+    """
+    groups = [["a1", "a2", "a3"], ["b1"], ["c1", "c2"]]
+
+    assert list(interleave(groups)) == [
+        (0, "a1"),
+        (1, "b1"),
+        (2, "c1"),
+        (0, "a2"),
+        (2, "c2"),
+        (0, "a3"),
+    ]
+
+
+def test_check_roots(tmp_path):
+    """
+    GIVEN a documented root, an undocumented root and a missing root
+    WHEN the roots are checked
+    THEN each root gets its own findings and exit code.
+    """
+    documented = make_root(
+        tmp_path, "documented", {"a.py": '"""A"""\n', "empty.py": ""}
+    )
+    undocumented = make_root(
+        tmp_path,
+        "undocumented",
+        {"a.py": '"""A"""\n\ndef f():\n    pass\n', "b.py": "x = 1\n"},
+    )
+    missing = tmp_path / "missing"
+
+    results = check_roots(
+        [str(documented), str(undocumented), str(missing)],
+        print_msgs=False,
+        max_workers=2,
+    )
+
+    assert [result.root for result in results] == [
+        str(documented),
+        str(undocumented),
+        str(missing),
+    ]
+    assert [result.exit_code for result in results] == [0, 1, 2]
+    assert [result.files_checked for result in results] == [1, 2, 0]
+
+    assert sorted(results[1].findings) == [
+        Finding(str(undocumented / "a.py"), 3, "function", "f"),
+        Finding(str(undocumented / "b.py"), 0, "module", ""),
+    ]
+    assert results[1].files_with_errors == 2
+
+
+def test_check_roots_rules(tmp_path):
+    """
+    GIVEN a root with a private undocumented function
+    WHEN it is checked with rules that ignore private definitions
+    THEN the rules are applied in the workers.
+    """
+    root = make_root(
+        tmp_path, "root", {"a.py": '"""A"""\n\ndef _f():\n    pass\n'}
+    )
+
+    results = check_roots(
+        [str(root)],
+        rules=compile_rules({"ignore-private": True}),
+        print_msgs=False,
+        max_workers=1,
+    )
+
+    assert results[0].findings == []
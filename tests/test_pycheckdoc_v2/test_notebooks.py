@@ -0,0 +1,214 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+from pycheckdoc_v2.finding_store import FindingStore
+from pycheckdoc_v2.findings import Finding
+from pycheckdoc_v2.generate_ast import iter_paths
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.notebooks import iter_cells, read_notebook, strip_magics
+from pycheckdoc_v2.rules import compile_rules
+
+CELLS = [
+    {"cell_type": "markdown", "metadata": {}, "source": ["# Helpers\n"]},
+    {
+        "cell_type": "code",
+        "execution_count": 1,
+        "metadata": {"tags": ["a \\\"quoted\\\" [tag]"]},
+        "outputs": [
+            {
+                "output_type": "display_data",
+                "data": {"image/png": "iVBORw0KGgo" * 5000},
+                "metadata": {},
+            }
+        ],
+        "source": ["%matplotlib inline\n", "import os\n", "files = !ls"],
+    },
+    {
+        "cell_type": "code",
+        "execution_count": 2,
+        "metadata": {},
+        "outputs": [],
+        "source": [
+            "def documented():\n",
+            '    """Documented."""\n',
+            "\n",
+            "\n",
+            "def helper(a):\n",
+            "    return a\n",
+        ],
+    },
+    {"cell_type": "code", "metadata": {}, "outputs": [], "source": ""},
+    {
+        "cell_type": "code",
+        "metadata": {},
+        "outputs": [],
+        "source": "%%bash\necho 'def not_python():'\n",
+    },
+    {
+        "cell_type": "code",
+        "metadata": {},
+        "outputs": [],
+        "source": "class Plot:\n    def show(self):\n        pass",
+    },
+]
+
+
+def notebook_bytes(cells=CELLS):
+    """Serialize a notebook with the given cells."""
+    return json.dumps(
+        {
+            "cells": cells,
+            "metadata": {"kernelspec": {"name": "python3"}},
+            "nbformat": 4,
+            "nbformat_minor": 5,
+        },
+        indent=1,
+    ).encode()
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "notebooks"
+    (root / ".ipynb_checkpoints").mkdir(parents=True)
+    (root / "helpers.ipynb").write_bytes(notebook_bytes())
+    (root / ".ipynb_checkpoints" / "helpers-checkpoint.ipynb").write_bytes(
+        notebook_bytes()
+    )
+    return root
+
+
+class ChunkCounter(io.BytesIO):
+    """Bytes read a chunk at a time, remembering the largest read."""
+
+    largest = 0
+
+    def read(self, size=-1):
+        """Read at most size bytes."""
+        data = super().read(size)
+        self.largest = max(self.largest, len(data))
+        return data
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_iter_cells(chunk_size):
+    """
+    GIVEN a notebook with large outputs and escaped strings in metadata
+    WHEN its cells are read in chunks of any size
+    THEN the type and source of every cell are read and nothing else.
+    """
+    stream = ChunkCounter(notebook_bytes())
+
+    cells = list(iter_cells(stream, chunk_size))
+
+    assert cells == [
+        {"cell_type": cell["cell_type"], "source": cell["source"]}
+        for cell in CELLS
+    ]
+    assert stream.largest <= chunk_size
+
+
+def test_iter_cells_stops_after_cells():
+    """
+    GIVEN a notebook whose metadata after its cells isn't valid JSON
+    WHEN its cells are read
+    THEN the metadata isn't read.
+    """
+    data = b'{"cells": [{"cell_type": "code", "source": "x = 1"}], "meta'
+
+    assert list(iter_cells(io.BytesIO(data), 4)) == [
+        {"cell_type": "code", "source": "x = 1"}
+    ]
+
+
+def test_strip_magics():
+    """
+    GIVEN cells with line magics, shell commands and help requests
+    WHEN the magics are stripped
+    THEN they become `pass` on the same lines and valid cells are kept.
+    """
+    source = "if True:\n    %time run()\nx = !ls \\\n  -l\nos.path?\n"
+
+    assert strip_magics(source) == (
+        "if True:\n    pass\npass\n\npass\n"
+    )
+    assert strip_magics('s = """\n%s\n"""\n') == 's = """\n%s\n"""\n'
+
+
+def test_read_notebook():
+    """
+    GIVEN a notebook with markdown, empty, cell magic and code cells
+    WHEN it is read
+    THEN only the code cells are joined and mapped back to their cells.
+    """
+    notebook = read_notebook(io.BytesIO(notebook_bytes()))
+
+    assert notebook.source.decode().splitlines()[:4] == [
+        "pass",
+        "import os",
+        "pass",
+        "def documented():",
+    ]
+    assert notebook.cell_map.starts == (1, 4, 10)
+    assert notebook.cell_map.cells == (2, 3, 6)
+    assert notebook.cell_map.locate(8) == (3, 5)
+    assert notebook.cell_map.locate(11) == (6, 2)
+
+
+def test_iter_paths_notebooks(project, tmp_path):
+    """
+    GIVEN a directory and an archive with notebooks and checkpoints
+    WHEN their files are listed
+    THEN the notebooks are listed, but not their checkpoints.
+    """
+    archive = tmp_path / "notebooks.zip"
+    with zipfile.ZipFile(archive, "w") as zip_file:
+        zip_file.write(project / "helpers.ipynb", "helpers.ipynb")
+
+    assert list(iter_paths([str(project), str(archive)], True)) == [
+        str(project / "helpers.ipynb"),
+        f"{archive}!helpers.ipynb",
+    ]
+
+
+def test_finding_store_keeps_cells():
+    """
+    GIVEN findings of notebooks and modules
+    WHEN they are stored and serialized
+    THEN their cells are kept.
+    """
+    findings = [
+        Finding("a.ipynb", 2, "function", "f", cell=3),
+        Finding("a.py", 2, "function", "f"),
+    ]
+
+    store = FindingStore.from_bytes(FindingStore(findings).to_bytes())
+
+    assert list(store) == findings
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+@pytest.mark.parametrize("stream", [False, True])
+def test_main_notebooks(project, capsys, use_cache, stream):
+    """
+    GIVEN a notebook with undocumented definitions in its code cells
+    WHEN it is checked
+    THEN the findings are reported at their cell and line in the cell.
+    """
+    result = main(
+        [str(project)],
+        recursive=True,
+        rules=compile_rules({}),
+        stream=stream,
+        use_cache=use_cache,
+    )
+
+    err = capsys.readouterr().err
+    assert result == (4, 1)
+    assert "helpers.ipynb:cell_3: 5:" in err
+    assert "helpers.ipynb:cell_6: 1:" in err
+    assert "helpers.ipynb:cell_6: 2:" in err
+    assert "checkpoint" not in err
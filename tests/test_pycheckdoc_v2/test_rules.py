@@ -0,0 +1,363 @@
+import ast
+import sys
+
+import pytest
+
+from pycheckdoc_v2.check_class import check_class_doc
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.check_function import check_function_doc
+from pycheckdoc_v2.config import Options, load_config, tomllib
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import (
+    DEFAULT_PLACEHOLDERS,
+    compile_placeholders,
+    compile_rules,
+    module_stem,
+)
+
+
+SOURCE = '''
+from typing import overload
+
+
+def _private():
+    pass
+
+
+def test_something():
+    pass
+
+
+@overload
+def func(a: int) -> int: ...
+
+
+def func(a):
+    """Func"""
+    return a
+
+
+def short():
+    """Hi"""
+
+
+class Value:
+    """Value"""
+
+    def __init__(self):
+        pass
+
+    @property
+    def value(self):
+        """Value"""
+        return 1
+
+    @value.setter
+    def value(self, new):
+        pass
+'''
+
+
+def module_tuple():
+    return ("module.py", ast.parse(SOURCE))
+
+
+def test_no_rules():
+    """
+    GIVEN a module with undocumented private, test, overload and
+        dunder definitions
+    WHEN it is checked without rules
+    THEN all of them are reported.
+    """
+    assert check_function_doc(module_tuple(), False) == 3
+    assert check_class_doc(module_tuple(), False) == (0, 2)
+
+
+def test_ignore_rules():
+    """
+    GIVEN a rule set that ignores private, test, overload, dunder and
+        property setter definitions
+    WHEN the module is checked
+    THEN none of the ignored definitions are reported.
+    """
+    rules = compile_rules(
+        {
+            "ignore-private": True,
+            "ignore-tests": True,
+            "ignore-overload": True,
+            "ignore-dunder": True,
+            "ignore-property-setters": True,
+        }
+    )
+
+    assert check_function_doc(module_tuple(), False, rules) == 0
+    assert check_class_doc(module_tuple(), False, rules) == (0, 0)
+
+
+def test_min_length():
+    """
+    GIVEN a rule set with a minimum docstring length
+    WHEN the module is checked
+    THEN docstrings shorter than the minimum are reported.
+    """
+    rules = compile_rules({"min-length": 3})
+
+    assert check_function_doc(module_tuple(), False, rules) == 4
+
+
+QUALITY_SOURCE = '''"""TODO: Describe the module."""
+
+
+def get_value():
+    """Get the value."""
+
+
+def parse(path):
+    """Parse a path.
+
+    Args:
+        path (str): FIXME.
+    """
+
+
+def empty():
+    """..."""
+
+
+def short():
+    """Short but real."""
+
+
+def fine():
+    """Reads the value from the TODOs list."""
+
+
+def fix():
+    """Insert docstring skeletons in the files."""
+
+
+class Engine:
+    """Docstring"""
+
+    def run(self):
+        """Run"""
+
+    def stop(self):
+        """Insert docstring here."""
+'''
+
+
+def quality_findings(config):
+    """Get the name and error of the findings of the quality source."""
+    module = ("engine.py", ast.parse(QUALITY_SOURCE))
+    return [
+        (finding.name, finding.err)
+        for finding in check_module_node(module, compile_rules(config))
+    ]
+
+
+def test_quality():
+    """
+    GIVEN definitions with placeholder docstrings, docstrings repeating
+        their name and short docstrings
+    WHEN they are checked for quality
+    THEN each is reported with the reason, and placeholder words inside
+        other words or sentences don't count.
+    """
+    assert quality_findings({"quality": True, "min-length": 16}) == [
+        ("", "placeholder docstring: 'TODO'"),
+        ("get_value", "docstring only repeats the name"),
+        ("parse", "placeholder docstring: 'FIXME'"),
+        ("empty", "placeholder docstring: '...'"),
+        ("short", "docstring is shorter than 16 characters"),
+        ("Engine", "placeholder docstring: 'Docstring'"),
+        ("Engine.run", "docstring only repeats the name"),
+        ("Engine.stop", "placeholder docstring: 'Insert docstring here'"),
+    ]
+    assert quality_findings({}) == []
+
+
+def test_quality_placeholders():
+    """
+    GIVEN placeholder patterns in the configuration
+    WHEN docstrings are checked for quality
+    THEN those patterns replace the default ones, and invalid patterns
+        are rejected.
+    """
+    config = {"quality": True, "placeholders": [r"(?i:\Ashort)", "TODOs"]}
+
+    assert quality_findings(config) == [
+        ("get_value", "docstring only repeats the name"),
+        ("empty", "placeholder docstring: '...'"),
+        ("short", "placeholder docstring: 'Short'"),
+        ("fine", "placeholder docstring: 'TODOs'"),
+        ("Engine", "placeholder docstring: 'Docstring'"),
+        ("Engine.run", "docstring only repeats the name"),
+    ]
+
+    with pytest.raises(ValueError):
+        compile_rules({"placeholders": ["(unclosed"]})
+
+
+def test_compile_placeholders_literal_alternatives():
+    """
+    GIVEN placeholder patterns starting with a class of letters or a word
+        boundary
+    WHEN they are compiled
+    THEN each letter starts its own alternative and the boundary is
+        checked after the word, so that they all start with a literal
+        character, and other classes are kept.
+    """
+    compiled = compile_placeholders(
+        ["[Ww]ip", r"\bTBD\b", "[Ll]*orem", "[^x]y"]
+    )
+
+    assert compiled.pattern == (
+        r"(?:Wip)|(?:wip)|(?:TBD(?<!\wTBD)\b)|(?:[Ll]*orem)|(?:[^x]y)"
+    )
+    assert DEFAULT_PLACEHOLDERS.search("lorem ipsum dolor")
+
+
+@pytest.mark.parametrize(
+    "text", ["STODO", "TODOS", "XXXL", "reinsert docstring", "lorem ipsums"]
+)
+def test_placeholders_are_whole_words(text):
+    """
+    GIVEN text where placeholder words are only part of other words
+    WHEN it is searched for the default placeholders
+    THEN nothing is found.
+    """
+    assert DEFAULT_PLACEHOLDERS.search(text) is None
+
+
+@pytest.mark.parametrize(
+    "patterns",
+    [["(?i)todo", "fixme"], ["(?P<x>a)", "(?P<x>b)"], ["a", r"(b)\2"]],
+)
+def test_placeholders_that_conflict(patterns):
+    """
+    GIVEN placeholder patterns that are valid alone but not combined
+    WHEN they are compiled
+    THEN ValueError is raised like for other invalid configurations.
+    """
+    with pytest.raises(ValueError):
+        compile_rules({"quality": True, "placeholders": patterns})
+
+
+def test_module_stem():
+    """
+    GIVEN paths of modules, packages and archive members
+    WHEN the names their docstrings are compared with are taken
+    THEN packages are named after their directory.
+    """
+    assert module_stem("src/engine.py") == "engine"
+    assert module_stem("src/pkg/__init__.py") == "pkg"
+    assert module_stem("dist/pkg.whl!pkg/util.pyi") == "util"
+
+
+def test_unknown_key():
+    """
+    GIVEN a configuration with an unknown key
+    WHEN it is compiled
+    THEN ValueError is raised.
+    """
+    with pytest.raises(ValueError):
+        compile_rules({"ignore-everything": True})
+
+
+def test_with_config():
+    """
+    GIVEN compiled rules and options of the command line
+    WHEN the rules are overridden by the options
+    THEN the overridden options change, the others and the ignore rules
+        are kept, and invalid options are rejected like in the
+        configuration.
+    """
+    rules = compile_rules({"ignore-private": True, "min-length": 10})
+    options = Options(style="google", doctest_timeout=2.5)
+
+    overridden = rules.with_config(options.rule_config())
+
+    assert options.rule_config() == {"style": "google", "doctest-timeout": 2.5}
+    assert overridden.style == "google"
+    assert overridden.doctest_timeout == 2.5
+    assert overridden.min_length == 10
+    assert overridden.table == rules.table
+    assert rules.style is None
+
+    with pytest.raises(ValueError):
+        rules.with_config({"style": "javadoc"})
+    with pytest.raises(ValueError):
+        rules.with_config({"doctest-timeout": 0})
+    with pytest.raises(ValueError):
+        rules.with_config({"ignore-private": False})
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"workers": 0},
+        {"max_in_flight": 0},
+        {"multi_root": True, "files_from": "paths.txt"},
+        {"multi_root": True, "fail_fast": True},
+        {"multi_root": True, "stream": True},
+        {"multi_root": True, "max_in_flight": 4},
+        {"multi_root": True, "backend": "thread"},
+        {"fix": True, "save_findings": "findings.bin"},
+        {"fix": True, "count_only": True},
+        {"diff": True, "doctest": True},
+        {"files_from": "missing.txt"},
+        {"files_from": "."},
+    ],
+)
+def test_options_validate(fields):
+    """
+    GIVEN options out of range, that conflict or with a list of files
+        that can't be read
+    WHEN they are validated
+    THEN ValueError is raised.
+    """
+    Options().validate()
+    Options(files_from="-").validate()
+
+    with pytest.raises(ValueError):
+        Options(**fields).validate()
+
+
+@pytest.mark.skipif(tomllib is None, reason="tomllib/tomli not available")
+def test_load_config(tmp_path):
+    """
+    GIVEN a pyproject.toml with a [tool.pycheckdoc] table
+    WHEN the configuration is loaded
+    THEN the table is returned.
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    pyproject.write_text(
+        '[tool.pycheckdoc]\nignore-private = true\nmin-length = 10\n'
+    )
+
+    assert load_config(str(pyproject)) == {
+        "ignore-private": True,
+        "min-length": 10,
+    }
+
+
+@pytest.mark.skipif(tomllib is None, reason="tomllib/tomli not available")
+@pytest.mark.parametrize("content", [None, "[tool.pycheckdoc\n"])
+def test_load_config_error_is_usage_error(tmp_path, monkeypatch, content):
+    """
+    GIVEN a configuration file that is missing or isn't valid TOML
+    WHEN pycheckdoc is run from the command line with it
+    THEN it exits with a usage error.
+    """
+    pyproject = tmp_path / "pyproject.toml"
+    if content is not None:
+        pyproject.write_text(content)
+    monkeypatch.setattr(
+        sys, "argv", ["pycheckdoc", "--config", str(pyproject), "x.py"]
+    )
+
+    with pytest.raises(SystemExit) as exit_info:
+        main()
+
+    assert exit_info.value.code == 2
@@ -0,0 +1,239 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from pycheckdoc_v2 import backends
+from pycheckdoc_v2 import session as session_module
+from pycheckdoc_v2.check_file import check_file
+from pycheckdoc_v2.main import check_doc, check_doc_async
+from pycheckdoc_v2.rules import compile_rules
+from pycheckdoc_v2.session import Session
+from pycheckdoc_v2.stream import stream_check
+
+
+@pytest.fixture
+def files(tmp_path):
+    paths = []
+    for i in range(6):
+        path = tmp_path / f"m{i}.py"
+        path.write_text(
+            '"""Module."""\n' * (i % 2) + f"def f{i}():\n    pass\n"
+        )
+        paths.append(str(path))
+    return paths
+
+
+@pytest.fixture
+def slow_checks(monkeypatch):
+    """Make threads check each file slowly and track the most files
+    scheduled but not done at a time."""
+    lock = threading.Lock()
+    state = {"outstanding": 0, "peak": 0}
+
+    def slow_check_file(path):
+        time.sleep(0.05)
+        return check_file(path)
+
+    submit = backends.CheckPool.submit
+
+    def tracked_submit(self, path):
+        future = submit(self, path)
+        with lock:
+            state["outstanding"] += 1
+            state["peak"] = max(state["peak"], state["outstanding"])
+
+        def done(_):
+            with lock:
+                state["outstanding"] -= 1
+
+        future.add_done_callback(done)
+        return future
+
+    monkeypatch.setattr(backends, "check_file", slow_check_file)
+    monkeypatch.setattr(backends.CheckPool, "submit", tracked_submit)
+
+    return state
+
+
+def test_session_iter_findings(files):
+    """
+    GIVEN files with and without findings, and one that isn't valid Python
+    WHEN they are checked through a session
+    THEN the results are those of stream_check, in the same order, with
+        the error as the finding of the invalid file.
+    """
+    with open(files[2], "w") as f:
+        f.write("def f(:\n")
+
+    async def run():
+        async with Session(max_workers=1) as session:
+            return [result async for result in session.iter_findings(files)]
+
+    results = asyncio.run(run())
+
+    assert results == list(stream_check(files, max_workers=1))
+    assert results[2][0] == files[2]
+    assert results[2][1][0].err.startswith("can't check: SyntaxError")
+
+
+def test_session_shares_workers_with_backpressure(
+    files, slow_checks, monkeypatch
+):
+    """
+    GIVEN a session allowing 2 files in flight
+    WHEN 3 checks run concurrently
+    THEN they share one pool and never have more than 2 files scheduled.
+    """
+    pools = []
+
+    class CountedPool(session_module.CheckPool):
+        def __init__(self, *args):
+            super().__init__(*args)
+            pools.append(self)
+
+    monkeypatch.setattr(session_module, "CheckPool", CountedPool)
+
+    async def run():
+        async with Session(
+            max_workers=2, max_in_flight=2, backend="thread"
+        ) as session:
+            return await asyncio.gather(
+                *(session.check(files) for _ in range(3))
+            )
+
+    assert asyncio.run(run()) == [(9, 6)] * 3
+    assert len(pools) == 1
+    assert slow_checks["peak"] == 2
+
+
+def test_session_cancellation(files, slow_checks):
+    """
+    GIVEN a check iterating over a session's findings
+    WHEN its task is cancelled after the first result
+    THEN the scheduled files are cancelled, their slots given back and
+        the session can still be used.
+    """
+
+    async def first_then_block(session, started):
+        async for _ in session.iter_findings(files):
+            started.set()
+            await asyncio.sleep(10)
+
+    async def run():
+        async with Session(
+            max_workers=1, max_in_flight=3, backend="thread"
+        ) as session:
+            started = asyncio.Event()
+            task = asyncio.create_task(first_then_block(session, started))
+            await started.wait()
+            task.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+            # Wait for the file being checked to finish.
+            while slow_checks["outstanding"]:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0)
+
+            assert session._slots._value == 3
+            return await session.check(files[:2])
+
+    assert asyncio.run(run()) == (3, 2)
+
+
+def test_session_created_outside_the_loop(files):
+    """
+    GIVEN a session created before any event loop runs
+    WHEN it is used from the loop of asyncio.run
+    THEN its slots belong to that loop and the files are checked.
+    """
+    session = Session(max_workers=1, max_in_flight=2, backend="thread")
+
+    async def run():
+        try:
+            return await session.check(files)
+        finally:
+            await session.close()
+
+    assert asyncio.run(run()) == check_doc(files)
+
+
+def test_session_closed(files):
+    """
+    GIVEN a closed session
+    WHEN it is used
+    THEN a RuntimeError is raised.
+    """
+
+    async def run():
+        session = Session(max_workers=1)
+        await session.close()
+        await session.check(files)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(run())
+
+
+def test_check_doc_async(files):
+    """
+    GIVEN files with findings
+    WHEN they are checked with check_doc_async
+    THEN the result is that of check_doc.
+    """
+    assert asyncio.run(check_doc_async(files)) == check_doc(files)
+
+    with pytest.raises(ValueError):
+        asyncio.run(check_doc_async([]))
+
+
+def test_check_doc_async_no_files(tmp_path):
+    """
+    GIVEN paths without any file to check
+    WHEN they are checked with check_doc_async, with and without a session
+    THEN (-1, -1) is returned like check_doc.
+    """
+    paths = [str(tmp_path / "missing.py")]
+
+    async def run():
+        async with Session(max_workers=1) as session:
+            return await check_doc_async(paths, session=session)
+
+    assert check_doc(paths) == (-1, -1)
+    assert asyncio.run(check_doc_async(paths)) == (-1, -1)
+    assert asyncio.run(run()) == (-1, -1)
+
+
+@pytest.mark.parametrize("option", ["inherit-docs", "public-api"])
+def test_check_doc_async_hierarchy(tmp_path, option):
+    """
+    GIVEN rules that need the index of the project
+    WHEN a package is checked with check_doc_async, and a session is made
+        with the rules
+    THEN the project is indexed like with check_doc, and the session
+        refuses rules without the index.
+    """
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text(
+        '"""Package."""\nfrom .base import Base\n'
+    )
+    (package / "base.py").write_text(
+        'class Base:\n    def run(self):\n        """Run."""\n'
+    )
+    (package / "_impl.py").write_text(
+        "from .base import Base\n\n\nclass Impl(Base):\n"
+        + "    def run(self):\n        pass\n"
+    )
+    rules = compile_rules({option: True})
+    paths = [str(package)]
+
+    result = asyncio.run(check_doc_async(paths, True, rules))
+
+    assert result == check_doc(paths, True, rules=rules)
+    assert result != check_doc(paths, True, rules=compile_rules({}))
+
+    with pytest.raises(ValueError):
+        Session(rules)
@@ -0,0 +1,97 @@
+import os
+import sys
+
+import pytest
+
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import RuleSet
+from pycheckdoc_v2.shard import (
+    merge_partials,
+    parse_shard,
+    read_partial,
+    shard_of,
+)
+
+
+def test_parse_shard():
+    """
+    GIVEN shards in the form i/N
+    WHEN they are parsed
+    THEN valid shards are returned and invalid ones raise ValueError.
+    """
+    assert parse_shard("2/5") == (2, 5)
+
+    for value in ("0/5", "6/5", "2", "a/b"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_shard_of_is_stable():
+    """
+    GIVEN relative and absolute paths to the same file
+    WHEN their shard is computed
+    THEN they are assigned to the same shard.
+    """
+    path = "pkg/module.py"
+
+    assert shard_of(path, 7) == shard_of(os.path.abspath(path), 7)
+    assert 1 <= shard_of(path, 7) <= 7
+
+
+def test_shards_merge(tmp_path, monkeypatch):
+    """
+    GIVEN a directory of modules split into 3 shards
+    WHEN each shard is checked and the partial results are merged
+    THEN every file is checked exactly once and the findings match a
+        check without shards.
+    """
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "src"
+    src.mkdir()
+    for i in range(12):
+        doc = '"""Doc"""\n' if i % 2 else ""
+        (src / f"module_{i}.py").write_text(doc + "def f():\n    pass\n")
+
+    expected = main(["src"], print_msgs=False, rules=RuleSet())
+
+    partials = []
+    for i in range(1, 4):
+        output = str(tmp_path / f"shard-{i}.json")
+        main(
+            ["src"],
+            print_msgs=False,
+            rules=RuleSet(),
+            shard=(i, 3),
+            shard_output=output,
+        )
+        partials.append(read_partial(output))
+
+    report = merge_partials(partials)
+
+    assert report.missing_shards == []
+    assert report.files == sorted(
+        f"src/module_{i}.py" for i in range(12)
+    )
+    assert len(report.findings) == expected[0]
+    assert len({finding.path for finding in report.findings}) == expected[1]
+
+    assert merge_partials(partials[:1]).missing_shards == [2, 3]
+
+
+def test_merge_partials_that_dont_belong_together(
+    tmp_path, monkeypatch, capsys
+):
+    """
+    GIVEN the same partial result twice, and a missing one
+    WHEN they are merged from the command line
+    THEN the error is printed on stderr and (-1, -1) is returned.
+    """
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "module.py").write_text('"""Doc"""\n')
+    main(["module.py"], print_msgs=False, shard=(1, 2), shard_output="1.json")
+
+    for partials in (["1.json", "1.json"], ["1.json", "2.json"]):
+        monkeypatch.setattr(sys, "argv", ["pycheckdoc", "merge", *partials])
+
+        assert main() == (-1, -1)
+        assert "Can't merge" in capsys.readouterr().err
@@ -0,0 +1,178 @@
+import ast
+
+import pytest
+
+from pycheckdoc_v2 import skeleton
+from pycheckdoc_v2.check_file import check_module_node
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2 import rules as rules_module
+from pycheckdoc_v2.rules import Target, compile_rules, register_rule
+from pycheckdoc_v2.skeleton import (
+    check_skeleton,
+    decode_skeleton,
+    encode_skeleton,
+    extract_skeleton,
+    load_skeleton,
+)
+
+SOURCE = '''"""Module."""
+from typing import overload
+
+
+@overload
+def f(a: int) -> int: ...
+
+
+def g(a, *args, b, **kwargs):
+    """Do g. ✓
+
+    Args:
+        a: A.
+        c: C.
+    """
+    if a:
+        raise ValueError
+    return a
+
+
+class _Private:
+    def method(self):
+        pass
+
+
+class TestThing:
+    """Tests."""
+
+    @property
+    def value(self):
+        """Value."""
+        return 1
+
+    @value.setter
+    def value(self, value):
+        pass
+
+    def __init__(self, x):
+        pass
+'''
+
+CONFIGS = [
+    {},
+    {"ignore-private": True, "ignore-overload": True},
+    {"ignore-tests": True, "ignore-dunder": True},
+    {"ignore-property-setters": True, "style": "google", "min-length": 4},
+    {"quality": True, "min-length": 7},
+]
+
+
+def test_skeleton_round_trip():
+    """
+    GIVEN the skeleton of a module
+    WHEN it is encoded and decoded
+    THEN the same definitions are returned.
+    """
+    definitions = extract_skeleton(ast.parse(SOURCE))
+
+    assert decode_skeleton(encode_skeleton(definitions)) == definitions
+    assert [d.qualname for d in definitions] == [
+        "",
+        "f",
+        "g",
+        "_Private",
+        "_Private.method",
+        "TestThing",
+        "TestThing.value",
+        "TestThing.value",
+        "TestThing.__init__",
+    ]
+    assert definitions[2].args == ("a", "args", "b", "kwargs")
+    assert definitions[6].decorators == ("property",)
+
+
+@pytest.mark.parametrize("config", CONFIGS)
+def test_check_skeleton_matches_ast_checks(config):
+    """
+    GIVEN rules compiled from a configuration
+    WHEN they are applied to the skeleton of a module
+    THEN the findings are the same as those of the checks on its AST.
+    """
+    rules = compile_rules(config)
+    module = ast.parse(SOURCE)
+
+    assert check_skeleton(
+        "module.py", extract_skeleton(module), rules
+    ) == check_module_node(("module.py", module), rules)
+
+
+def test_rules_see_the_same_target(monkeypatch):
+    """
+    GIVEN a registered rule that records what it is given
+    WHEN a module is checked through its AST and through its skeleton
+    THEN the rule is given the same targets in both.
+    """
+    monkeypatch.setattr(rules_module, "RULES", dict(rules_module.RULES))
+    seen = []
+
+    @register_rule("record", ("function", "class", "method"))
+    def record(target):
+        seen.append(target)
+        return False
+
+    rules = compile_rules({"record": True})
+    module = ast.parse(SOURCE)
+
+    check_module_node(("module.py", module), rules)
+    from_ast = sorted(seen)
+    seen.clear()
+    check_skeleton("module.py", extract_skeleton(module), rules)
+
+    assert from_ast and sorted(seen) == from_ast
+    assert all(isinstance(target, Target) for target in from_ast)
+    assert Target("f", "function", ("overload",)) in from_ast
+
+
+def test_load_skeleton_skips_parsing_cached_content(tmp_path, monkeypatch):
+    """
+    GIVEN a module whose skeleton was cached
+    WHEN its skeleton is loaded again
+    THEN the module isn't parsed.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+
+    first = load_skeleton(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed")
+
+    monkeypatch.setattr(skeleton.ast, "parse", fail)
+
+    assert load_skeleton(str(path)) == first
+
+    path.write_text(SOURCE + "\n\ndef h():\n    pass\n")
+    with pytest.raises(AssertionError):
+        load_skeleton(str(path))
+
+
+def test_main_cache_with_other_rules(tmp_path, monkeypatch):
+    """
+    GIVEN a file checked once with the cache
+    WHEN it is checked again with other rules
+    THEN the findings follow the new rules.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    path = tmp_path / "module.py"
+    path.write_text(SOURCE)
+
+    for config in CONFIGS:
+        rules = compile_rules(config)
+        expected = check_module_node((str(path), ast.parse(SOURCE)), rules)
+
+        result = main(
+            [str(path)], print_msgs=False, rules=rules, use_cache=True
+        )
+
+        assert result == (len(expected), 1)
+
+    assert list((tmp_path / "cache" / "skeletons").glob("*/*"))
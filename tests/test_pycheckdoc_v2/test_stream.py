@@ -0,0 +1,222 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.stream import stream_check
+
+ROOT = Path(__file__).parents[2]
+
+# Streams a corpus of large modules and prints the peak RSS in KiB of
+# the parent process. Workers have their own RSS.
+PEAK_RSS = """
+import resource
+import sys
+from pathlib import Path
+
+from pycheckdoc_v2.stream import stream_check
+
+paths = (str(path) for path in Path(sys.argv[1]).glob("*.py"))
+for _ in stream_check(paths, max_in_flight=4, max_workers=2):
+    pass
+
+print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+SOURCE = "".join(
+    f"def f{i}(a, b):\n    return [a + b for _ in range(10)]\n\n"
+    for i in range(300)
+)
+
+
+def test_stream_check_order(tmp_path):
+    """
+    GIVEN more files than may be in flight
+    WHEN they are checked as a stream
+    THEN results of non empty files are yielded in order.
+    """
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text("" if i == 3 else "def f():\n    pass\n")
+        paths.append(str(path))
+
+    results = list(stream_check(iter(paths), max_in_flight=2, max_workers=2))
+
+    assert [path for path, _ in results] == paths[:3] + paths[4:]
+    assert all(len(findings) == 2 for _, findings in results)
+
+
+def test_stream_check_yields_before_input_ends(tmp_path):
+    """
+    GIVEN paths that are read slowly
+    WHEN they are checked as a stream with room for all of them in flight
+    THEN each result is yielded once the files before it are done,
+    without waiting for the rest of the paths.
+    """
+    events = []
+
+    def slow_paths():
+        for i in range(3):
+            path = tmp_path / f"module_{i}.py"
+            path.write_text("def f():\n    pass\n")
+            events.append(f"read {i}")
+            yield str(path)
+            time.sleep(0.5)
+
+    for path, _ in stream_check(slow_paths(), max_in_flight=8, max_workers=1):
+        events.append(f"checked {path[-4]}")
+
+    assert events.index("checked 0") < events.index("read 2")
+    assert events.index("checked 1") < events.index("checked 2")
+
+
+def test_stream_check_findings_in_line_order(tmp_path):
+    """
+    GIVEN a file with a class before a function
+    WHEN it is checked
+    THEN its findings are in line order with the module first.
+    """
+    path = tmp_path / "module.py"
+    path.write_text(
+        "class A:\n    def m(self):\n        pass\n\n\ndef f():\n    pass\n"
+    )
+
+    [(_, findings)] = stream_check([str(path)], max_workers=1)
+
+    assert [(f.line, f.kind) for f in findings] == [
+        (0, "module"),
+        (1, "class"),
+        (2, "method"),
+        (6, "function"),
+    ]
+
+
+def peak_rss(corpus: Path, num_files: int) -> int:
+    corpus.mkdir()
+    for i in range(num_files):
+        (corpus / f"module_{i}.py").write_text(SOURCE)
+
+    output = subprocess.run(
+        [sys.executable, "-c", PEAK_RSS, str(corpus)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+
+    return int(output.split()[-1])
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="ru_maxrss is in KiB"
+)
+def test_stream_check_peak_rss_is_flat(tmp_path):
+    """
+    GIVEN a small corpus and a corpus 8 times larger
+    WHEN each is checked as a stream
+    THEN the peak RSS of the parent process barely grows.
+    """
+    small = peak_rss(tmp_path / "small", 20)
+    large = peak_rss(tmp_path / "large", 160)
+
+    # Keeping the ASTs of the large corpus would take over 200 MiB.
+    assert large - small < 8 * 1024
+
+
+def test_stream_check_stopped_early_leaves_no_workers(tmp_path):
+    """
+    GIVEN a stream of files with more of them scheduled than checked
+    WHEN the caller stops iterating after the first result
+    THEN the pending files are cancelled and no worker process is left.
+    """
+    paths = []
+    for i in range(50):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text(SOURCE)
+        paths.append(str(path))
+
+    results = stream_check(iter(paths), max_in_flight=8, max_workers=2)
+    next(results)
+    results.close()
+
+    assert multiprocessing.active_children() == []
+
+
+def test_main_fail_fast_count_only(tmp_path, capsys):
+    """
+    GIVEN several files with missing documentation
+    WHEN they are checked with fail_fast and count_only
+    THEN checking stops at the first file and only the count is printed.
+    """
+    for i in range(20):
+        (tmp_path / f"module_{i}.py").write_text("def f():\n    pass\n")
+
+    result = main(
+        [str(tmp_path)], recursive=True, fail_fast=True, count_only=True
+    )
+    captured = capsys.readouterr()
+
+    assert result == (2, 1)
+    assert "func_err" not in captured.err
+    assert "Found 2 errors in 1 source file" in captured.err
+    assert multiprocessing.active_children() == []
+
+
+@pytest.mark.parametrize(
+    "fields", [{}, {"use_cache": True}, {"stream": True}, {"doctest": True}]
+)
+def test_main_output_order(tmp_path, monkeypatch, capsys, fields):
+    """
+    GIVEN files given out of path order and others listed out of order
+    WHEN they are checked in batch, with the cache, as a stream and with
+        the listed files
+    THEN the files given are printed in path order, followed by the
+        listed files in the order of the list.
+    """
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    for name in ("a.py", "b.py", "c.py", "d.py"):
+        (tmp_path / name).write_text("def f():\n    pass\n")
+    listed = tmp_path / "files.txt"
+    listed.write_text(f"{tmp_path / 'd.py'}\n{tmp_path / 'c.py'}\n")
+
+    def printed_files(**extra):
+        main(
+            [str(tmp_path / "b.py"), str(tmp_path / "a.py")], **fields, **extra
+        )
+        lines = capsys.readouterr().err.splitlines()[:-1]
+        return [os.path.basename(line.split(":")[0]) for line in lines[::2]]
+
+    assert printed_files() == ["a.py", "b.py"]
+    assert printed_files(files_from=str(listed)) == [
+        "a.py",
+        "b.py",
+        "d.py",
+        "c.py",
+    ]
+
+
+@pytest.mark.parametrize("fields", [{"stream": True}, {"multi_root": True}])
+def test_main_reports_files_that_cant_be_checked(tmp_path, capsys, fields):
+    """
+    GIVEN a file that isn't valid Python between documented files
+    WHEN they are checked as a stream and as roots
+    THEN the error is printed with the path of the file and counted, and
+        the other files are still checked.
+    """
+    for name in ("a.py", "c.py"):
+        (tmp_path / name).write_text('"""Module."""\n')
+    (tmp_path / "b.py").write_text("def f(:\n")
+
+    result = main([str(tmp_path)], recursive=True, **fields)
+    captured = capsys.readouterr()
+
+    assert result == (1, 1)
+    assert f"{tmp_path / 'b.py'}: 0:" in captured.err
+    assert "can't check: SyntaxError" in captured.err
+    assert "checked 3 source files" in captured.err
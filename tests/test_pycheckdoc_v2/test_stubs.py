@@ -0,0 +1,180 @@
+import ast
+import os
+import zipfile
+
+import pytest
+
+from pycheckdoc_v2 import generate_ast
+from pycheckdoc_v2.archives import iter_archive_members
+from pycheckdoc_v2.generate_ast import get_module_node, iter_paths
+from pycheckdoc_v2.main import main
+from pycheckdoc_v2.rules import compile_rules
+from pycheckdoc_v2.stubs import merge_stub
+
+IMPLEMENTATION = '''def documented():
+    """Documented in the implementation."""
+
+
+def in_stub(a):
+    return a
+
+
+def nowhere():
+    pass
+
+
+class Thing:
+    def method(self):
+        pass
+
+    def other(self):
+        pass
+'''
+
+STUB = '''"""Module documented in the stub."""
+from typing import overload
+
+
+def in_stub(a: int) -> int:
+    """Documented in the stub."""
+    ...
+
+
+def nowhere() -> None: ...
+
+
+class Thing:
+    """Thing."""
+
+    @overload
+    def method(self) -> None:
+        """Method."""
+        ...
+    def other(self) -> None: ...
+'''
+
+STUB_ONLY = '''"""Compiled module."""
+
+
+def compiled() -> None: ...
+'''
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    monkeypatch.setenv("PYCHECKDOC_CACHE_DIR", str(tmp_path / "cache"))
+    root = tmp_path / "pkg"
+    root.mkdir()
+    (root / "mod.py").write_text(IMPLEMENTATION)
+    (root / "mod.pyi").write_text(STUB)
+    (root / "_compiled.pyi").write_text(STUB_ONLY)
+    (root / "plain.py").write_text('"""Plain."""\n')
+    return root
+
+
+def test_iter_paths_pairs_stubs(project):
+    """
+    GIVEN a directory with a stub paired with its implementation and a
+        stub without one
+    WHEN its files are listed
+    THEN the paired stub isn't listed on its own and the other one is.
+    """
+    assert [
+        os.path.basename(path) for path in iter_paths([str(project)])
+    ] == ["_compiled.pyi", "mod.py", "plain.py"]
+
+
+def test_iter_paths_pairs_given_stubs(project, tmp_path):
+    """
+    GIVEN a stub given with its implementation, in either order, a stub
+        given on its own and a stub without implementation, given
+        directly and through a list of files
+    WHEN the files are listed
+    THEN the paired stubs yield their implementation once and the other
+        stub is listed.
+    """
+    given = [
+        str(project / name)
+        for name in ("mod.pyi", "mod.py", "_compiled.pyi", "mod.pyi")
+    ]
+    listed = tmp_path / "files.txt"
+    listed.write_text("\n".join(given))
+
+    assert [os.path.basename(path) for path in iter_paths(given)] == [
+        "mod.py",
+        "_compiled.pyi",
+    ]
+    assert main([], files_from=str(listed), print_msgs=False) == main(
+        [str(project / "mod.py"), str(project / "_compiled.pyi")],
+        print_msgs=False,
+    )
+
+
+def test_archive_members_pair_stubs(project, tmp_path):
+    """
+    GIVEN a wheel with a module and its stub
+    WHEN its members are listed
+    THEN only the module is listed.
+    """
+    wheel = tmp_path / "pkg-1.0-py3-none-any.whl"
+    with zipfile.ZipFile(wheel, "w") as zip_file:
+        for name in ("mod.py", "mod.pyi", "_compiled.pyi"):
+            zip_file.write(project / name, f"pkg/{name}")
+
+    assert [
+        member.rpartition("!")[2]
+        for member in iter_archive_members(str(wheel))
+    ] == ["pkg/mod.py", "pkg/_compiled.pyi"]
+
+
+def test_merge_stub():
+    """
+    GIVEN a module and a stub documenting other definitions
+    WHEN the stub is merged into the module
+    THEN definitions without a docstring get the docstring of the stub.
+    """
+    module = ast.parse(IMPLEMENTATION)
+
+    assert merge_stub(module, ast.parse(STUB)) == 4
+    assert ast.get_docstring(module) == "Module documented in the stub."
+
+    # The module docstring was inserted before the definitions.
+    documented, in_stub, nowhere, thing = module.body[1:]
+
+    assert ast.get_docstring(documented) == (
+        "Documented in the implementation."
+    )
+    assert ast.get_docstring(in_stub) == "Documented in the stub."
+    assert ast.get_docstring(nowhere) is None
+    assert ast.get_docstring(thing) == "Thing."
+    assert ast.get_docstring(thing.body[1]) == "Method."
+    assert ast.get_docstring(thing.body[2]) is None
+
+
+def test_documented_module_doesnt_read_stub(project, monkeypatch):
+    """
+    GIVEN a module where every definition has a docstring
+    WHEN it is parsed
+    THEN its stub isn't read.
+    """
+
+    def fail(path):
+        raise AssertionError("stub read")
+
+    monkeypatch.setattr(generate_ast, "read_stub", fail)
+
+    assert get_module_node(str(project / "plain.py"))
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_main_stubs(project, use_cache):
+    """
+    GIVEN modules paired with stubs and a stub without a module
+    WHEN they are checked
+    THEN only the definitions documented on neither side are reported.
+    """
+    rules = compile_rules({})
+
+    assert main(
+        [str(project)], print_msgs=False, rules=rules, use_cache=use_cache
+    ) == (3, 2)
@@ -0,0 +1,139 @@
+import os
+import time
+
+import pytest
+
+from pycheckdoc_v2.generate_ast import iter_paths
+from pycheckdoc_v2.walk_cache import WalkCache
+
+FILES = ["a.py", "pkg/__init__.py", "pkg/b.py", "pkg/sub/c.py", "other/d.py"]
+
+
+def age(root):
+    """Make every directory under root look modified a while ago."""
+    past = time.time() - 60
+    for directory, _, _ in os.walk(root):
+        os.utime(directory, (past, past))
+
+
+def walk(root, cache_file):
+    """Walk root with a freshly loaded cache and save it."""
+    cache = WalkCache.load(cache_file)
+    paths = list(iter_paths([str(root)], recursive=True, walk_cache=cache))
+    cache.save()
+
+    # The cache must never change the result of the walk.
+    assert paths == list(iter_paths([str(root)], recursive=True))
+
+    return [os.path.relpath(path, root) for path in paths], cache.scanned
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / "tree"
+    for name in FILES:
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text("")
+    age(root)
+    return root
+
+
+def test_walk_cache_skips_unchanged_directories(tree, tmp_path):
+    """
+    GIVEN a tree walked once with the cache
+    WHEN it is walked again without changes
+    THEN no directory is listed again.
+    """
+    cache_file = tmp_path / "walk.json"
+
+    first, scanned = walk(tree, cache_file)
+    assert scanned == 4
+
+    second, scanned = walk(tree, cache_file)
+    assert second == first
+    assert scanned == 0
+
+
+def test_walk_cache_file_created(tree, tmp_path):
+    """
+    GIVEN a cached tree
+    WHEN a file is created in a nested directory
+    THEN it is found by listing only that directory again.
+    """
+    cache_file = tmp_path / "walk.json"
+    walk(tree, cache_file)
+
+    (tree / "pkg" / "sub" / "new.py").write_text("")
+    paths, scanned = walk(tree, cache_file)
+
+    assert "pkg/sub/new.py" in paths
+    assert scanned == 1
+
+
+def test_walk_cache_file_deleted(tree, tmp_path):
+    """
+    GIVEN a cached tree
+    WHEN a file is deleted
+    THEN it isn't found anymore.
+    """
+    cache_file = tmp_path / "walk.json"
+    walk(tree, cache_file)
+
+    (tree / "pkg" / "b.py").unlink()
+    paths, scanned = walk(tree, cache_file)
+
+    assert "pkg/b.py" not in paths
+    assert scanned == 1
+
+
+def test_walk_cache_renames(tree, tmp_path):
+    """
+    GIVEN a cached tree
+    WHEN a file and a directory are renamed
+    THEN the new paths are found and the old ones aren't.
+    """
+    cache_file = tmp_path / "walk.json"
+    walk(tree, cache_file)
+
+    (tree / "a.py").rename(tree / "z.py")
+    (tree / "pkg" / "sub").rename(tree / "pkg" / "moved")
+    paths, _ = walk(tree, cache_file)
+
+    assert paths == [
+        "other/d.py",
+        "pkg/__init__.py",
+        "pkg/b.py",
+        "pkg/moved/c.py",
+        "z.py",
+    ]
+
+
+def test_walk_cache_rescans_racy_directories(tree, tmp_path):
+    """
+    GIVEN a directory modified within the last moments
+    WHEN the tree is walked twice
+    THEN its listing isn't trusted and it is listed both times.
+    """
+    cache_file = tmp_path / "walk.json"
+    walk(tree, cache_file)
+
+    (tree / "other" / "e.py").write_text("")
+
+    assert walk(tree, cache_file)[1] == 1
+    assert walk(tree, cache_file)[1] == 1
+
+
+def test_walk_skips_directory_symlinks(tree, tmp_path):
+    """
+    GIVEN a tree with a link to a parent directory and a link to a file
+    WHEN it is walked recursively with and without the cache
+    THEN the walk ends, the linked directory isn't entered and the linked
+        file is found.
+    """
+    os.symlink(tree, tree / "pkg" / "loop")
+    os.symlink(tree / "a.py", tree / "pkg" / "link.py")
+    age(tree)
+
+    paths, _ = walk(tree, tmp_path / "walk.json")
+
+    assert sorted(paths) == sorted(FILES + ["pkg/link.py"])
@@ -0,0 +1,169 @@
+import os
+
+import pytest
+
+from pycheckdoc_v2 import workers
+from pycheckdoc_v2.print_funcs import print_worker_plan
+from pycheckdoc_v2.workers import (
+    cgroup_cpu_quota,
+    cgroup_memory_available,
+    plan_workers,
+)
+
+MIB = 2**20
+
+
+@pytest.fixture
+def host(tmp_path, monkeypatch):
+    """A fake 96 CPU host with 64 GiB available and a 32 MiB process."""
+    monkeypatch.setattr(workers, "cpu_count", lambda: 96)
+    monkeypatch.setattr(
+        os, "sched_getaffinity", lambda pid: set(range(96)), raising=False
+    )
+    monkeypatch.delenv(workers.WORKERS_ENV, raising=False)
+
+    cgroup = tmp_path / "cgroup"
+    proc = tmp_path / "proc"
+    (proc / "self").mkdir(parents=True)
+    cgroup.mkdir()
+
+    (proc / "meminfo").write_text(
+        f"MemTotal: {128 * 2**20} kB\nMemAvailable: {64 * 2**20} kB\n"
+    )
+    pages = 32 * MIB // os.sysconf("SC_PAGE_SIZE")
+    (proc / "self" / "statm").write_text(f"100000 {pages} 0 0 0 0 0\n")
+    (proc / "self" / "cgroup").write_text("0::/\n")
+
+    return cgroup, proc
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+
+def test_cgroup_v2_cpu_quota(host):
+    """
+    GIVEN a cgroup v2 CPU quota of 2 CPUs on a 96 CPU host
+    WHEN the workers are planned
+    THEN 2 workers are used.
+    """
+    cgroup, proc = host
+    write(cgroup / "cpu.max", "200000 100000\n")
+
+    assert cgroup_cpu_quota(str(cgroup), str(proc)) == 2.0
+    assert plan_workers(None, str(cgroup), str(proc)).workers == 2
+
+
+def test_cgroup_v2_own_group(host):
+    """
+    GIVEN a process in a nested cgroup v2 group with its own quota
+    WHEN the quota is read
+    THEN the quota of that group is used.
+    """
+    cgroup, proc = host
+    write(proc / "self" / "cgroup", "0::/kubepods/pod1\n")
+    write(cgroup / "kubepods" / "pod1" / "cpu.max", "50000 100000\n")
+
+    assert cgroup_cpu_quota(str(cgroup), str(proc)) == 0.5
+    assert plan_workers(None, str(cgroup), str(proc)).workers == 1
+
+
+def test_cgroup_v1_cpu_quota(host):
+    """
+    GIVEN a cgroup v1 CPU quota of 1.5 CPUs
+    WHEN the workers are planned
+    THEN the quota is rounded up to 2 workers.
+    """
+    cgroup, proc = host
+    write(cgroup / "cpu,cpuacct" / "cpu.cfs_quota_us", "150000\n")
+    write(cgroup / "cpu,cpuacct" / "cpu.cfs_period_us", "100000\n")
+
+    assert plan_workers(None, str(cgroup), str(proc)).workers == 2
+
+
+def test_no_cpu_quota(host):
+    """
+    GIVEN cgroups without CPU quotas
+    WHEN the workers are planned
+    THEN all the CPUs are used.
+    """
+    cgroup, proc = host
+    write(cgroup / "cpu.max", "max 100000\n")
+    write(cgroup / "cpu" / "cpu.cfs_quota_us", "-1\n")
+
+    assert cgroup_cpu_quota(str(cgroup), str(proc)) is None
+    assert plan_workers(None, str(cgroup), str(proc)).workers == 96
+
+
+@pytest.mark.parametrize("version", [1, 2])
+def test_memory_limit(host, version):
+    """
+    GIVEN a cgroup memory limit with 384 MiB left and 64 MiB per worker
+    WHEN the workers are planned
+    THEN only 6 workers are used.
+    """
+    cgroup, proc = host
+    if version == 2:
+        write(cgroup / "memory.max", f"{512 * MIB}\n")
+        write(cgroup / "memory.current", f"{128 * MIB}\n")
+    else:
+        write(cgroup / "memory" / "memory.limit_in_bytes", f"{512 * MIB}\n")
+        write(cgroup / "memory" / "memory.usage_in_bytes", f"{128 * MIB}\n")
+
+    assert cgroup_memory_available(str(cgroup), str(proc)) == 384 * MIB
+
+    plan = plan_workers(None, str(cgroup), str(proc))
+
+    assert plan.per_worker == 64 * MIB
+    assert plan.workers == 6
+
+
+def test_override(host, monkeypatch):
+    """
+    GIVEN a CPU quota
+    WHEN the number of workers is overridden by argument or environment
+    THEN the override is used.
+    """
+    cgroup, proc = host
+    write(cgroup / "cpu.max", "100000 100000\n")
+
+    assert plan_workers(8, str(cgroup), str(proc)).workers == 8
+
+    monkeypatch.setenv(workers.WORKERS_ENV, "4")
+    assert plan_workers(None, str(cgroup), str(proc)).workers == 4
+
+
+@pytest.mark.parametrize("value", ["0", "-2", "abc", "1.5"])
+def test_invalid_override(host, monkeypatch, value):
+    """
+    GIVEN a number of workers that isn't an integer of at least 1
+    WHEN it overrides the number of workers by environment or argument
+    THEN ValueError is raised instead of starting a broken pool.
+    """
+    cgroup, proc = host
+
+    monkeypatch.setenv(workers.WORKERS_ENV, value)
+    with pytest.raises(ValueError, match=workers.WORKERS_ENV):
+        plan_workers(None, str(cgroup), str(proc))
+
+    monkeypatch.delenv(workers.WORKERS_ENV)
+    with pytest.raises(ValueError):
+        plan_workers(0, str(cgroup), str(proc))
+
+
+def test_print_worker_plan(host, capsys):
+    """
+    GIVEN a plan limited by a CPU quota
+    WHEN it is printed
+    THEN the line shows the number of workers and the limits.
+    """
+    cgroup, proc = host
+    write(cgroup / "cpu.max", "200000 100000\n")
+
+    print_worker_plan(plan_workers(None, str(cgroup), str(proc)))
+
+    assert capsys.readouterr().out == (
+        "Workers: 2 (96 cpus, affinity 96, cgroup quota 2, "
+        + "65536 MiB available / 64 MiB per worker)\n"
+    )